@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+from benchmarks.suite import (BASELINE_DIR, DEFAULT_LABEL, MIN_TIME, ROUNDS, baseline_path, format_results, load_results,
+                              run_suite, save_results)
+
+# Compares benchmark results with a baseline and fails when any benchmark got slower
+# by more than the threshold, as a fraction of the baseline's operations per second,
+# or when a benchmark of the baseline is missing from the results (removed or renamed).
+# Without a results file the benchmarks in the baseline are run now. The baseline is
+# a results file path or the label of a saved baseline, DEFAULT_LABEL when left out.
+DEFAULT_THRESHOLD = 0.10
+
+
+# path of a baseline given as a file path or as a label under benchmarks/baselines
+def resolve_baseline(name: str) -> str:
+    if os.path.isfile(name):
+        return name
+    path = baseline_path(name)
+    if not os.path.isfile(path):
+        labels = sorted(file[:-5] for file in os.listdir(BASELINE_DIR) if file.endswith(".json"))
+        raise FileNotFoundError(f"No baseline {name!r}, saved baselines: {', '.join(labels) or 'none'}")
+    return path
+
+
+# (name, baseline ops/s, current ops/s, relative change) for every benchmark in both
+def compare(baseline: dict, current: dict) -> list[tuple]:
+    rows = []
+    for name, stats in baseline["benchmarks"].items():
+        if name in current["benchmarks"]:
+            before = stats["ops_per_second"]
+            after = current["benchmarks"][name]["ops_per_second"]
+            rows.append((name, before, after, after / before - 1))
+    return rows
+
+
+def regressions(rows: list[tuple], threshold: float = DEFAULT_THRESHOLD) -> list[tuple]:
+    return [row for row in rows if row[3] < -threshold]
+
+
+# benchmarks of the baseline that the current results do not have
+def missing(baseline: dict, current: dict) -> list[str]:
+    return sorted(set(baseline["benchmarks"]) - set(current["benchmarks"]))
+
+
+def format_comparison(rows: list[tuple], threshold: float = DEFAULT_THRESHOLD) -> str:
+    width = max((len(row[0]) for row in rows), default=0)
+    return "\n".join(f"{name:<{width}}  {before:>14,.0f} -> {after:>14,.0f} ops/s  {change:+7.1%}"
+                     f"{'  REGRESSION' if change < -threshold else ''}"
+                     for name, before, after, change in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when benchmarks regress against a baseline")
+    parser.add_argument("baseline", nargs="?", default=DEFAULT_LABEL,
+                        help=f"Baseline label or results file, {DEFAULT_LABEL} by default")
+    parser.add_argument("current", nargs="?", help="Results to check, the benchmarks are run now when left out")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Largest slowdown allowed, as a fraction of the baseline")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--save", action="store_true", help="Save the new results as the current commit's baseline")
+    args = parser.parse_args()
+
+    baseline = load_results(resolve_baseline(args.baseline))
+    if args.current:
+        current = load_results(args.current)
+    else:
+        current = run_suite(list(baseline["benchmarks"]), args.rounds, args.min_time)
+        if args.save:
+            print(f"Saved to {save_results(current)}")
+    rows = compare(baseline, current)
+    print(f"{baseline['commit']} -> {current['commit']}")
+    print(format_comparison(rows, args.threshold))
+    gone = missing(baseline, current)
+    if gone:
+        print(f"Missing from the results: {', '.join(gone)}")
+    slower = regressions(rows, args.threshold)
+    if slower:
+        print(f"{len(slower)} benchmark(s) regressed by more than {args.threshold:.0%}")
+    if gone or slower:
+        sys.exit(1)
@@ -0,0 +1,225 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import numpy as np
+from bot.card_display import get_cards
+from game.card import Card, Rank, Suit
+from game.deck import Deck
+from game.poker import Dealer, PokerGameManager
+from game.simulation import EquityPolicy, RandomPolicy, play_hand
+
+# Throughput benchmarks for the game package. Every benchmark is a setup function that
+# returns the call to time and how many operations one call does. A call is repeated
+# until a round takes at least min_time seconds, and the best of several rounds is
+# reported as operations per second (the best round is the one least disturbed by the
+# rest of the machine, the median is kept alongside). Results are saved as JSON under
+# benchmarks/baselines, one file per label (the commit by default), and compared with
+# benchmarks.compare. The checked-in reference is the DEFAULT_LABEL baseline, main.json;
+# the commit it was measured at is recorded inside the file.
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+DEFAULT_LABEL = "main"
+ROUNDS = 5
+MIN_TIME = 0.2
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _cards(text: str) -> list[Card]:
+    ranks = {"A": Rank.ACE, "K": Rank.KING, "Q": Rank.QUEEN, "J": Rank.JACK, "T": Rank.TEN, "9": Rank.NINE,
+             "8": Rank.EIGHT, "7": Rank.SEVEN, "6": Rank.SIX, "5": Rank.FIVE, "4": Rank.FOUR, "3": Rank.THREE,
+             "2": Rank.TWO}
+    suits = {"s": Suit.SPADES, "h": Suit.HEARTS, "d": Suit.DIAMONDS, "c": Suit.CLUBS}
+    return [Card(ranks[card[0]], suits[card[1]]) for card in text.split()]
+
+
+# two hole cards then the five board cards of a hand in every category
+CATEGORY_HANDS = {
+    "high_card": "As Jd 9c 7h 4s 3d 2c",
+    "pair": "As Ad 9c 7h 4s 3d Kc",
+    "two_pair": "As Ad 9c 9h 4s 3d Kc",
+    "three_of_a_kind": "As Ad Ac 9h 4s 3d Kc",
+    "straight": "9s Td Jc Qh Ks 3d 2c",
+    "flush": "As Js 9s 7s 4s 3d 2c",
+    "full_house": "As Ad Ac 9h 9s 3d 2c",
+    "four_of_a_kind": "As Ad Ac Ah 9s 3d 2c",
+    "straight_flush": "9s Ts Js Qs Ks 3d 2c",
+    "royal_flush": "As Ks Qs Js Ts 3d 2c",
+}
+
+
+@benchmark("deck_create")
+def deck_create():
+    return lambda: Deck(seed=1), 1
+
+
+@benchmark("deck_deal_hand")
+def deck_deal_hand():
+    # two hole cards each and the board, the cards of one heads-up hand
+    deck = Deck(seed=1)
+
+    def deal():
+        deck.reset()
+        for _ in range(9):
+            deck.deal_card()
+    return deal, 1
+
+
+def _hand_rank(cards: str):
+    dealer = Dealer(2, seed=1)
+    hand = _cards(cards)
+    player = dealer.players[0]
+    player.card1, player.card2 = hand[:2]
+    dealer.board = hand[2:]
+    return lambda: dealer.get_hand_rank(player), 1
+
+
+for _category, _hand in CATEGORY_HANDS.items():
+    benchmark(f"hand_rank_{_category}")(lambda cards=_hand: _hand_rank(cards))
+
+
+def _showdown(seats: int):
+    dealer = Dealer(seats, seed=1)
+    dealer.deal_board(5)
+
+    def showdown():
+        dealer.evaluate_hands()
+        dealer.determine_winner()
+    return showdown, 1
+
+
+@benchmark("determine_winner_2_seats")
+def determine_winner_2_seats():
+    return _showdown(2)
+
+
+@benchmark("determine_winner_9_seats")
+def determine_winner_9_seats():
+    return _showdown(9)
+
+
+def _simulation(seats: int):
+    game = PokerGameManager(seed=1, seats=seats)
+    policies = [EquityPolicy(), RandomPolicy()] * seats
+    rng = np.random.default_rng(1)
+    hands = 50
+
+    def play():
+        for _ in range(hands):
+            for player in game.players:
+                player.stack = 1000
+            play_hand(game, policies[:seats], rng)
+    return play, hands
+
+
+@benchmark("simulate_hand_heads_up")
+def simulate_hand_heads_up():
+    return _simulation(2)
+
+
+@benchmark("simulate_hand_6_seats")
+def simulate_hand_6_seats():
+    return _simulation(6)
+
+
+@benchmark("get_cards_hole")
+def get_cards_hole():
+    cards = _cards("As Kd")
+    return lambda: get_cards(cards), 1
+
+
+@benchmark("get_cards_board")
+def get_cards_board():
+    cards = _cards("As Kd Qh Jc Ts")
+    return lambda: get_cards(cards, small_cards=True), 1
+
+
+def _time(call, loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        call()
+    return time.perf_counter() - start
+
+
+# best and median operations per second of one benchmark
+def measure(setup, rounds: int = ROUNDS, min_time: float = MIN_TIME) -> dict:
+    call, ops = setup()
+    loops = 1
+    elapsed = _time(call, loops)
+    while elapsed < min_time:
+        loops = loops * 10 if elapsed < min_time / 10 else int(loops * min_time / elapsed) + 1
+        elapsed = _time(call, loops)
+    rates = [loops * ops / elapsed] + [loops * ops / _time(call, loops) for _ in range(rounds - 1)]
+    return {"ops_per_second": max(rates), "median": statistics.median(rates), "loops": loops}
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# runs the benchmarks whose name contains any of names (all of them by default)
+def run_suite(names: list[str] | None = None, rounds: int = ROUNDS, min_time: float = MIN_TIME) -> dict:
+    selected = [name for name in BENCHMARKS if not names or any(part in name for part in names)]
+    return {
+        "commit": current_commit(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": {name: measure(BENCHMARKS[name], rounds, min_time) for name in selected},
+    }
+
+
+def baseline_path(label: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{label}.json")
+
+
+# saves to path, or as the baseline called label (the results' commit by default)
+def save_results(results: dict, path: str | None = None, label: str | None = None) -> str:
+    if path is None:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = baseline_path(label or results["commit"])
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+    return path
+
+
+def load_results(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def format_results(results: dict) -> str:
+    width = max(map(len, results["benchmarks"]), default=0)
+    return "\n".join(f"{name:<{width}}  {stats['ops_per_second']:>14,.0f} ops/s  (median {stats['median']:,.0f})"
+                     for name, stats in results["benchmarks"].items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the game package throughput benchmarks")
+    parser.add_argument("names", nargs="*", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="Seconds each round runs for at least")
+    parser.add_argument("--save", action="store_true", help="Save the results as the baseline of the current commit")
+    parser.add_argument("--label", help=f"Save the results as this baseline instead, e.g. {DEFAULT_LABEL}")
+    parser.add_argument("--output", help="Save the results to this path instead")
+    args = parser.parse_args()
+    results = run_suite(args.names, args.rounds, args.min_time)
+    print(format_results(results))
+    if args.save or args.label or args.output:
+        print(f"Saved to {save_results(results, args.output, args.label)}")
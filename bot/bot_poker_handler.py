@@ -1,29 +1,43 @@
+import asyncio
 import discord
 from discord import ButtonStyle, Interaction
 from discord.ui import InputText, View
+from bot import llm_pool
 from bot.card_display import get_cards
 from bot.gpt_player import GPTPlayer
+from bot.search_player import SEARCH_MODEL, SearchPlayer
 from config.log_config import logger
 from db.db_utils import DatabaseManager
 from db.enums import ActionType, Round
+from game.all_in_ev import all_in_equity
+from game.opponent_model import opponent_model
 from game.poker import PokerGameManager
 
 
 class DiscordPokerManager:
     def __init__(self, ctx, pokerGame: PokerGameManager, db_manager: DatabaseManager, small_cards: bool, timeout: float,
                  model_name: str = "gpt-4.1-nano"):
+        # seat 0 is the Discord user and seat 1 the bot, larger tables have no UI yet
+        if len(pokerGame.players) != 2:
+            raise ValueError("Discord games are heads-up, the table must have two seats")
         self.ctx = ctx
         self.pokerGame: PokerGameManager = pokerGame
         self.db_manager: DatabaseManager = db_manager
         self.small_cards: bool = small_cards
         self.timeout: float = timeout
         self.model_name: str = model_name
+        self.decision: asyncio.Task | None = None
+        self.opponent = opponent_model(db_manager.discord_id, db_manager.load_opponent_stats)
 
         db_manager.initialize_game(pokerGame.small_blind, pokerGame.big_blind, pokerGame.starting_stack)
 
     async def play_round(self):
         self.pokerGame.new_round()
-        self.gpt_action = GPTPlayer(self.db_manager, model_name=self.model_name)
+        self.opponent.start_hand()
+        if self.model_name == SEARCH_MODEL:
+            self.gpt_action = SearchPlayer(self.db_manager)
+        else:
+            self.gpt_action = GPTPlayer(self.db_manager, model_name=self.model_name, opponent=self.opponent)
         self.db_manager.initialize_hand(self.pokerGame.return_player_hand_str(0), self.pokerGame.return_player_hand_str(1), self.pokerGame.return_player_stack(0))
         logger.info(f"{self.ctx.author.name} - Starting a new round.")
         logger.info(f"{self.ctx.author.name} - Player has {self.pokerGame.return_player_stack(0)} chips, PokerGPT has {self.pokerGame.return_player_stack(1)} chips.")
@@ -129,7 +143,7 @@ class DiscordPokerManager:
             self.pokerGame.player_raise(1, self.pokerGame.small_blind)
             self.pokerGame.player_raise(0, self.pokerGame.big_blind)
 
-            action, raise_amount = self.gpt_action.pre_flop_small_blind(self.pokerGame)
+            action, raise_amount = await self.bot_decision(self.gpt_action.apre_flop_small_blind(self.pokerGame))
             if action == ActionType.CALL:
                 logger.info(f"{self.ctx.author.name} - PokerGPT Calls.")
                 await self.ctx.send("PokerGPT __Calls.__")
@@ -151,6 +165,7 @@ class DiscordPokerManager:
         self.pokerGame.reset_betting()
         if round_name == Round.FLOP:
             self.pokerGame.deal_board(3)
+            self.opponent.saw_flop()
         elif round_name == Round.TURN:
             self.pokerGame.deal_board(4)
         elif round_name == Round.RIVER:
@@ -175,6 +190,14 @@ class DiscordPokerManager:
     async def showdown(self):
         await self.ctx.send("***Showdown!!***")
         self.pokerGame.round = Round.SHOWDOWN
+
+        # Both players are all in before the river, score the hand by equity as well
+        all_in = {}
+        if len(self.pokerGame.board) < 5:
+            equity = await asyncio.to_thread(all_in_equity, self.pokerGame.return_player_hand(0),
+                                             self.pokerGame.return_player_hand(1), list(self.pokerGame.board))
+            all_in = {"all_in_board": len(self.pokerGame.board), "all_in_pot": self.pokerGame.current_pot,
+                      "all_in_equity": equity}
         
         # Deal and Display the community cards
         self.pokerGame.deal_board(5)
@@ -196,6 +219,7 @@ class DiscordPokerManager:
 
         # Determine the winner(s) and handle the pot
         winner = self.pokerGame.determine_winner()
+        self.opponent.showdown(None if isinstance(winner, list) else winner is self.pokerGame.players[0])
         if isinstance(winner, list):
             # Split pot
             logger.info(f"{self.ctx.author.name} - Split pot")
@@ -214,14 +238,15 @@ class DiscordPokerManager:
 
         # Check if either player is out of chips
         self.db_manager.update_community_cards(self.pokerGame.return_community_cards())
-        self.db_manager.end_hand(self.pokerGame.return_player_stack(0), Round.SHOWDOWN)
+        self.db_manager.end_hand(self.pokerGame.return_player_stack(0), Round.SHOWDOWN, **all_in)
+        self.end_hand()
         embed = self.result_embed()
         if self.pokerGame.return_player_stack(0) == 0:
             await self.ctx.send(f"{self.pokerGame.players[1].player_name} wins the game! {self.pokerGame.players[0].player_name} is out of chips.", embeds=[embed])
-            self.db_manager.end_game(self.pokerGame.return_player_stack(0))
+            self.end_game()
         elif self.pokerGame.return_player_stack(1) == 0:
             await self.ctx.send(f"{self.pokerGame.players[0].player_name} wins the game! {self.pokerGame.players[1].player_name} is out of chips.", embeds=[embed])
-            self.db_manager.end_game(self.pokerGame.return_player_stack(0))
+            self.end_game()
         else:
             # Prompt to play another round
             await self.ctx.respond("Play another round?")
@@ -232,7 +257,7 @@ class DiscordPokerManager:
         await self.ctx.send(f"What do you want to do?", view=view)
 
     async def pokerGPT_acts_first(self):
-        action, raise_amount = self.gpt_action.first_to_act(self.pokerGame)
+        action, raise_amount = await self.bot_decision(self.gpt_action.afirst_to_act(self.pokerGame))
 
         if action == ActionType.CHECK:
             logger.info(f"{self.ctx.author.name} - PokerGPT Checks.")
@@ -250,10 +275,11 @@ class DiscordPokerManager:
     async def user_raise(self, amount: int):
         logger.info(f"{self.ctx.author.name} - User raises to {amount} chips")
         # Raise the player's bet
+        self.opponent.record(ActionType.RAISE, self.pokerGame)
         self.pokerGame.player_raise(0, amount)
 
         # Get GPT's move and handle it
-        action, raise_amount = self.gpt_action.player_raise(self.pokerGame)
+        action, raise_amount = await self.bot_decision(self.gpt_action.aplayer_raise(self.pokerGame))
 
         if action == ActionType.CALL:
             logger.info(f"{self.ctx.author.name} - PokerGPT Calls.")
@@ -289,8 +315,9 @@ class DiscordPokerManager:
 
     async def user_all_in(self):
         logger.info(f"{self.ctx.author.name} - User goes All-in")
+        self.opponent.record(ActionType.ALL_IN, self.pokerGame)
         self.pokerGame.player_all_in_raise(0)
-        action, raise_amount = self.gpt_action.player_all_in(self.pokerGame)
+        action, raise_amount = await self.bot_decision(self.gpt_action.aplayer_all_in(self.pokerGame))
 
         if action == ActionType.CALL:
             logger.info(f"{self.ctx.author.name} - PokerGPT Calls All-in.")
@@ -312,6 +339,7 @@ class DiscordPokerManager:
 
     async def user_fold(self):
         logger.info(f"{self.ctx.author.name} - User Folds.")
+        self.opponent.record(ActionType.FOLD, self.pokerGame)
         await self.ctx.send(f"PokerGPT wins __{self.pokerGame.current_pot} chips.__")
         self.pokerGame.player_win(1)
         await self.ctx.send(f"You have {self.pokerGame.return_player_stack(0)} chips.")
@@ -330,9 +358,35 @@ class DiscordPokerManager:
     async def new_round_prompt(self):
         self.db_manager.update_community_cards(self.pokerGame.return_community_cards())
         self.db_manager.end_hand(self.pokerGame.return_player_stack(0), self.pokerGame.round)
+        self.end_hand()
         await self.ctx.respond("Play another round?")
         await self.ctx.send("", view=self.newRoundView(self))
 
+    # awaits PokerGPT's decision as a task, so ending the game can cancel a pending call
+    async def bot_decision(self, decision):
+        self.decision = asyncio.ensure_future(decision)
+        try:
+            return await self.decision
+        finally:
+            self.decision = None
+
+    def cancel_decision(self):
+        if self.decision is not None and not self.decision.done():
+            self.decision.cancel()
+
+    # saves the opponent model every few hands and when the game ends
+    def end_hand(self):
+        if self.opponent.end_hand():
+            self.opponent.save(self.db_manager.save_opponent_stats)
+
+    def end_game(self):
+        self.cancel_decision()
+        self.opponent.save(self.db_manager.save_opponent_stats)
+        self.db_manager.end_game(self.pokerGame.return_player_stack(0))
+        if self.pokerGame.history is not None:
+            self.pokerGame.history.close()
+        logger.info(llm_pool.stats.summary())
+
     async def move_to_next_betting_round(self):
         self.pokerGame.current_action = self.pokerGame.button
         if self.pokerGame.round == Round.PRE_FLOP:
@@ -351,7 +405,7 @@ class DiscordPokerManager:
                 await self.move_to_next_betting_round()
                 return
             if self.pokerGame.button == 0:
-                action, raise_amount = self.gpt_action.pre_flop_big_blind(self.pokerGame)
+                action, raise_amount = await self.bot_decision(self.gpt_action.apre_flop_big_blind(self.pokerGame))
                 
                 if action == ActionType.CHECK:
                     logger.info(f"{self.ctx.author.name} - PokerGPT Checks.")
@@ -389,7 +443,7 @@ class DiscordPokerManager:
                 elif self.pokerGame.current_action == 0:
                     await self.move_to_next_betting_round()
             elif self.pokerGame.button == 1:
-                action, raise_amount = self.gpt_action.player_check(self.pokerGame)
+                action, raise_amount = await self.bot_decision(self.gpt_action.aplayer_check(self.pokerGame))
 
                 if action == ActionType.CHECK:
                     logger.info(f"{self.ctx.author.name} - PokerGPT Checks.")
@@ -477,6 +531,7 @@ class DiscordPokerManager:
             if await self.check(interaction):
                 logger.info(f"{self.ctx.author.name} - User Calls.")
                 self.responded = True
+                self.pokerManager.opponent.record(ActionType.CALL, self.pokerGame)
                 self.pokerGame.player_call(0)
                 if self.message:
                     await self.message.edit(content="You __Call.__", view=None)
@@ -517,6 +572,7 @@ class DiscordPokerManager:
         async def on_timeout(self):
             if not self.responded:
                 logger.info(f"{self.ctx.author.name} - User Checks.")
+                self.pokerManager.opponent.record(ActionType.CHECK, self.pokerGame)
                 if self.message:
                     await self.message.edit(content="You took too long! You __Check.__", view=None)
                 await self.pokerManager.next_action()
@@ -530,6 +586,7 @@ class DiscordPokerManager:
             if await self.check(interaction):
                 logger.info(f"{self.ctx.author.name} - User Checks.")
                 self.responded = True
+                self.pokerManager.opponent.record(ActionType.CHECK, self.pokerGame)
                 if self.message:
                     await self.message.edit(content="You __Check.__", view=None)
                 await self.pokerManager.next_action()
@@ -574,6 +631,7 @@ class DiscordPokerManager:
                 self.responded = True
                 if self.message:
                     await self.message.edit(content="You __Call the All-in.__", view=None)
+                self.pokerManager.opponent.record(ActionType.CALL, self.pokerGame)
                 self.pokerGame.player_call(0)
                 await self.pokerManager.showdown()
 
@@ -596,7 +654,7 @@ class DiscordPokerManager:
 
         async def on_timeout(self):
             if self.responded == False:
-                self.db_manager.end_game(self.pokerGame.return_player_stack(0))
+                self.pokerManager.end_game()
                 embed = self.pokerManager.result_embed()
                 if self.message:
                     await self.message.edit(content="*Game Ended*", view=None, embeds=[embed])
@@ -617,7 +675,7 @@ class DiscordPokerManager:
         async def end_game_button_callback(self, button, interaction):
             if await self.check(interaction):
                 self.responded = True
-                self.db_manager.end_game(self.pokerGame.return_player_stack(0))
+                self.pokerManager.end_game()
                 embed = self.pokerManager.result_embed()
                 if self.message:
                     await self.message.edit(content="*Game Ended*", view=None, embeds=[embed])
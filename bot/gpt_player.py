@@ -1,17 +1,25 @@
+import asyncio
 import json
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain.prompts.chat import ChatPromptTemplate
+from bot import llm_pool
+from config.log_config import logger
 from game.poker import PokerGameManager
 from db.db_utils import DatabaseManager
 from db.enums import ActionType
+from game.opponent_model import OpponentModel
+from game.solver import push_fold_action
+from game.texture import describe
 
-class GPTPlayer:
-    def __init__(self, db: DatabaseManager, model_name="gpt-4.1-nano"):
-        self.db = db
-        llm = ChatOpenAI(model_name=model_name)
-        output_parser = StrOutputParser()
-        template = '''
+# seconds an async decision waits for the model before the default move is played
+DEFAULT_TIMEOUT = 20.0
+# rate limits, dropped connections and server errors also fall back to the default move
+API_ERRORS = (openai.OpenAIError, httpx.HTTPError)
+
+SYSTEM_TEMPLATE = '''
         Imagine you're a poker bot in a heads-up Texas Hold'em game. Your play is optimal, 
         mixing strategic bluffs and strong hands. You raise on strength, going All-in only with the best hands. 
         Folding against a superior opponent hand, you call and check when fitting. Remember, only "call" the ALL-IN if your hand is better. 
@@ -20,13 +28,39 @@ class GPTPlayer:
         "action": "your action", "raise_amount": your raise amount if applicable}}
         Note: If the action you chose doesn't involve a raise, please do not include the "raise_amount" key in your JSON response.
         '''
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", template),
-            ("user", "{input}")
-        ])
 
-        self.chain = prompt | llm | output_parser
+_chains = {}
+
+
+# The prompt | model | parser chain of a model, compiled once per process and shared by
+# every game. The model talks to the API through the shared pools of llm_pool.
+def shared_chain(model_name: str):
+    chain = _chains.get(model_name)
+    if chain is not None:
+        llm_pool.stats.chain_hits += 1
+        return chain
+    sync_client, async_client = llm_pool.openai_clients()
+    llm = ChatOpenAI(model_name=model_name, client=sync_client.chat.completions,
+                     async_client=async_client.chat.completions)
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_TEMPLATE),
+        ("user", "{input}")
+    ])
+    chain = _chains[model_name] = prompt | llm | StrOutputParser()
+    llm_pool.stats.chains_built += 1
+    return chain
+
+
+class GPTPlayer:
+    # Every decision has a blocking version and an async one (a-prefixed, like langchain's
+    # ainvoke). The Discord handler awaits the async ones so a slow completion only holds
+    # up its own game; a call that runs past timeout gives the default move instead.
+    def __init__(self, db: DatabaseManager, model_name="gpt-4.1-nano", opponent: OpponentModel | None = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.db = db
+        self.opponent = opponent
+        self.timeout = timeout
+        self.chain = shared_chain(model_name)
         
     def _extract_action(self, json_string, pokerGame: PokerGameManager):
         min_raise, max_raise = pokerGame.return_min_max_raise(1)
@@ -51,12 +85,76 @@ class GPTPlayer:
         except Exception as erro:
             return ("Default", 0)
 
+    # short-stacked push/fold spots are answered from the solved charts without the LLM
+    def _charted_action(self, pokerGame: PokerGameManager):
+        charted = push_fold_action(pokerGame, 1)
+        if charted is not None:
+            action, raise_amount = charted
+            self.db.record_gpt_action(action, raise_amount, json.dumps({"action": action.value, "source": "push/fold chart"}))
+        return charted
+
+    def _decide(self, prompt: str, pokerGame: PokerGameManager):
+        response = self.chain.invoke({'input': prompt})
+        return self._extract_action(response, pokerGame)
+
+    async def _adecide(self, prompt: str, pokerGame: PokerGameManager):
+        try:
+            response = await asyncio.wait_for(self.chain.ainvoke({'input': prompt}), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No decision from the model within {self.timeout} seconds, playing the default move")
+            return ("Default", 0)
+        except API_ERRORS as error:
+            logger.warning(f"Model call failed ({type(error).__name__}: {error}), playing the default move")
+            return ("Default", 0)
+        return self._extract_action(response, pokerGame)
 
     def pre_flop_small_blind(self, pokerGame: PokerGameManager):
         # return Call, Raise, Fold or All-in
+        return self._charted_action(pokerGame) or self._decide(self._pre_flop_small_blind_prompt(pokerGame), pokerGame)
+
+    async def apre_flop_small_blind(self, pokerGame: PokerGameManager):
+        return self._charted_action(pokerGame) or await self._adecide(self._pre_flop_small_blind_prompt(pokerGame), pokerGame)
+
+    def pre_flop_big_blind(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(self._pre_flop_big_blind_prompt(pokerGame), pokerGame)
+
+    async def apre_flop_big_blind(self, pokerGame: PokerGameManager):
+        return await self._adecide(self._pre_flop_big_blind_prompt(pokerGame), pokerGame)
+
+    def first_to_act(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(self._first_to_act_prompt(pokerGame), pokerGame)
+
+    async def afirst_to_act(self, pokerGame: PokerGameManager):
+        return await self._adecide(self._first_to_act_prompt(pokerGame), pokerGame)
+
+    def player_check(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(self._player_check_prompt(pokerGame), pokerGame)
+
+    async def aplayer_check(self, pokerGame: PokerGameManager):
+        return await self._adecide(self._player_check_prompt(pokerGame), pokerGame)
+
+    def player_raise(self, pokerGame: PokerGameManager):
+        # return Call, Raise, All-in, or Fold
+        return self._decide(self._player_raise_prompt(pokerGame), pokerGame)
+
+    async def aplayer_raise(self, pokerGame: PokerGameManager):
+        return await self._adecide(self._player_raise_prompt(pokerGame), pokerGame)
+
+    def player_all_in(self, pokerGame: PokerGameManager):
+        # return Call, or Fold
+        return self._charted_action(pokerGame) or self._decide(self._player_all_in_prompt(pokerGame), pokerGame)
+
+    async def aplayer_all_in(self, pokerGame: PokerGameManager):
+        return self._charted_action(pokerGame) or await self._adecide(self._player_all_in_prompt(pokerGame), pokerGame)
+
+    def _pre_flop_small_blind_prompt(self, pokerGame: PokerGameManager):
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'opponents_stack': pokerGame.return_player_stack(0),
             'hand': pokerGame.players[1].return_long_hand(),
@@ -65,7 +163,7 @@ class GPTPlayer:
         }
 
         human_template = '''
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack and your opponent has {opponents_stack} chips.
         Your hand is {hand}. The pot is {pot} chips.
         You are the small blind and it's your turn.
@@ -73,15 +171,13 @@ class GPTPlayer:
         What action would you take? (Call, Raise, All-in, or Fold)
         '''
 
-        formatted_text = human_template.format(**inputs)
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)
+        return human_template.format(**inputs)
 
-    def pre_flop_big_blind(self, pokerGame: PokerGameManager):
-        # return Check, Raise, or All-in
+    def _pre_flop_big_blind_prompt(self, pokerGame: PokerGameManager):
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'opponents_stack': pokerGame.return_player_stack(0),
             'hand': pokerGame.players[1].return_long_hand(),
@@ -90,7 +186,7 @@ class GPTPlayer:
         }
 
         human_template = '''
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack and your opponent has {opponents_stack} chips.
         Your hand is {hand}. The pot is {pot} chips.
         You are the small blind and it's your turn.
@@ -98,119 +194,110 @@ class GPTPlayer:
         What action would you take? (Check, Raise, or All-in)
         '''
 
-        formatted_text = human_template.format(**inputs)
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)
+        return human_template.format(**inputs)
     
-    def first_to_act(self, pokerGame: PokerGameManager):
-        # return Check, Raise, or All-in
+    def _first_to_act_prompt(self, pokerGame: PokerGameManager):
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'opponents_stack': pokerGame.return_player_stack(0),
             'hand': pokerGame.players[1].return_long_hand(),
             'pot': pokerGame.current_pot,
             'round': pokerGame.round,
-            'community_cards': pokerGame.return_community_cards()
+            'community_cards': pokerGame.return_community_cards(),
+            'texture': describe(pokerGame.return_player_hand(1), pokerGame.board)
         }
 
         human_template = '''
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack and your opponent has {opponents_stack} chips.
         Your hand is {hand}. The pot is {pot} chips.
-        It's the {round} round and you're first to act. The community cards are {community_cards}.
+        It's the {round} round and you're first to act. The community cards are {community_cards}. {texture}
         What action would you take? (Check, Raise, or All-in)
         '''
 
-        formatted_text = human_template.format(**inputs)
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)
+        return human_template.format(**inputs)
     
-    def player_check(self, pokerGame: PokerGameManager):
-        # return Check, Raise, or All-in
+    def _player_check_prompt(self, pokerGame: PokerGameManager):
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'opponents_stack': pokerGame.return_player_stack(0),
             'hand': pokerGame.players[1].return_long_hand(),
             'pot': pokerGame.current_pot,
             'round': pokerGame.round,
-            'community_cards': pokerGame.return_community_cards()
+            'community_cards': pokerGame.return_community_cards(),
+            'texture': describe(pokerGame.return_player_hand(1), pokerGame.board)
         }
 
         human_template = """
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack and your opponent has {opponents_stack} chips.
         Your hand is {hand}. The pot is {pot} chips.
-        It is the {round} round and the action checks to you. The community cards are {community_cards}.
+        It is the {round} round and the action checks to you. The community cards are {community_cards}. {texture}
         Based on this information, what action would you like to take? (Check, Raise, or All-in).
         """        
         
-        formatted_text = human_template.format(**inputs)
-
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)
+        return human_template.format(**inputs)
     
-    def player_raise(self, pokerGame: PokerGameManager):
-        # return Call, Raise, All-in, or Fold
+    def _player_raise_prompt(self, pokerGame: PokerGameManager):
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'opponents_stack': pokerGame.return_player_stack(0),
             'hand': pokerGame.players[1].return_long_hand(),
             'pot': pokerGame.current_pot,
             'round': pokerGame.round,
             'community_cards': pokerGame.return_community_cards(),
+            'texture': describe(pokerGame.return_player_hand(1), pokerGame.board),
             'opponent_raise': pokerGame.current_bet,
             'amount_to_call': pokerGame.current_bet - pokerGame.players[1].round_pot_commitment
         }
 
         human_template = '''
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack and your opponent has {opponents_stack} chips.
         Your hand is {hand}. The pot is {pot} chips.
-        It's the {round} round. The community cards are {community_cards}.
+        It's the {round} round. The community cards are {community_cards}. {texture}
         Your opponent has raised to {opponent_raise} chips.
         It costs {amount_to_call} chips to call.
         What action would you take? (Call, Raise, All-in, or Fold)
         '''
 
-        formatted_text = human_template.format(**inputs)
+        return human_template.format(**inputs)
 
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)  
-
-    def player_all_in(self, pokerGame: PokerGameManager):
-        # return Call, or Fold
+    def _player_all_in_prompt(self, pokerGame: PokerGameManager):
         amount_to_call = pokerGame.current_bet - pokerGame.players[1].round_pot_commitment
         if amount_to_call > pokerGame.return_player_stack(1):
             amount_to_call = pokerGame.return_player_stack(1)
         inputs = {
             'small_blind': pokerGame.small_blind,
             'big_blind': pokerGame.big_blind,
+            'opponent': self.opponent.summary() if self.opponent is not None else '',
             'stack': pokerGame.return_player_stack(1),
             'hand': pokerGame.players[1].return_long_hand(),
             'pot': pokerGame.current_pot,
             'round': pokerGame.round,
             'community_cards': pokerGame.return_community_cards(),
+            'texture': describe(pokerGame.return_player_hand(1), pokerGame.board),
             'opponent_raise': pokerGame.current_bet,
             'amount_to_call': amount_to_call
         }
 
         human_template = '''
-        The small blind is {small_blind} chips and the big blind is {big_blind} chips.
+        The small blind is {small_blind} chips and the big blind is {big_blind} chips. {opponent}
         You have {stack} chips in your stack.
         Your hand is {hand}. The pot is {pot} chips.
-        It's the {round} round. The community cards are {community_cards}.
+        It's the {round} round. The community cards are {community_cards}. {texture}
         Your opponent has gone all in for {opponent_raise} chips.
         It costs {amount_to_call} chips to call.
         What action would you take? (Call, or Fold)
         '''
 
-        formatted_text = human_template.format(**inputs)
-        
-        response = self.chain.invoke({'input': formatted_text})
-        return self._extract_action(response, pokerGame)
+        return human_template.format(**inputs)
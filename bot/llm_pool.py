@@ -0,0 +1,85 @@
+import httpx
+import openai
+
+# Process-wide HTTP clients for the OpenAI API. Every model and every game sends its
+# completions through the same sync and async connection pools, so a hand reuses a
+# kept-alive connection instead of opening a new one with its own TLS handshake. Each
+# request carries an httpcore trace hook that counts new connections and handshakes,
+# the difference to the number of requests is how often a connection was reused.
+POOL_SIZE = 20
+KEEPALIVE_SECONDS = 120.0
+LIMITS = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE,
+                      keepalive_expiry=KEEPALIVE_SECONDS)
+REQUEST_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+_clients = None
+
+
+class PoolStats:
+    __slots__ = ("requests", "connections", "handshakes", "chains_built", "chain_hits")
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.handshakes = 0
+        self.chains_built = 0
+        self.chain_hits = 0
+
+    # requests sent over a connection an earlier request opened
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+    def as_dict(self) -> dict:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["reused"] = self.reused
+        stats["pool_size"] = POOL_SIZE
+        return stats
+
+    def summary(self) -> str:
+        return (f"LLM pool: {self.requests} requests over {self.connections} connections ({self.reused} reused, "
+                f"{self.handshakes} TLS handshakes, pool size {POOL_SIZE}), "
+                f"{self.chains_built} chains built, {self.chain_hits} reused")
+
+
+stats = PoolStats()
+
+
+def _count(name: str):
+    if name == "connection.connect_tcp.complete":
+        stats.connections += 1
+    elif name == "connection.start_tls.complete":
+        stats.handshakes += 1
+
+
+def _trace(name: str, info: dict):
+    _count(name)
+
+
+async def _atrace(name: str, info: dict):
+    _count(name)
+
+
+def _on_request(request: httpx.Request):
+    stats.requests += 1
+    request.extensions["trace"] = _trace
+
+
+async def _on_arequest(request: httpx.Request):
+    stats.requests += 1
+    request.extensions["trace"] = _atrace
+
+
+# the shared httpx.Client and httpx.AsyncClient, built on first use
+def http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    global _clients
+    if _clients is None:
+        _clients = (httpx.Client(limits=LIMITS, timeout=REQUEST_TIMEOUT, event_hooks={"request": [_on_request]}),
+                    httpx.AsyncClient(limits=LIMITS, timeout=REQUEST_TIMEOUT, event_hooks={"request": [_on_arequest]}))
+    return _clients
+
+
+# OpenAI clients on the shared pools, for ChatOpenAI(client=..., async_client=...)
+def openai_clients() -> tuple[openai.OpenAI, openai.AsyncOpenAI]:
+    sync_client, async_client = http_clients()
+    return openai.OpenAI(http_client=sync_client), openai.AsyncOpenAI(http_client=async_client)
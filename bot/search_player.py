@@ -0,0 +1,83 @@
+import asyncio
+import json
+from config.log_config import logger
+from db.db_utils import DatabaseManager
+from db.enums import ActionType
+from game.game_state import GameState
+from game.poker import PokerGameManager
+from game.search import DEFAULT_BUDGET, search
+from game.solver import push_fold_action
+
+SEARCH_MODEL = "search"
+
+class SearchPlayer:
+    # Plays the same decisions as GPTPlayer without a network call, by tree search over
+    # the hands the opponent could hold, within budget seconds per decision. The async
+    # versions run the search in a worker thread to keep the event loop free.
+    def __init__(self, db: DatabaseManager, budget: float = DEFAULT_BUDGET, workers: int | None = None):
+        self.db = db
+        self.budget = budget
+        self.workers = workers
+
+    # searches PokerGPT's decision, acted says whether the opponent already acted this round
+    def _decide(self, pokerGame: PokerGameManager, acted: bool):
+        charted = push_fold_action(pokerGame, 1)
+        if charted is not None:
+            action, raise_amount = charted
+            self.db.record_gpt_action(action, raise_amount, json.dumps({"action": action.value, "source": "push/fold chart"}))
+            return charted
+        state = GameState.from_game(pokerGame, to_act=1, acted=1 if acted else 0)
+        result = search(state, pokerGame.return_player_hand(1), pokerGame.board, budget=self.budget, workers=self.workers)
+        action, raise_amount = result.best
+        if action == ActionType.ALL_IN:
+            raise_amount = pokerGame.return_player_stack(1)
+        logger.info(f"Search decision {action.value} {raise_amount} from {result}")
+
+        visits = {f"{move.value}{'' if amount is None else ' ' + str(amount)}": stat[0]
+                  for (move, amount), stat in result.stats.items()}
+        json_string = json.dumps({"action": action.value, "raise_amount": raise_amount, "iterations": result.iterations,
+                                  "seconds": round(result.seconds, 3), "visits": visits})
+        self.db.record_gpt_action(action, raise_amount, json_string)
+        return (action, raise_amount)
+
+    def pre_flop_small_blind(self, pokerGame: PokerGameManager):
+        # return Call, Raise, Fold or All-in
+        return self._decide(pokerGame, acted=False)
+
+    async def apre_flop_small_blind(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.pre_flop_small_blind, pokerGame)
+
+    def pre_flop_big_blind(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(pokerGame, acted=True)
+
+    async def apre_flop_big_blind(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.pre_flop_big_blind, pokerGame)
+
+    def first_to_act(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(pokerGame, acted=False)
+
+    async def afirst_to_act(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.first_to_act, pokerGame)
+
+    def player_check(self, pokerGame: PokerGameManager):
+        # return Check, Raise, or All-in
+        return self._decide(pokerGame, acted=True)
+
+    async def aplayer_check(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.player_check, pokerGame)
+
+    def player_raise(self, pokerGame: PokerGameManager):
+        # return Call, Raise, All-in, or Fold
+        return self._decide(pokerGame, acted=True)
+
+    async def aplayer_raise(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.player_raise, pokerGame)
+
+    def player_all_in(self, pokerGame: PokerGameManager):
+        # return Call, or Fold
+        return self._decide(pokerGame, acted=True)
+
+    async def aplayer_all_in(self, pokerGame: PokerGameManager):
+        return await asyncio.to_thread(self.player_all_in, pokerGame)
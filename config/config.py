@@ -14,3 +14,6 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_DATABASE = os.getenv("DB_NAME")
 
 DATABASE_EXISTS = all([DB_HOST, DB_USER, DB_PASSWORD, DB_DATABASE])
+
+# Optional binary hand history log, appended to by every game
+HAND_LOG_PATH = os.getenv("HAND_LOG_PATH")
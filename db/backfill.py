@@ -0,0 +1,102 @@
+import argparse
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from sqlalchemy import create_engine, func, inspect, text
+from sqlalchemy.orm import Session, sessionmaker
+from db.models import Base, Game, Hand, Server, ServerUser, User
+from game.all_in_ev import all_in_equities, all_in_ev_net, parse_cards
+
+# Recomputes the all-in adjusted ev_net_bb of every hand in the hands table and the
+# totals of every user, server and server user. Hands are read in batches of
+# batch_size by id, the all-in hands of a batch are scored with one vectorized
+# equity call per board size, and the totals are summed by the database. Hands that
+# were not decided by an all-in runout keep their net_bb. Safe to run again.
+BATCH_SIZE = 10_000
+
+
+# adds model columns that older tables lack and creates missing tables
+def add_missing_columns(engine):
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                                            f"{column.type.compile(engine.dialect)}"))
+    Base.metadata.create_all(engine)
+
+
+def _quantize(value) -> Decimal:
+    return Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+# ev_net_bb of one batch of (id, cards, gpt_cards, community_cards, all_in_board,
+# all_in_pot, net_bb, big_blind) rows
+def batch_ev(rows: list) -> list[dict]:
+    updates = {row[0]: row[6] or 0 for row in rows}
+    by_board = {}
+    for row in rows:
+        if row[4] is not None:
+            by_board.setdefault(row[4], []).append(row)
+    for dealt, spots in by_board.items():
+        heroes = np.array([parse_cards(row[1]) for row in spots])
+        opponents = np.array([parse_cards(row[2]) for row in spots])
+        boards = np.array([parse_cards(row[3])[:dealt] for row in spots]).reshape(len(spots), dealt)
+        for row, equity in zip(spots, all_in_equities(heroes, opponents, boards)):
+            updates[row[0]] = all_in_ev_net(row[5], equity) / float(row[7])
+    return [{"id": hand_id, "ev_net_bb": _quantize(ev)} for hand_id, ev in updates.items()]
+
+
+# recomputes every hand after after_id, returns the number of hands updated
+def backfill_ev(session: Session, batch_size: int = BATCH_SIZE, after_id: int = 0, progress=None) -> int:
+    updated = 0
+    while True:
+        rows = (session.query(Hand.id, Hand.cards, Hand.gpt_cards, Hand.community_cards, Hand.all_in_board,
+                              Hand.all_in_pot, Hand.net_bb, Game.big_blind)
+                .join(Game, Hand.game_id == Game.id)
+                .filter(Hand.id > after_id)
+                .order_by(Hand.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        session.bulk_update_mappings(Hand, batch_ev(rows))
+        session.commit()
+        updated += len(rows)
+        after_id = rows[-1][0]
+        if progress is not None:
+            progress(updated, after_id)
+    update_totals(session)
+    return updated
+
+
+# sums hands.ev_net_bb into the user, server and server user totals
+def update_totals(session: Session):
+    total = func.coalesce(func.sum(Hand.ev_net_bb), 0)
+    users = session.query(Hand.user_id, total).group_by(Hand.user_id).all()
+    session.bulk_update_mappings(User, [{"id": user_id, "ev_net_bb_total": ev} for user_id, ev in users])
+    servers = session.query(Hand.server_id, total).group_by(Hand.server_id).all()
+    session.bulk_update_mappings(Server, [{"id": server_id, "ev_net_bb_total": ev} for server_id, ev in servers])
+    server_users = {(row.server_id, row.user_id): row.id for row in session.query(ServerUser)}
+    pairs = session.query(Hand.server_id, Hand.user_id, total).group_by(Hand.server_id, Hand.user_id).all()
+    session.bulk_update_mappings(ServerUser, [{"id": server_users[(server_id, user_id)], "ev_net_bb_total_on_server": ev}
+                                              for server_id, user_id, ev in pairs if (server_id, user_id) in server_users])
+    session.commit()
+
+
+if __name__ == "__main__":
+    from init_db import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Recompute all-in adjusted EV over the hands table")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this hand id")
+    args = parser.parse_args()
+    engine = create_engine(DATABASE_URL)
+    add_missing_columns(engine)
+    session = sessionmaker(bind=engine)()
+    total = backfill_ev(session, args.batch_size, args.after_id,
+                        progress=lambda hands, last_id: print(f"{hands} hands, up to id {last_id}"))
+    print(f"Recomputed ev_net_bb for {total} hands")
@@ -3,9 +3,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from decimal import Decimal, ROUND_HALF_UP
-from db.models import ActionType, User, Server, Game, Hand, GPTAction, ServerUser
+from db.models import ActionType, User, Server, Game, Hand, GPTAction, ServerUser, OpponentStats
 from db.enums import GameResult, HandResult, Round
 from config.config import DATABASE_EXISTS
+from game.all_in_ev import all_in_ev_net
 
 
 class DatabaseManager:
@@ -109,7 +110,10 @@ class DatabaseManager:
         self.game.total_hands += 1
         self._safe_commit()
 
-    def end_hand(self, ending_stack: int, end_round: Round):
+    # all_in_board, all_in_pot and all_in_equity describe a pot both players were all in
+    # for before the river, the hand is then also scored by the user's equity
+    def end_hand(self, ending_stack: int, end_round: Round, all_in_board: int | None = None, all_in_pot: int = 0,
+                 all_in_equity: float = 0.5):
         if not DATABASE_EXISTS:
             return
 
@@ -117,6 +121,12 @@ class DatabaseManager:
         net_bb = (delta / self.big_blind).quantize(
             Decimal("0.01"), rounding=ROUND_HALF_UP
         )
+        if all_in_board is None:
+            ev_net_bb = net_bb
+        else:
+            ev_net_bb = (Decimal(all_in_ev_net(all_in_pot, all_in_equity)) / self.big_blind).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
 
         if net_bb > 0:
             result = HandResult.WIN
@@ -127,9 +137,13 @@ class DatabaseManager:
         else:
             result = HandResult.SPLIT_POT
             self._update_draws()
+        self._update_ev(ev_net_bb)
 
         self.hand.ending_stack = ending_stack
         self.hand.net_bb = net_bb
+        self.hand.ev_net_bb = ev_net_bb
+        self.hand.all_in_board = all_in_board
+        self.hand.all_in_pot = all_in_pot if all_in_board is not None else None
         self.hand.result = result
         self.hand.end_round = end_round
         self._safe_commit()
@@ -226,6 +240,11 @@ class DatabaseManager:
 
         self._safe_commit()
 
+    def _update_ev(self, ev_net_bb: Decimal):
+        self.server.ev_net_bb_total = Decimal(self.server.ev_net_bb_total or 0) + ev_net_bb
+        self.user.ev_net_bb_total = Decimal(self.user.ev_net_bb_total or 0) + ev_net_bb
+        self.server_user.ev_net_bb_total_on_server = Decimal(self.server_user.ev_net_bb_total_on_server or 0) + ev_net_bb
+
     def update_community_cards(self, community_cards: str):
         if not DATABASE_EXISTS:
             return
@@ -247,15 +266,35 @@ class DatabaseManager:
         self.session.add(action)
         self._safe_commit()
 
+    def load_opponent_stats(self) -> dict | None:
+        if not DATABASE_EXISTS:
+            return None
+        stats = self.session.query(OpponentStats).filter_by(user_id=self.user.id).first()
+        if not stats:
+            return None
+        return {column.name: getattr(stats, column.name) for column in OpponentStats.__table__.columns
+                if column.name not in ("id", "user_id")}
+
+    def save_opponent_stats(self, counts: dict):
+        if not DATABASE_EXISTS:
+            return
+        stats = self.session.query(OpponentStats).filter_by(user_id=self.user.id).first()
+        if not stats:
+            stats = OpponentStats(user_id=self.user.id)
+            self.session.add(stats)
+        for name, value in counts.items():
+            setattr(stats, name, value)
+        self._safe_commit()
+
     def get_top_players(self, limit=10):
-        return self.session.query(User.username, User.net_bb_total).order_by(User.net_bb_total.desc()).limit(limit).all()
+        return self.session.query(User.username, User.net_bb_total, User.ev_net_bb_total).order_by(User.net_bb_total.desc()).limit(limit).all()
 
     def get_user_stats_of_player(self):
         return self.session.query(
             User.total_hands, User.total_games, User.total_time_played,
             User.net_bb_total, User.net_bb_wins, User.net_bb_losses,
             User.total_wins, User.total_losses, User.total_draws,
-            User.highest_win_streak, User.highest_loss_streak
+            User.highest_win_streak, User.highest_loss_streak, User.ev_net_bb_total
         ).filter_by(discord_id=self.discord_id).first()
 
     def get_user_place(self):
@@ -267,17 +306,17 @@ class DatabaseManager:
             User.total_hands, User.total_games, User.total_time_played,
             User.net_bb_total, User.net_bb_wins, User.net_bb_losses,
             User.total_wins, User.total_losses, User.total_draws,
-            User.highest_win_streak, User.highest_loss_streak
+            User.highest_win_streak, User.highest_loss_streak, User.ev_net_bb_total
         ).filter_by(username=username).first()
 
     def get_top_servers(self, limit=10):
-        return self.session.query(Server.server_name, Server.net_bb_wins).order_by(Server.net_bb_wins.desc()).limit(limit).all()
+        return self.session.query(Server.server_name, Server.net_bb_wins, Server.ev_net_bb_total).order_by(Server.net_bb_wins.desc()).limit(limit).all()
 
     def get_server_stats(self):
         return self.session.query(
             Server.total_players, Server.total_hands, Server.total_time_played,
             Server.net_bb_total, Server.net_bb_wins, Server.net_bb_losses,
-            Server.total_wins, Server.total_losses, Server.total_draws
+            Server.total_wins, Server.total_losses, Server.total_draws, Server.ev_net_bb_total
         ).filter_by(host_id=self.host_id).first()
 
     def get_server_place(self):
@@ -288,7 +327,7 @@ class DatabaseManager:
         return self.session.query(
             Server.total_players, Server.total_hands, Server.total_time_played,
             Server.net_bb_total, Server.net_bb_wins, Server.net_bb_losses,
-            Server.total_wins, Server.total_losses, Server.total_draws
+            Server.total_wins, Server.total_losses, Server.total_draws, Server.ev_net_bb_total
         ).filter_by(server_name=server_name).first()
 
     def close(self):
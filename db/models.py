@@ -19,6 +19,7 @@ class Server(Base):
     net_bb_wins = Column(DECIMAL(10, 3), default=0.000)
     net_bb_losses = Column(DECIMAL(10, 3), default=0.000)
     net_bb_total = Column(DECIMAL(10, 3), default=0.000)
+    ev_net_bb_total = Column(DECIMAL(10, 3), default=0.000)
 
 class User(Base):
     __tablename__ = 'users'
@@ -38,6 +39,7 @@ class User(Base):
     net_bb_wins = Column(DECIMAL(10, 3), default=0.000)
     net_bb_losses = Column(DECIMAL(10, 3), default=0.000)
     net_bb_total = Column(DECIMAL(10, 3), default=0.000)
+    ev_net_bb_total = Column(DECIMAL(10, 3), default=0.000)
 
 class ServerUser(Base):
     __tablename__ = 'server_users'
@@ -48,6 +50,7 @@ class ServerUser(Base):
     net_bb_wins_on_server = Column(DECIMAL(10, 3), default=0.000)
     net_bb_losses_on_server = Column(DECIMAL(10, 3), default=0.000)
     net_bb_total_on_server = Column(DECIMAL(10, 3), default=0.000)
+    ev_net_bb_total_on_server = Column(DECIMAL(10, 3), default=0.000)
 
 class Game(Base):
     __tablename__ = 'games'
@@ -77,6 +80,11 @@ class Hand(Base):
     starting_stack = Column(Integer)
     ending_stack = Column(Integer, default=0)
     net_bb = Column(DECIMAL(10, 3), default=0.000)
+    # all-in adjusted net_bb: board cards dealt and chips in the pot when both players
+    # were all in before the river, NULL when the hand was not decided by a runout
+    ev_net_bb = Column(DECIMAL(10, 3), default=0.000)
+    all_in_board = Column(Integer)
+    all_in_pot = Column(Integer)
     result = Column(Enum(HandResult, native_enum=False, values_callable=lambda obj: [e.value for e in obj]), default=HandResult.IN_PROGRESS.value)
     end_round = Column(Enum(Round, native_enum=False, values_callable=lambda obj: [e.value for e in obj]), default=Round.IN_PROGRESS.value)
 
@@ -90,3 +98,21 @@ class GPTAction(Base):
     action_type = Column(Enum(ActionType, native_enum=False, values_callable=lambda obj: [e.value for e in obj]), nullable=False)
     raise_amount = Column(DECIMAL(10, 2))
     json_data = Column(JSON)
+
+class OpponentStats(Base):
+    __tablename__ = 'opponent_stats'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), unique=True)
+    hands = Column(Integer, default=0)
+    vpip = Column(Integer, default=0)
+    pfr = Column(Integer, default=0)
+    three_bet = Column(Integer, default=0)
+    three_bet_chances = Column(Integer, default=0)
+    fold_to_raise = Column(Integer, default=0)
+    faced_raise = Column(Integer, default=0)
+    aggressive = Column(Integer, default=0)
+    calls = Column(Integer, default=0)
+    postflop_actions = Column(Integer, default=0)
+    saw_flop = Column(Integer, default=0)
+    showdowns = Column(Integer, default=0)
+    showdown_wins = Column(Integer, default=0)
@@ -0,0 +1,83 @@
+from functools import lru_cache
+import numpy as np
+from game.batch_evaluator import evaluate_hands
+from game.card import CARDS, Card
+from game.isomorphism import canonical_key
+
+# All-in adjusted results. Once both players are all in before the river, the cards
+# still to come only decide who gets the pot, so a hand is also scored as if the pot
+# had been split by equity. Equity is exact: every runout is enumerated and both
+# hands are scored with the batch evaluator. Spots are laid out as one array of
+# runouts per board size, so many hands are scored with a few array operations; a
+# pre-flop spot alone has 1,712,304 runouts and is cut into chunks of BATCH_ROWS.
+BATCH_ROWS = 1 << 18
+CARD_CODES = {str(card): card.index for card in CARDS}
+
+_combination_tables = {}
+
+
+# every way to choose k of n positions, one sorted row each, built on first use
+def _combinations(n: int, k: int) -> np.ndarray:
+    if (n, k) not in _combination_tables:
+        rows = np.zeros((1, 0), dtype=np.int8)
+        for column in range(k):
+            low = rows[:, -1].astype(np.int64) + 1 if column else np.zeros(1, dtype=np.int64)
+            counts = n - k + column - low + 1
+            offsets = np.repeat(low - np.cumsum(counts) + counts, counts)
+            values = (np.arange(counts.sum()) + offsets).astype(np.int8)
+            rows = np.column_stack([np.repeat(rows, counts, axis=0), values])
+        _combination_tables[(n, k)] = rows
+    return _combination_tables[(n, k)]
+
+
+# hero's share of the pot over every runout, ties count as half. heroes and opponents
+# are (N, 2) card indexes, boards (N, k) with the same 0 to 5 cards dealt in every row.
+def all_in_equities(heroes: np.ndarray, opponents: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    heroes = np.asarray(heroes, dtype=np.intp).reshape(-1, 2)
+    opponents = np.asarray(opponents, dtype=np.intp).reshape(-1, 2)
+    boards = np.asarray(boards, dtype=np.intp).reshape(len(heroes), -1)
+    count, dealt = boards.shape
+    known = np.concatenate([heroes, opponents, boards], axis=1)
+    live = np.ones((count, 52), dtype=bool)
+    live[np.arange(count)[:, None], known] = False
+    if (live.sum(axis=1) != 48 - dealt).any():
+        raise ValueError("Hero, opponent and board cards must all be different")
+    live = np.nonzero(live)[1].reshape(count, 48 - dealt)
+
+    runouts = _combinations(48 - dealt, 5 - dealt)
+    step = min(len(runouts), BATCH_ROWS)
+    spots = max(1, BATCH_ROWS // len(runouts))
+    payoff = np.zeros(count)
+    for first in range(0, count, spots):
+        rows = slice(first, first + spots)
+        for start in range(0, len(runouts), step):
+            cards = live[rows][:, runouts[start:start + step]]
+            shape = cards.shape[:2]
+            full = np.concatenate([np.broadcast_to(boards[rows, None, :], shape + (dealt,)), cards], axis=2)
+            full = full.reshape(-1, 5)
+            hero_scores = evaluate_hands(np.concatenate([np.repeat(heroes[rows], shape[1], axis=0), full], axis=1))
+            opponent_scores = evaluate_hands(np.concatenate([np.repeat(opponents[rows], shape[1], axis=0), full], axis=1))
+            points = (hero_scores > opponent_scores) * 2 + (hero_scores == opponent_scores)
+            payoff[rows] += points.reshape(shape).sum(axis=1)
+    return payoff / (2 * len(runouts))
+
+
+@lru_cache(maxsize=10_000)
+def _spot_equity(hero: tuple, board: tuple, opponent: tuple) -> float:
+    return float(all_in_equities(np.array([hero]), np.array([opponent]), np.array([board]))[0])
+
+
+# equity of one all-in spot, cached by suit-isomorphic spot
+def all_in_equity(hero: list[Card], opponent: list[Card], board: list[Card]) -> float:
+    return _spot_equity(*canonical_key([card.index for card in hero], [card.index for card in board],
+                                       [card.index for card in opponent]))
+
+
+# chips won on average from a heads-up pot both players put the same chips into
+def all_in_ev_net(pot: int, equity: float) -> float:
+    return pot * (equity - 0.5)
+
+
+# card indexes from the strings stored in the hands table, e.g. "AS, 10H"
+def parse_cards(text: str) -> list[int]:
+    return [CARD_CODES[code.strip()] for code in text.split(",") if code.strip()]
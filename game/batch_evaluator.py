@@ -0,0 +1,74 @@
+import argparse
+import time
+import numpy as np
+from game.card import CARDS, RANK_BIT_SHIFT, RANK_SUM_MASK, SUIT_MASK
+from game.evaluator import CATEGORY_SHIFT, FLUSH_SCORES, FLUSH_SUITS, RANK_SCORES
+
+# Vectorized version of game.evaluator.evaluate for arrays of card indexes (Card.index).
+# Hands are scored with the same packed card keys, so the scores are identical to
+# evaluate_cards and compare the same way as Dealer.get_hand_rank.
+CARD_KEYS = np.array([card.key for card in CARDS], dtype=np.int64)
+CARD_SUITS = np.array([card.suit.value for card in CARDS], dtype=np.int8)
+CARD_RANK_BITS = CARD_KEYS >> RANK_BIT_SHIFT
+FLUSH_SCORE_TABLE = np.array(FLUSH_SCORES, dtype=np.int32)
+
+_rank_tables = {}
+
+
+# dense arrays indexed by rank key sum, built the first time a hand size is scored
+def _lookup_tables(num_cards: int):
+    if num_cards not in _rank_tables:
+        scores = RANK_SCORES[num_cards]
+        rank_table = np.zeros(max(scores) + 1, dtype=np.int32)
+        rank_table[list(scores)] = list(scores.values())
+        suit_table = np.array(FLUSH_SUITS[num_cards], dtype=np.int8)
+        _rank_tables[num_cards] = (rank_table, suit_table)
+    return _rank_tables[num_cards]
+
+
+# scores N hands of 5 to 7 card indexes, one hand per row
+def evaluate_hands(hands: np.ndarray) -> np.ndarray:
+    hands = np.asarray(hands, dtype=np.intp)
+    rank_table, suit_table = _lookup_tables(hands.shape[1])
+    totals = CARD_KEYS[hands].sum(axis=1)
+    scores = rank_table[(totals >> 9) & RANK_SUM_MASK]
+
+    flush_suits = suit_table[totals & SUIT_MASK]
+    flushes = np.flatnonzero(flush_suits >= 0)
+    if len(flushes):
+        flush_hands = hands[flushes]
+        in_suit = CARD_SUITS[flush_hands] == flush_suits[flushes, None]
+        masks = np.bitwise_or.reduce(np.where(in_suit, CARD_RANK_BITS[flush_hands], 0), axis=1)
+        scores[flushes] = FLUSH_SCORE_TABLE[masks]
+    return scores
+
+
+# scores N hole card pairs, shape (N, 2), against N boards of 3 to 5 cards
+def evaluate_batch(hole_cards: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    return evaluate_hands(np.concatenate([np.asarray(hole_cards), np.asarray(boards)], axis=1))
+
+
+def score_categories(scores: np.ndarray) -> np.ndarray:
+    return scores >> CATEGORY_SHIFT
+
+
+# N random deals of distinct cards, as (hole cards, boards)
+def random_deals(num_hands: int, board_size: int = 5, seed: int | None = None):
+    rng = np.random.default_rng(seed)
+    cards = np.argsort(rng.random((num_hands, 52)), axis=1)[:, :2 + board_size]
+    return cards[:, :2], cards[:, 2:]
+
+
+def benchmark(num_hands: int = 1_000_000, seed: int = 0) -> float:
+    hole_cards, boards = random_deals(num_hands, seed=seed)
+    evaluate_batch(hole_cards[:1], boards[:1])
+    start = time.perf_counter()
+    evaluate_batch(hole_cards, boards)
+    return num_hands / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the batch hand evaluator")
+    parser.add_argument("--hands", type=int, default=1_000_000, help="Number of 7-card hands to score")
+    args = parser.parse_args()
+    print(f"{benchmark(args.hands):,.0f} hands/second at N = {args.hands:,}")
@@ -6,34 +6,59 @@ class Rank(Enum):
 class Suit(Enum):
     SPADES, HEARTS, DIAMONDS, CLUBS = range(4)
 
+# Every card is also packed into one integer so that the plain sum of any 5, 6 or 7
+# cards is a perfect hash of the hand (see game/evaluator.py):
+#   bits 0-8   suit key, sums of these tell whether (and which) suit has a flush
+#   bits 9-31  rank key, sums of these are unique for every multiset of ranks
+#   bits 32-44 one-hot rank bit, used to build the rank mask of a flush suit
+# Packed ranks are ace-high indexes: 0 is a deuce and 12 is an ace.
+RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+SUIT_KEYS = [0, 1, 8, 57]
+SUIT_MASK = 0x1FF
+RANK_SUM_MASK = 0x7FFFFF
+RANK_BIT_SHIFT = 32
+
+SHORT_SUITS = ["S", "H", "D", "C"]
+SHORT_RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+LONG_SUITS = ["Spades", "Hearts", "Dimonds", "Clubs"]
+LONG_RANKS = ["Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
+
+# There are only 52 cards, Card(rank, suit) always returns the same interned instance
+# so dealing never allocates. Cards are shared, never mutate one.
 class Card:
-    def __init__(self, rank: Rank, suit: Suit):
-        self.rank = rank
-        self.suit = suit
+    __slots__ = ("rank", "suit", "index", "high", "key")
+
+    def __new__(cls, rank: Rank, suit: Suit):
+        return CARDS[suit.value * 13 + rank.value]
+
+    @classmethod
+    def _intern(cls, rank: Rank, suit: Suit):
+        card = object.__new__(cls)
+        card.rank = rank
+        card.suit = suit
+        card.index = suit.value * 13 + rank.value
+        card.high = (rank.value + 12) % 13
+        card.key = (1 << card.high) << RANK_BIT_SHIFT | RANK_KEYS[card.high] << 9 | SUIT_KEYS[suit.value]
+        return card
+
+    def __reduce__(self):
+        return (Card, (self.rank, self.suit))
 
     def __eq__(self, other):
         if isinstance(other, Card):
-            return self.rank == other.rank and self.suit == other.suit
+            return self is other
         elif isinstance(other, Rank):
-            return self.rank == other
+            return self.rank is other
         elif isinstance(other, int):
             return self.rank.value == other
         raise TypeError(f"Cannot compare Card with {type(other)}")
 
     def __lt__(self, other):
-        if self.rank == Rank.ACE and other.rank != Rank.ACE:
-            return False
-        elif self.rank != Rank.ACE and other.rank == Rank.ACE:
-            return True
-        return self.rank.value < other.rank.value
-    
+        return self.high < other.high
+
     def __gt__(self, other):
-        if self.rank == Rank.ACE and other.rank != Rank.ACE:
-            return True
-        elif self.rank != Rank.ACE and other.rank == Rank.ACE:
-            return False
-        return self.rank.value > other.rank.value
-    
+        return self.high > other.high
+
     # A bit dubious to use this method, but it works
     def __add__(self, other):
         if isinstance(other, Card):
@@ -44,20 +69,23 @@ class Card:
             new_rank = self.rank.value + other
         else:
             raise TypeError(f"Cannot add Card with {type(other)}")
-        
+
         if new_rank > 12:
             new_rank -= 13
         return Rank(new_rank)
 
     def __str__(self):
-        suits = ["S", "H", "D", "C"]
-        ranks = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-        return f"{ranks[self.rank.value]}{suits[self.suit.value]}"
-    
+        return f"{SHORT_RANKS[self.rank.value]}{SHORT_SUITS[self.suit.value]}"
+
     def long_str(self):
-        suits = ["Spades", "Hearts", "Dimonds", "Clubs"]
-        ranks = ["Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
-        return f"{ranks[self.rank.value]} of {suits[self.suit.value]}"
+        return f"{LONG_RANKS[self.rank.value]} of {LONG_SUITS[self.suit.value]}"
 
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+# all 52 cards, indexed by Card.index
+CARDS = [None] * 52
+for _suit in Suit:
+    for _rank in Rank:
+        CARDS[_suit.value * 13 + _rank.value] = Card._intern(_rank, _suit)
+del _suit, _rank
@@ -1,13 +1,71 @@
 from game.card import *
-import random
+import secrets
+import numpy as np
+
+# The deck is a fixed array of the 52 card indexes (Card.index) plus a count of cards
+# dealt. Shuffling is lazy: every deal draws the next card uniformly from the cards
+# not dealt yet and swaps it into place, one Fisher-Yates step, so a hand that deals
+# nine cards only shuffles nine positions and reset() is free.
+# The random source is pluggable: a numpy Generator (PCG64 by default, seeded so a
+# game can be replayed from deck.seed), random.Random / secrets.SystemRandom, or the
+# secrets module itself for production dealing.
+DECK_SIZE = 52
 
 class Deck:
-    def __init__(self):
-        self.cards = [Card(rank, suit) for suit in Suit for rank in Rank]
-        self.shuffle()
+    def __init__(self, rng=None, seed: int | None = None):
+        if rng is None:
+            self.seed = seed if seed is not None else secrets.randbits(64)
+            rng = np.random.default_rng(self.seed)
+        else:
+            self.seed = seed
+        self.rng = rng
+        if isinstance(rng, np.random.Generator):
+            self._below = self._generator_below
+        elif hasattr(rng, "randbelow"):
+            self._below = rng.randbelow
+        else:
+            self._below = rng.randrange
+        self._uniforms = []
+        self.order = bytearray(range(DECK_SIZE))
+        self.dealt = 0
+        self.shuffled = 0
+
+    # uniform int below n, numpy is called once per 52 draws rather than per draw
+    def _generator_below(self, n: int) -> int:
+        if not self._uniforms:
+            self._uniforms = self.rng.random(DECK_SIZE).tolist()
+        return int(self._uniforms.pop() * n)
+
+    # one Fisher-Yates step at the first position that has not been shuffled yet
+    def _shuffle_next(self):
+        position = self.shuffled
+        swap = position + self._below(DECK_SIZE - position)
+        self.order[position], self.order[swap] = self.order[swap], self.order[position]
+        self.shuffled += 1
 
+    # cards left in the deck, in the order they will be dealt. This is a new list on every
+    # access: shuffling or popping it leaves the deck as it was, use shuffle(), deal_card()
+    # or a seeded Deck instead.
+    @property
+    def cards(self) -> list[Card]:
+        while self.shuffled < DECK_SIZE:
+            self._shuffle_next()
+        return [CARDS[index] for index in self.order[self.dealt:]]
+
+    # reshuffles the cards not dealt yet
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.shuffled = self.dealt
+
+    # puts every card back, shuffled again as it is dealt
+    def reset(self):
+        self.dealt = 0
+        self.shuffled = 0
 
     def deal_card(self):
-        return self.cards.pop()
\ No newline at end of file
+        if self.dealt == DECK_SIZE:
+            raise IndexError("deal from an empty deck")
+        if self.shuffled == self.dealt:
+            self._shuffle_next()
+        card = CARDS[self.order[self.dealt]]
+        self.dealt += 1
+        return card
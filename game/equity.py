@@ -0,0 +1,233 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+from game.batch_evaluator import evaluate_hands
+from game.card import Card
+from game.isomorphism import canonical_key
+
+# Monte Carlo equity: deal the unknown cards at random, score both hands with the
+# batch evaluator and count wins, ties and losses. Trials are split over a process
+# pool and every worker draws from its own SeedSequence child, so a fixed seed, trial
+# count and worker count always reproduce the same result. A time limit stops each
+# worker at the deadline, which trades that reproducibility for latency.
+CHUNK_SIZE = 5000
+DEFAULT_WORKERS = os.cpu_count() or 1
+EXACT_CACHE_SIZE = 100_000
+
+# one process pool per worker count, kept until shutdown_pool(), so a caller asking for
+# a different count never shuts down a pool another thread is still submitting to
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class EquityResult:
+    def __init__(self, wins: int, ties: int, losses: int, exact: bool = False):
+        self.wins = wins
+        self.ties = ties
+        self.losses = losses
+        self.trials = wins + ties + losses
+        self.exact = exact
+
+    @property
+    def win(self) -> float:
+        return self.wins / self.trials if self.trials else 0.0
+
+    @property
+    def tie(self) -> float:
+        return self.ties / self.trials if self.trials else 0.0
+
+    @property
+    def lose(self) -> float:
+        return self.losses / self.trials if self.trials else 0.0
+
+    # share of the pot won on average, ties count as half
+    @property
+    def equity(self) -> float:
+        return self.win + self.tie / 2
+
+    # standard error of the equity estimate, from the per-trial payoff variance
+    @property
+    def standard_error(self) -> float:
+        if self.exact or self.trials < 2:
+            return 0.0
+        mean_square = self.win + self.tie / 4
+        variance = max(mean_square - self.equity ** 2, 0.0)
+        return math.sqrt(variance / self.trials)
+
+    # normal approximation interval around the equity, 1.96 gives 95%
+    def confidence_interval(self, z: float = 1.96):
+        margin = z * self.standard_error
+        return max(self.equity - margin, 0.0), min(self.equity + margin, 1.0)
+
+    def __add__(self, other: "EquityResult") -> "EquityResult":
+        return EquityResult(self.wins + other.wins, self.ties + other.ties, self.losses + other.losses,
+                            self.exact and other.exact)
+
+    def __repr__(self):
+        low, high = self.confidence_interval()
+        return f"EquityResult(win={self.win:.4f}, tie={self.tie:.4f}, lose={self.lose:.4f}, equity={self.equity:.4f} [{low:.4f}, {high:.4f}], trials={self.trials})"
+
+
+# the shared process pool with workers processes, for equity, search and verification
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def shutdown_pool():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+# draws `need` distinct cards from `live` for every row, redrawing rows with repeats
+# or with a card that is blocked for that row (shape (rows, k) of card indexes)
+def draw_cards(rng: np.random.Generator, live: np.ndarray, need: int, rows: int, blocked: np.ndarray | None = None) -> np.ndarray:
+    drawn = np.empty((rows, need), dtype=np.intp)
+    pending = np.arange(rows)
+    while len(pending):
+        sample = live[rng.integers(0, len(live), (len(pending), need))]
+        ordered = np.sort(sample, axis=1)
+        bad = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if blocked is not None:
+            bad |= (sample[:, :, None] == blocked[pending][:, None, :]).any(axis=(1, 2))
+        drawn[pending[~bad]] = sample[~bad]
+        pending = pending[bad]
+    return drawn
+
+
+# runs one worker's share of trials, returns (wins, ties, losses)
+def _simulate(hero, board, opponent, opponent_range, range_weights, trials, deadline, seed):
+    rng = np.random.default_rng(seed)
+    known = hero + board + (opponent or [])
+    live = np.setdiff1d(np.arange(52), known)
+    runout = 5 - len(board)
+    if opponent_range is not None:
+        combos = np.array(opponent_range, dtype=np.intp)
+        weights = np.array(range_weights, dtype=np.float64)
+
+    wins = ties = losses = 0
+    done = 0
+    while done < trials and (deadline is None or time.monotonic() < deadline):
+        rows = min(CHUNK_SIZE, trials - done)
+        if opponent is not None:
+            drawn = draw_cards(rng, live, runout, rows)
+            opponent_cards = np.broadcast_to(np.array(opponent, dtype=np.intp), (rows, 2))
+        elif opponent_range is not None:
+            opponent_cards = combos[rng.choice(len(combos), rows, p=weights)]
+            drawn = draw_cards(rng, live, runout, rows, blocked=opponent_cards)
+        else:
+            drawn = draw_cards(rng, live, runout + 2, rows)
+            opponent_cards, drawn = drawn[:, :2], drawn[:, 2:]
+
+        full_board = np.concatenate([np.broadcast_to(np.array(board, dtype=np.intp), (rows, len(board))), drawn], axis=1)
+        hero_scores = evaluate_hands(np.concatenate([np.broadcast_to(np.array(hero, dtype=np.intp), (rows, 2)), full_board], axis=1))
+        opponent_scores = evaluate_hands(np.concatenate([opponent_cards, full_board], axis=1))
+        wins += int((hero_scores > opponent_scores).sum())
+        ties += int((hero_scores == opponent_scores).sum())
+        losses += int((hero_scores < opponent_scores).sum())
+        done += rows
+    return wins, ties, losses
+
+
+# keeps the range combos that do not collide with known cards, with normalized weights
+def _live_range(opponent_range, weights, known: set):
+    combos = []
+    live_weights = []
+    for position, (first, second) in enumerate(opponent_range):
+        if first.index in known or second.index in known:
+            continue
+        combos.append((first.index, second.index))
+        live_weights.append(1.0 if weights is None else weights[position])
+    total = sum(live_weights)
+    if not combos or total <= 0:
+        raise ValueError("Opponent range has no hands left after removing known cards")
+    return combos, [weight / total for weight in live_weights]
+
+
+# estimates hero's win/tie/lose probabilities against one opponent by sampling the
+# unknown cards. The opponent is a known hand, a list of hands (optionally weighted),
+# or any two cards when both are None.
+def estimate_equity(hero: list[Card], board: list[Card] | None = None, opponent: list[Card] | None = None,
+                    opponent_range: list | None = None, weights: list[float] | None = None,
+                    trials: int = 100_000, time_limit: float | None = None,
+                    workers: int | None = None, seed: int | None = None) -> EquityResult:
+    board = board or []
+    hero_indexes = [card.index for card in hero]
+    board_indexes = [card.index for card in board]
+    opponent_indexes = [card.index for card in opponent] if opponent is not None else None
+    known = hero_indexes + board_indexes + (opponent_indexes or [])
+    if len(set(known)) != len(known):
+        raise ValueError("Hero, opponent and board cards must all be different")
+    if len(hero) != 2 or len(board) > 5:
+        raise ValueError("Hero needs two cards and the board at most five")
+
+    combos = range_weights = None
+    if opponent is None and opponent_range is not None:
+        combos, range_weights = _live_range(opponent_range, weights, set(known))
+
+    workers = workers or DEFAULT_WORKERS
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [trials // workers + (1 if worker < trials % workers else 0) for worker in range(workers)]
+    jobs = [(hero_indexes, board_indexes, opponent_indexes, combos, range_weights, share, deadline, worker_seed)
+            for share, worker_seed in zip(shares, seeds)]
+
+    if workers == 1:
+        counts = [_simulate(*jobs[0])]
+    else:
+        pool = get_pool(workers)
+        counts = list(pool.map(_simulate, *zip(*jobs)))
+    return sum((EquityResult(*count) for count in counts), EquityResult(0, 0, 0))
+
+
+# enumerates every runout and opponent hand, returns (wins, ties, losses)
+@lru_cache(maxsize=EXACT_CACHE_SIZE)
+def _exact_counts(hero: tuple, board: tuple, opponent: tuple):
+    live = [index for index in range(52) if index not in hero + board + opponent]
+    runouts = combinations(live, 5 - len(board))
+    if opponent:
+        rows = [board + runout + opponent for runout in runouts]
+    else:
+        rows = [board + runout + combo for runout in runouts
+                for combo in combinations([index for index in live if index not in runout], 2)]
+    rows = np.array(rows, dtype=np.intp).reshape(len(rows), 7)
+
+    hero_scores = evaluate_hands(np.concatenate([np.broadcast_to(np.array(hero, dtype=np.intp), (len(rows), 2)), rows[:, :5]], axis=1))
+    opponent_scores = evaluate_hands(rows)
+    wins = int((hero_scores > opponent_scores).sum())
+    ties = int((hero_scores == opponent_scores).sum())
+    return wins, ties, len(rows) - wins - ties
+
+
+# exact equity by enumerating every remaining card, cheap once the turn is out. Results
+# are cached by suit-isomorphic spot, so a repeated turn or river spot is a lookup.
+def exact_equity(hero: list[Card], board: list[Card], opponent: list[Card] | None = None) -> EquityResult:
+    if len(hero) != 2 or not 3 <= len(board) <= 5:
+        raise ValueError("Exact equity needs two hero cards and a flop, turn or river")
+    hero_indexes = [card.index for card in hero]
+    board_indexes = [card.index for card in board]
+    opponent_indexes = [card.index for card in opponent] if opponent is not None else []
+    known = hero_indexes + board_indexes + opponent_indexes
+    if len(set(known)) != len(known):
+        raise ValueError("Hero, opponent and board cards must all be different")
+    return EquityResult(*_exact_counts(*canonical_key(hero_indexes, board_indexes, opponent_indexes)), exact=True)
+
+
+# hits, misses, maxsize and currsize of the exact equity cache
+def exact_cache_info():
+    return _exact_counts.cache_info()
+
+
+def exact_cache_clear():
+    _exact_counts.cache_clear()
@@ -0,0 +1,181 @@
+from itertools import combinations_with_replacement
+from operator import attrgetter
+from game.card import RANK_BIT_SHIFT, RANK_KEYS, RANK_SUM_MASK, SUIT_KEYS, SUIT_MASK, Card
+from game.player import handRank
+
+# Scores are category << 20 followed by the five played ranks, 4 bits each, in the
+# order the hand is read out. Comparing scores is the same as comparing category and
+# then the played cards one by one, so a single integer decides every showdown.
+CATEGORY_SHIFT = 20
+FLUSH_CATEGORIES = (handRank.FLUSH.value, handRank.STRAIGHT_FLUSH.value, handRank.ROYAL_FLUSH.value)
+WHEEL_MASK = 0x100F
+STRAIGHT_MASK = 0x1F
+
+
+def _pack(category: handRank, ranks: list[int]) -> int:
+    score = category.value << CATEGORY_SHIFT
+    shift = CATEGORY_SHIFT - 4
+    for rank in ranks:
+        score |= rank << shift
+        shift -= 4
+    return score
+
+
+# returns the top rank of the best straight in a rank mask, or -1
+def straight_top(mask: int) -> int:
+    for top in range(12, 3, -1):
+        if (mask >> (top - 4)) & STRAIGHT_MASK == STRAIGHT_MASK:
+            return top
+    if mask & WHEEL_MASK == WHEEL_MASK:
+        return 3
+    return -1
+
+
+def _straight_ranks(top: int) -> list[int]:
+    if top == 3:
+        return [3, 2, 1, 0, 12]
+    return [top - offset for offset in range(5)]
+
+
+def _flush_score(mask: int) -> int:
+    top = straight_top(mask)
+    if top == 12:
+        return _pack(handRank.ROYAL_FLUSH, _straight_ranks(top))
+    if top >= 0:
+        return _pack(handRank.STRAIGHT_FLUSH, _straight_ranks(top))
+    ranks = [rank for rank in range(12, -1, -1) if mask >> rank & 1]
+    return _pack(handRank.FLUSH, ranks[:5])
+
+
+# scores the best five card hand that ignores suits, given the count of each rank
+def rank_score(counts: list[int]) -> int:
+    ranks = [rank for rank in range(12, -1, -1) if counts[rank]]
+    quads = [rank for rank in ranks if counts[rank] == 4]
+    trips = [rank for rank in ranks if counts[rank] == 3]
+    pairs = [rank for rank in ranks if counts[rank] == 2]
+
+    if quads:
+        kickers = [rank for rank in ranks if rank != quads[0]]
+        return _pack(handRank.FOUR_OF_A_KIND, [quads[0]] * 4 + kickers[:1])
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(handRank.FULL_HOUSE, [trips[0]] * 3 + [max(trips[1:] + pairs)] * 2)
+
+    mask = 0
+    for rank in ranks:
+        mask |= 1 << rank
+    top = straight_top(mask)
+    if top >= 0:
+        return _pack(handRank.STRAIGHT, _straight_ranks(top))
+
+    if trips:
+        kickers = [rank for rank in ranks if rank != trips[0]]
+        return _pack(handRank.THREE_OF_A_KIND, [trips[0]] * 3 + kickers[:2])
+    if len(pairs) >= 2:
+        kickers = [rank for rank in ranks if rank not in pairs[:2]]
+        return _pack(handRank.TWO_PAIR, [pairs[0]] * 2 + [pairs[1]] * 2 + kickers[:1])
+    if pairs:
+        kickers = [rank for rank in ranks if rank != pairs[0]]
+        return _pack(handRank.PAIR, [pairs[0]] * 2 + kickers[:3])
+    return _pack(handRank.HIGH_CARD, ranks[:5])
+
+
+def _build_tables():
+    flush_scores = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if mask.bit_count() >= 5:
+            flush_scores[mask] = _flush_score(mask)
+
+    # both lookups are indexed by the number of cards being scored
+    flush_suits = [None] * 8
+    rank_scores = [None] * 8
+    for num_cards in (5, 6, 7):
+        suits = [-1] * (SUIT_KEYS[-1] * num_cards + 1)
+        for hand in combinations_with_replacement(range(4), num_cards):
+            total = sum(SUIT_KEYS[suit] for suit in hand)
+            suits[total] = next((suit for suit in range(4) if hand.count(suit) >= 5), -1)
+        flush_suits[num_cards] = suits
+
+        scores = {}
+        for hand in combinations_with_replacement(range(13), num_cards):
+            counts = [0] * 13
+            for rank in hand:
+                counts[rank] += 1
+            if max(counts) <= 4:
+                scores[sum(RANK_KEYS[rank] for rank in hand)] = rank_score(counts)
+        rank_scores[num_cards] = scores
+
+    return flush_scores, flush_suits, rank_scores
+
+
+FLUSH_SCORES, FLUSH_SUITS, RANK_SCORES = _build_tables()
+
+
+# scores 5, 6 or 7 packed card keys (Card.key), higher scores are stronger hands
+def evaluate(keys: list[int]) -> int:
+    num_cards = len(keys)
+    total = sum(keys)
+    flush_suit = FLUSH_SUITS[num_cards][total & SUIT_MASK]
+    if flush_suit < 0:
+        return RANK_SCORES[num_cards][(total >> 9) & RANK_SUM_MASK]
+
+    suit_key = SUIT_KEYS[flush_suit]
+    mask = 0
+    for key in keys:
+        if key & SUIT_MASK == suit_key:
+            mask |= key >> RANK_BIT_SHIFT
+    return FLUSH_SCORES[mask]
+
+
+def evaluate_cards(cards: list[Card]) -> int:
+    return evaluate([card.key for card in cards])
+
+
+# scores many two-card hands against one board, the board is only summed once
+def evaluate_holes(board: list[Card], holes: list[list[Card]]) -> list[int]:
+    board_keys = [card.key for card in board]
+    board_total = sum(board_keys)
+    num_cards = len(board) + 2
+    flush_suits = FLUSH_SUITS[num_cards]
+    rank_scores = RANK_SCORES[num_cards]
+    scores = []
+    for first, second in holes:
+        total = board_total + first.key + second.key
+        if flush_suits[total & SUIT_MASK] < 0:
+            scores.append(rank_scores[(total >> 9) & RANK_SUM_MASK])
+        else:
+            scores.append(evaluate(board_keys + [first.key, second.key]))
+    return scores
+
+
+def score_category(score: int) -> handRank:
+    return handRank(score >> CATEGORY_SHIFT)
+
+
+# strength of a hand that was already played out, matches evaluate for the same hand
+def hand_strength(hand_rank: handRank, hand_played: list[Card]) -> int:
+    return _pack(hand_rank, [card.high for card in hand_played])
+
+
+# picks the cards that make up a scored hand, strongest first
+def hand_played(cards: list[Card], score: int) -> list[Card]:
+    pool = sorted(cards, key=attrgetter("high"), reverse=True)
+    if score >> CATEGORY_SHIFT in FLUSH_CATEGORIES:
+        suits = [card.suit for card in cards]
+        flush_suit = max(suits, key=suits.count)
+        pool = [card for card in pool if card.suit is flush_suit]
+
+    played = []
+    for shift in (16, 12, 8, 4, 0):
+        rank = (score >> shift) & 0xF
+        for position, card in enumerate(pool):
+            if card.high == rank:
+                played.append(card)
+                del pool[position]
+                break
+    return played
+
+
+# returns the hand rank and the cards played, same contract as Dealer.get_hand_rank
+def rank_hand(cards: list[Card]):
+    score = evaluate_cards(cards)
+    return score_category(score), hand_played(cards, score)
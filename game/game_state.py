@@ -0,0 +1,160 @@
+from operator import itemgetter
+from db.enums import ActionType, Round
+from game.poker import PokerGameManager, raise_bounds
+
+# Immutable snapshot of a heads-up hand for lookahead search. The betting state that
+# PokerGameManager and its two Players keep in separate objects is packed into one
+# flat tuple of small ints, so copying a state is free (states are never mutated,
+# "undo" is keeping the parent) and apply only builds one new tuple. It follows the
+# same rules as the Discord handler and game.simulation: the small blind is the
+# button and acts first preflop, the other player acts first after the flop, a raise
+# reopens the action, a short all-in call hands the uncovered chips back and a street
+# with a player all-in runs straight to the showdown. Cards are not part of the state,
+# a search deals them itself when round changes.
+CALL, CHECK, FOLD, RAISE, ALL_IN = ActionType.CALL, ActionType.CHECK, ActionType.FOLD, ActionType.RAISE, ActionType.ALL_IN
+NEXT_ROUND = {Round.PRE_FLOP: Round.FLOP, Round.FLOP: Round.TURN, Round.TURN: Round.RIVER, Round.RIVER: Round.SHOWDOWN}
+
+_new = tuple.__new__
+
+
+class GameState(tuple):
+    __slots__ = ()
+
+    stack0 = property(itemgetter(0))
+    stack1 = property(itemgetter(1))
+    commitment0 = property(itemgetter(2))
+    commitment1 = property(itemgetter(3))
+    pot = property(itemgetter(4))
+    bet = property(itemgetter(5))
+    button = property(itemgetter(6))
+    round = property(itemgetter(7))
+    to_act = property(itemgetter(8))
+    # bit per player that has acted since the last raise
+    acted = property(itemgetter(9))
+    # seat that folded, or -1
+    folded = property(itemgetter(10))
+    big_blind = property(itemgetter(11))
+
+    def __new__(cls, stacks, commitments, pot: int, bet: int, button: int, round: Round, to_act: int,
+                acted: int = 0, folded: int = -1, big_blind: int = 10):
+        return _new(cls, (stacks[0], stacks[1], commitments[0], commitments[1], pot, bet, button, round, to_act,
+                          acted, folded, big_blind))
+
+    # state of a hand in progress, with player to act next
+    @classmethod
+    def from_game(cls, game: PokerGameManager, to_act: int | None = None, acted: int = 0) -> "GameState":
+        players = game.players
+        if to_act is None:
+            to_act = game.button if game.round == Round.PRE_FLOP else (game.button + 1) % 2
+        return cls((players[0].stack, players[1].stack),
+                   (players[0].round_pot_commitment, players[1].round_pot_commitment),
+                   game.current_pot, game.current_bet, game.button, game.round, to_act, acted, -1, game.big_blind)
+
+    # a new hand with the blinds posted and the button to act
+    @classmethod
+    def new_hand(cls, stacks, small_blind: int = 5, big_blind: int = 10, button: int = 0) -> "GameState":
+        blinds = [0, 0]
+        blinds[button] = min(small_blind, stacks[button])
+        blinds[1 - button] = min(big_blind, stacks[1 - button])
+        return cls((stacks[0] - blinds[0], stacks[1] - blinds[1]), blinds, blinds[0] + blinds[1], max(blinds),
+                   button, Round.PRE_FLOP, button, 0, -1, big_blind)
+
+    # pickled as the flat tuple, for worker processes
+    def __reduce__(self):
+        return _new, (GameState, tuple(self))
+
+    def __repr__(self):
+        return (f"GameState(stacks={self[0:2]}, commitments={self[2:4]}, pot={self[4]}, bet={self[5]}, "
+                f"button={self[6]}, round={self[7].name}, to_act={self[8]}, acted={self[9]}, folded={self[10]})")
+
+    @property
+    def stacks(self) -> tuple:
+        return self[0:2]
+
+    @property
+    def commitments(self) -> tuple:
+        return self[2:4]
+
+    @property
+    def is_terminal(self) -> bool:
+        return self[10] >= 0 or self[7] is Round.SHOWDOWN
+
+    # smallest and largest total the player to act can raise to
+    def raise_bounds(self) -> tuple:
+        player = self[8]
+        return raise_bounds(self[5], self[11], self[player] + self[2 + player])
+
+    def legal_actions(self) -> list[ActionType]:
+        if self[10] >= 0 or self[7] is Round.SHOWDOWN:
+            return []
+        player = self[8]
+        total = self[player] + self[2 + player]
+        if self[5] > self[2 + player]:
+            actions = [FOLD, CALL]
+        else:
+            actions = [CHECK]
+        if self[1 - player] > 0 and total > self[5]:
+            if total > raise_bounds(self[5], self[11], total)[0]:
+                actions.append(RAISE)
+            actions.append(ALL_IN)
+        return actions
+
+    # the state after the player to act takes action, amount is the total to raise to
+    def apply(self, action: ActionType, amount: int | None = None) -> "GameState":
+        stack0, stack1, commitment0, commitment1, pot, bet, button, round, player, acted, folded, big_blind = self
+        stacks = [stack0, stack1]
+        commitments = [commitment0, commitment1]
+        other = 1 - player
+
+        if action is FOLD:
+            return _new(GameState, (stack0, stack1, commitment0, commitment1, pot, bet, button, round, player,
+                                    acted, player, big_blind))
+        if action is CHECK:
+            acted |= 1 << player
+            if acted == 3:
+                return _close(stacks, pot, button, round, big_blind)
+        elif action is CALL:
+            total = stacks[player] + commitments[player]
+            if total < bet:
+                # all-in for less, the uncovered part of the bet goes back
+                uncovered = bet - total
+                stacks[other] += uncovered
+                pot -= uncovered
+                commitments[other] = bet = total
+            pot += bet - commitments[player]
+            stacks[player] -= bet - commitments[player]
+            commitments[player] = bet
+            if acted & (1 << other) or stacks[player] == 0 or stacks[other] == 0:
+                return _close(stacks, pot, button, round, big_blind)
+            acted |= 1 << player
+        else:
+            if action is ALL_IN or amount is None and action is not RAISE:
+                amount = stacks[player] + commitments[player]
+            elif amount is None:
+                amount = max(bet * 2, big_blind)
+            pot += amount - commitments[player]
+            stacks[player] -= amount - commitments[player]
+            commitments[player] = bet = amount
+            acted = 1 << player
+        return _new(GameState, (stacks[0], stacks[1], commitments[0], commitments[1], pot, bet, button, round,
+                                other, acted, -1, big_blind))
+
+    # stacks once the pot is paid out: to the player left in, or to winner at the
+    # showdown, None splitting it
+    def final_stacks(self, winner: int | None = None) -> tuple:
+        if self[10] >= 0:
+            winner = 1 - self[10]
+        stacks = [self[0], self[1]]
+        if winner is None:
+            stacks[0] += self[4] // 2
+            stacks[1] += self[4] // 2
+        else:
+            stacks[winner] += self[4]
+        return tuple(stacks)
+
+
+# ends the betting round: the next street starts with the player after the button,
+# or the hand goes to showdown after the river or with a player all-in
+def _close(stacks, pot, button, round, big_blind) -> GameState:
+    round = Round.SHOWDOWN if stacks[0] == 0 or stacks[1] == 0 else NEXT_ROUND[round]
+    return _new(GameState, (stacks[0], stacks[1], 0, 0, pot, 0, button, round, 1 - button, 0, -1, big_blind))
@@ -0,0 +1,104 @@
+from game.card import RANK_SUM_MASK, SUIT_MASK, Card
+from game.evaluator import (CATEGORY_SHIFT, FLUSH_SCORES, FLUSH_SUITS, RANK_SCORES, STRAIGHT_MASK, WHEEL_MASK,
+                            rank_score, straight_top)
+from game.player import handRank
+
+# Running evaluation state for one player's hole cards plus the board dealt so far.
+# Every card is folded into rank counts, suit counts and rank masks in O(1), and the
+# packed card keys are summed as they come, so the made hand, draws and outs can be
+# read on any street without scoring the cards again. Ranks are ace-high (Card.high).
+ALL_RANKS = 0x1FFF
+STRAIGHTS = [(top, STRAIGHT_MASK << (top - 4)) for top in range(12, 3, -1)] + [(3, WHEEL_MASK)]
+
+
+# ranks that would complete a straight, or a higher one than the mask already makes
+def _straight_outs(mask: int) -> int:
+    made = straight_top(mask)
+    outs = 0
+    for top, window in STRAIGHTS:
+        missing = window & ~mask
+        if top > made and missing.bit_count() == 1:
+            outs |= missing
+    return outs
+
+
+STRAIGHT_OUTS = [_straight_outs(mask) for mask in range(1 << 13)]
+
+
+class HandState:
+    __slots__ = ("rank_counts", "suit_counts", "suit_masks", "rank_mask", "key", "size")
+
+    def __init__(self, cards: list[Card] = ()):
+        self.rank_counts = [0] * 13
+        self.suit_counts = [0] * 4
+        self.suit_masks = [0] * 4
+        self.rank_mask = 0
+        self.key = 0
+        self.size = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: Card):
+        suit = card.suit.value
+        self.rank_counts[card.high] += 1
+        self.suit_counts[suit] += 1
+        self.suit_masks[suit] |= 1 << card.high
+        self.rank_mask |= 1 << card.high
+        self.key += card.key
+        self.size += 1
+
+    # same score as evaluate_cards once there are five cards, before that only pairs count
+    @property
+    def score(self) -> int:
+        if self.size < 5:
+            return rank_score(self.rank_counts)
+        flush_suit = FLUSH_SUITS[self.size][self.key & SUIT_MASK]
+        if flush_suit >= 0:
+            return FLUSH_SCORES[self.suit_masks[flush_suit]]
+        return RANK_SCORES[self.size][(self.key >> 9) & RANK_SUM_MASK]
+
+    @property
+    def category(self) -> handRank:
+        return handRank(self.score >> CATEGORY_SHIFT)
+
+    # the suit with four cards when a flush is still to come, or -1
+    @property
+    def flush_draw_suit(self) -> int:
+        if self.size < 7 and self.category < handRank.FLUSH:
+            for suit in range(4):
+                if self.suit_counts[suit] == 4:
+                    return suit
+        return -1
+
+    # mask of the ranks that make a straight on the next card
+    @property
+    def straight_outs(self) -> int:
+        if self.size == 7 or not self.category < handRank.STRAIGHT:
+            return 0
+        return STRAIGHT_OUTS[self.rank_mask]
+
+    def draws(self) -> list[str]:
+        draws = []
+        if self.flush_draw_suit >= 0:
+            draws.append("flush draw")
+        elif self.size == 5 and max(self.suit_counts) == 3 and self.category < handRank.FLUSH:
+            draws.append("backdoor flush draw")
+        straight_ranks = self.straight_outs.bit_count()
+        if straight_ranks >= 2:
+            draws.append("open-ended straight draw")
+        elif straight_ranks == 1:
+            draws.append("gutshot straight draw")
+        return draws
+
+    # unseen cards that complete a straight or a flush, counting each card once
+    @property
+    def outs(self) -> int:
+        straight_outs = self.straight_outs
+        flush_suit = self.flush_draw_suit
+        outs = 0
+        for suit in range(4):
+            suit_outs = straight_outs
+            if suit == flush_suit:
+                suit_outs |= ALL_RANKS
+            outs += (suit_outs & ~self.suit_masks[suit]).bit_count()
+        return outs
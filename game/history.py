@@ -0,0 +1,141 @@
+import argparse
+import struct
+import time
+import numpy as np
+
+# Append-only binary hand history. Every engine mutation is one fixed 8 byte record
+# (op, seat, two card bytes, a 32-bit amount), so a log is read back as a NumPy record
+# array without parsing and a typical hand takes 100 to 200 bytes. Each hand starts
+# with its own header (button, blinds, stacks, hole cards) so hands from different
+# games can share a log and any hand can be replayed on its own. Chip records hold
+# the chips that actually moved, so results can be summed over millions of hands
+# without running the engine; PokerGameManager.replay rebuilds the full game state.
+RECORD = struct.Struct("<BBBBI")
+RECORD_DTYPE = np.dtype([("op", "u1"), ("seat", "u1"), ("card1", "u1"), ("card2", "u1"), ("amount", "<u4")])
+
+# HAND: seat is the button, amount the small blind. STAKES: amount is the big blind.
+# STACK: a seat's stack at the start of the hand. HOLE: a seat's two cards. BOARD: one
+# community card. BET, CALL, RAISE, ALL_IN_CALL: chips a seat put in the pot. REFUND:
+# chips of a bet handed back when the all-in call could not cover it. WIN: the pot,
+# seat SPLIT when a heads-up pot is shared, at a bigger table one record per winner
+# of each pot with the chips it was paid. RESET: the end of a betting round. FOLD: a
+# seat leaving the hand at a bigger table. BLIND: a blind posted at a bigger table.
+HAND, STAKES, STACK, HOLE, BOARD, BET, CALL, RAISE, ALL_IN_CALL, REFUND, WIN, RESET, FOLD, BLIND = range(1, 15)
+CHIP_OPS = (BET, CALL, RAISE, ALL_IN_CALL, BLIND)
+SPLIT = 255
+CHUNK_RECORDS = 1 << 20
+
+# chips into (-1) or out of (+1) the pot from a seat's stack, by op
+FLOW_SIGNS = np.zeros(256, dtype=np.int64)
+FLOW_SIGNS[list(CHIP_OPS)] = -1
+FLOW_SIGNS[REFUND] = 1
+
+
+# per hand summary of a table with this many seats
+def result_dtype(seats: int) -> np.dtype:
+    return np.dtype([("button", "u1"), ("stacks", "<i8", (seats,)), ("net", "<i8", (seats,)), ("pot", "<i8"),
+                     ("board", "u1"), ("events", "<i4")])
+
+
+RESULT_DTYPE = result_dtype(2)
+
+
+class HandLog:
+    # Collects the records of the hand being played and appends them to the log file in
+    # one write when the pot is won. Without a path every record stays in memory.
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.buffer = bytearray()
+        self.hands = 0
+        self.file = open(path, "ab", buffering=0) if path is not None else None
+
+    def record(self, op: int, seat: int = 0, card1: int = 0, card2: int = 0, amount: int = 0):
+        self.buffer += RECORD.pack(op, seat, card1, card2, amount)
+
+    def end_hand(self):
+        self.hands += 1
+        if self.file is not None:
+            self.file.write(self.buffer)
+            self.buffer = bytearray()
+
+    # records written so far, from the file or from memory
+    def records(self) -> np.ndarray:
+        if self.file is not None:
+            return read_log(self.path)
+        return np.frombuffer(bytes(self.buffer), dtype=RECORD_DTYPE)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_log(path: str) -> np.ndarray:
+    return np.fromfile(path, dtype=RECORD_DTYPE)
+
+
+# position of the first record of every hand
+def hand_starts(records: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(records["op"] == HAND)
+
+
+# per hand summary of a whole log: button, stacks at the start of the hand, chips each
+# seat won or lost, pot, board cards dealt and number of records. Hands are summed
+# with array operations a chunk of about CHUNK_RECORDS records at a time, split on
+# hand boundaries. Hands cut off before the pot was won are left out. Results have a
+# column per seat of the biggest table in the log.
+def hand_results(records: np.ndarray) -> np.ndarray:
+    seat_records = records["seat"][records["op"] == STACK]
+    width = int(seat_records.max()) + 1 if len(seat_records) else 2
+    starts = hand_starts(records)
+    bounds = list(starts[::max(1, CHUNK_RECORDS * len(starts) // max(len(records), 1))]) + [len(records)]
+    chunks = [_chunk_results(records[first:end], width) for first, end in zip(bounds, bounds[1:])]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=result_dtype(width))
+
+
+def _chunk_results(records: np.ndarray, width: int) -> np.ndarray:
+    ops = records["op"]
+    hands = np.cumsum(ops == HAND) - 1
+    count = int(hands[-1]) + 1
+    seats = records["seat"].astype(np.intp)
+    amounts = records["amount"].astype(np.int64)
+    results = np.zeros(count, dtype=result_dtype(width))
+    results["button"] = seats[ops == HAND]
+
+    stacks = ops == STACK
+    results["stacks"][hands[stacks], seats[stacks]] = amounts[stacks]
+    wins = ops == WIN
+    single = wins & (seats != SPLIT)
+    flows = FLOW_SIGNS[ops] * amounts
+    flows[single] = amounts[single]
+    cells = hands * width + np.minimum(seats, width - 1)
+    net = np.bincount(cells, weights=flows, minlength=count * width).reshape(count, width)
+    split = wins & (seats == SPLIT)
+    net[hands[split], :2] += (amounts[split] // 2)[:, None]
+    results["net"] = net
+    results["pot"] = np.bincount(hands[wins], weights=amounts[wins], minlength=count)
+    results["board"] = np.bincount(hands[ops == BOARD], minlength=count)
+    results["events"] = np.bincount(hands, minlength=count)
+
+    finished = np.zeros(count, dtype=bool)
+    finished[hands[wins]] = True
+    return results[finished]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a binary hand history log")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = hand_results(read_log(args.path))
+    seconds = time.perf_counter() - start
+    print(f"{len(results):,} hands in {seconds:.2f}s ({len(results) / max(seconds, 1e-9):,.0f} hands/s)")
+    if len(results):
+        print(", ".join(f"seat {seat} net {int(net):+,} chips" for seat, net in enumerate(results["net"].sum(axis=0))))
+        print(f"Average pot {results['pot'].mean():,.1f} chips, river dealt in {(results['board'] == 5).mean():.1%} of hands")
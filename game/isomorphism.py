@@ -0,0 +1,86 @@
+from itertools import combinations
+from game.card import CARDS, Card
+
+# Suits are interchangeable, so "AhKh on 2h7c9d" and "AsKs on 2s7c9d" are the same
+# spot. A spot is made canonical by ranking its suits on what they hold (the rank
+# mask of each suit in every group of cards, hole cards first) and renaming the
+# strongest suit to spades, the next to hearts and so on. Suits that hold exactly the
+# same ranks are interchangeable, so ties can go either way. Within a group the order
+# of cards is not kept, canonical groups are sorted by card index.
+FLOP_COUNT = 1755
+
+_flops = None
+
+
+# permutation[suit] is the canonical suit, for groups of card indexes (Card.index)
+def suit_permutation(*groups: list[int]) -> list[int]:
+    signatures = [[0] * len(groups) for _ in range(4)]
+    for position, group in enumerate(groups):
+        for index in group:
+            suit, rank = divmod(index, 13)
+            signatures[suit][position] |= 1 << (rank + 12) % 13
+    order = sorted(range(4), key=signatures.__getitem__, reverse=True)
+    permutation = [0] * 4
+    for canonical, suit in enumerate(order):
+        permutation[suit] = canonical
+    return permutation
+
+
+def permute(indexes: list[int], permutation: list[int]) -> tuple:
+    return tuple(sorted(permutation[index // 13] * 13 + index % 13 for index in indexes))
+
+
+def inverse(permutation: list[int]) -> list[int]:
+    inverted = [0] * 4
+    for suit, canonical in enumerate(permutation):
+        inverted[canonical] = suit
+    return inverted
+
+
+# hashable canonical form of any groups of card indexes, for cache keys
+def canonical_key(*groups: list[int]) -> tuple:
+    permutation = suit_permutation(*groups)
+    return tuple(permute(group, permutation) for group in groups)
+
+
+# canonical hole cards and board, plus the permutation to pass to restore
+def canonicalize(hole: list[Card], board: list[Card]):
+    hole_indexes = [card.index for card in hole]
+    board_indexes = [card.index for card in board]
+    permutation = suit_permutation(hole_indexes, board_indexes)
+    canonical_hole = [CARDS[index] for index in permute(hole_indexes, permutation)]
+    canonical_board = [CARDS[index] for index in permute(board_indexes, permutation)]
+    return canonical_hole, canonical_board, permutation
+
+
+# maps canonical cards back to the suits of the original spot
+def restore(cards: list[Card], permutation: list[int]) -> list[Card]:
+    return [CARDS[index] for index in permute([card.index for card in cards], inverse(permutation))]
+
+
+# the 1755 canonical flops with how many of the 22100 flops map to each, and the
+# index of every canonical flop, built on first use
+def _flop_table():
+    global _flops
+    if _flops is None:
+        weights = {}
+        for flop in combinations(range(52), 3):
+            key = permute(flop, suit_permutation(flop))
+            weights[key] = weights.get(key, 0) + 1
+        flops = sorted(weights)
+        _flops = (flops, [weights[flop] for flop in flops], {flop: position for position, flop in enumerate(flops)})
+    return _flops
+
+
+def canonical_flops() -> list[tuple]:
+    return _flop_table()[0]
+
+
+def flop_weights() -> list[int]:
+    return _flop_table()[1]
+
+
+# position of a flop in canonical_flops(), in any suits and card order
+def flop_index(flop: list[Card]) -> int:
+    indexes = [card.index for card in flop]
+    return _flop_table()[2][permute(indexes, suit_permutation(indexes))]
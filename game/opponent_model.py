@@ -0,0 +1,148 @@
+from db.enums import ActionType, Round
+from game.poker import PokerGameManager
+
+# Per user opponent model. Every decision a player makes updates a handful of integer
+# counters, so the usual HUD statistics (VPIP, PFR, 3-bet, fold to a raise, aggression
+# and showdown frequencies) are a division away and can go into every prompt. Models
+# live in a process-wide dict keyed by the player's Discord id, loaded once from the
+# database and written back every SAVE_EVERY hands and at the end of a game.
+(HANDS, VPIP, PFR, THREE_BET, THREE_BET_CHANCES, FOLD_TO_RAISE, FACED_RAISE, AGGRESSIVE, CALLS, POSTFLOP_ACTIONS,
+ SAW_FLOP, SHOWDOWNS, SHOWDOWN_WINS) = range(13)
+COUNTER_NAMES = ("hands", "vpip", "pfr", "three_bet", "three_bet_chances", "fold_to_raise", "faced_raise",
+                 "aggressive", "calls", "postflop_actions", "saw_flop", "showdowns", "showdown_wins")
+SAVE_EVERY = 10
+# hands before the statistics are shown to the bot
+MIN_HANDS = 5
+
+# what already happened this hand, so per hand statistics count once
+HAND_VPIP, HAND_PFR, HAND_THREE_BET_CHANCE, HAND_THREE_BET, HAND_SAW_FLOP = (1 << bit for bit in range(5))
+AGGRESSIVE_ACTIONS = (ActionType.RAISE, ActionType.ALL_IN)
+
+_models = {}
+
+
+class OpponentModel:
+    __slots__ = ("counts", "hand", "unsaved")
+
+    def __init__(self, counts: dict | None = None):
+        self.counts = [0] * len(COUNTER_NAMES)
+        for position, name in enumerate(COUNTER_NAMES):
+            self.counts[position] = (counts or {}).get(name, 0)
+        self.hand = 0
+        self.unsaved = 0
+
+    def start_hand(self):
+        self.counts[HANDS] += 1
+        self.hand = 0
+
+    # a decision of the player in seat, called before the action is applied to game
+    def record(self, action: ActionType, game: PokerGameManager, seat: int = 0):
+        counts = self.counts
+        to_call = game.current_bet - game.players[seat].round_pot_commitment
+        preflop = game.round == Round.PRE_FLOP
+        facing_raise = to_call > 0 and (not preflop or game.current_bet > game.big_blind)
+        if facing_raise:
+            counts[FACED_RAISE] += 1
+            if action == ActionType.FOLD:
+                counts[FOLD_TO_RAISE] += 1
+        if preflop:
+            if action != ActionType.FOLD and action != ActionType.CHECK:
+                self._once(HAND_VPIP, VPIP)
+            if facing_raise:
+                self._once(HAND_THREE_BET_CHANCE, THREE_BET_CHANCES)
+                if action in AGGRESSIVE_ACTIONS:
+                    self._once(HAND_THREE_BET, THREE_BET)
+            if action in AGGRESSIVE_ACTIONS:
+                self._once(HAND_PFR, PFR)
+        else:
+            counts[POSTFLOP_ACTIONS] += 1
+            if action in AGGRESSIVE_ACTIONS:
+                counts[AGGRESSIVE] += 1
+            elif action == ActionType.CALL:
+                counts[CALLS] += 1
+
+    def saw_flop(self):
+        self._once(HAND_SAW_FLOP, SAW_FLOP)
+
+    # won is None for a split pot, which counts as neither a win nor a loss and is left
+    # out of both showdown counters so the win rate stays a share of decided showdowns
+    def showdown(self, won: bool | None):
+        self.saw_flop()
+        if won is None:
+            return
+        self.counts[SHOWDOWNS] += 1
+        self.counts[SHOWDOWN_WINS] += won
+
+    # counts the hand as finished, True when it is time to save
+    def end_hand(self) -> bool:
+        self.unsaved += 1
+        return self.unsaved >= SAVE_EVERY
+
+    def save(self, store):
+        store(self.as_dict())
+        self.unsaved = 0
+
+    def _once(self, flag: int, counter: int):
+        if not self.hand & flag:
+            self.hand |= flag
+            self.counts[counter] += 1
+
+    def _share(self, part: int, whole: int) -> float:
+        return self.counts[part] / self.counts[whole] if self.counts[whole] else 0.0
+
+    @property
+    def hands(self) -> int:
+        return self.counts[HANDS]
+
+    @property
+    def vpip(self) -> float:
+        return self._share(VPIP, HANDS)
+
+    @property
+    def pfr(self) -> float:
+        return self._share(PFR, HANDS)
+
+    @property
+    def three_bet(self) -> float:
+        return self._share(THREE_BET, THREE_BET_CHANCES)
+
+    @property
+    def fold_to_raise(self) -> float:
+        return self._share(FOLD_TO_RAISE, FACED_RAISE)
+
+    # bets and raises per call after the flop
+    @property
+    def aggression_factor(self) -> float:
+        return self.counts[AGGRESSIVE] / max(self.counts[CALLS], 1)
+
+    @property
+    def aggression_frequency(self) -> float:
+        return self._share(AGGRESSIVE, POSTFLOP_ACTIONS)
+
+    @property
+    def went_to_showdown(self) -> float:
+        return self._share(SHOWDOWNS, SAW_FLOP)
+
+    @property
+    def won_at_showdown(self) -> float:
+        return self._share(SHOWDOWN_WINS, SHOWDOWNS)
+
+    def as_dict(self) -> dict:
+        return dict(zip(COUNTER_NAMES, self.counts))
+
+    # one line for prompts, empty until the player has played MIN_HANDS hands
+    def summary(self) -> str:
+        if self.hands < MIN_HANDS:
+            return ""
+        return (f"Over {self.hands} hands your opponent voluntarily put chips in {self.vpip:.0%} of hands, raised "
+                f"pre-flop {self.pfr:.0%}, 3-bet {self.three_bet:.0%}, folded to {self.fold_to_raise:.0%} of raises, "
+                f"has an aggression factor of {self.aggression_factor:.1f}, went to showdown {self.went_to_showdown:.0%} "
+                f"of the hands they saw a flop and won {self.won_at_showdown:.0%} of showdowns.")
+
+
+# the model of a player, loaded with load() the first time the player is seen
+def opponent_model(player_id, load=None) -> OpponentModel:
+    model = _models.get(player_id)
+    if model is None:
+        model = _models[player_id] = OpponentModel(load() if load is not None else None)
+    return model
@@ -23,10 +23,15 @@ class Player:
         self.player_name = player_name
         self.stack = buy_in
         self.round_pot_commitment = 0
+        # chips put in over the whole hand, for the side pots
+        self.hand_commitment = 0
+        # out of the hand: folded, or sitting out without chips
+        self.folded = False
         self.card1 = None
         self.card2 = None
         self.hand_rank = handRank.HIGH_CARD
         self.hand_played = []
+        self.hand_strength = 0
 
     def print_hand(self):
         print(f"{self.card1}, {self.card2}")
@@ -45,10 +50,14 @@ class Player:
     def bet(self, amount: int):
         self.stack -= amount
         self.round_pot_commitment += amount
+        self.hand_commitment += amount
 
     def reset(self):
         self.card1 = None
         self.card2 = None
         self.round_pot_commitment = 0
+        self.hand_commitment = 0
+        self.folded = False
         self.hand_rank = handRank.HIGH_CARD
-        self.hand_played = []
\ No newline at end of file
+        self.hand_played = []
+        self.hand_strength = 0
\ No newline at end of file
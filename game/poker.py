@@ -1,29 +1,47 @@
+import numpy as np
 from db.enums import Round
+from game.equity import estimate_equity, exact_equity
+from game.evaluator import evaluate_holes, hand_played, rank_hand, score_category
+from game.hand_state import HandState
+from game.history import (ALL_IN_CALL, BET, BLIND, BOARD, CALL, FOLD, HAND, HOLE, RAISE, REFUND, RESET, SPLIT, STACK,
+                          STAKES, WIN, HandLog, hand_starts)
 from game.player import *
 
 class Dealer:
-    def __init__(self, num_players: int, buy_in: int = 1000):
-        self.deck = Deck()
+    def __init__(self, num_players: int, buy_in: int = 1000, seed: int | None = None, rng=None):
+        self.deck = Deck(rng, seed)
         self.players = [Player("Player " + str(_ + 1), buy_in) for _ in range(num_players)]
         for player in self.players:
             player.deal_hand(self.deck)
+        self.hand_states = [HandState(player.return_hand()) for player in self.players]
         self.board = []
+        self.history = None
     
     # sets player name
     def set_player_name(self, player: int, name: str):
         self.players[player].player_name = name
     
-    # deals a new cards
+    # deals a new cards, the same deck is reshuffled so a seeded game replays exactly
     def new_deal(self):
-        self.deck = Deck()
+        self.deck.reset()
         for player in self.players:
             player.deal_hand(self.deck)
+        self.hand_states = [HandState(player.return_hand()) for player in self.players]
         self.board = []
 
-    # deals the board with num_cards
+    # deals the board with num_cards and folds every new card into each player's hand state
     def deal_board(self, num_cards: int = 5):
         for _ in range(num_cards - len(self.board)):
-            self.board.append(self.deck.deal_card())
+            card = self.deck.deal_card()
+            self.board.append(card)
+            for state in self.hand_states:
+                state.add(card)
+            if self.history is not None:
+                self.history.record(BOARD, card1=card.index)
+
+    # running evaluation of a player's cards and the board dealt so far
+    def hand_state(self, player: int) -> HandState:
+        return self.hand_states[player]
     
     # returns the player's stack
     def return_player_stack(self, player: int):
@@ -43,226 +61,50 @@ class Dealer:
 
     # returns the hand rank and the cards played for a player
     def get_hand_rank(self, player : Player):
-        hand_rank = ""
-        hand_played = []
-
-        # Get all cards
-        all_cards = self.board.copy()
-        all_cards.append(player.card1)
-        all_cards.append(player.card2)
-
-        # Sort cards by rank
-        all_cards.sort(reverse=True)
-
-        # Check for straight flush
-        highest_straight_rank = -1
-        
-        for suit in Suit:
-            # Get all cards of the same suit
-            suit_cards = [card for card in all_cards if card.suit == suit]
-            if len(suit_cards) >= 5:
-                for i in range(len(suit_cards)):
-                    for j in range(i + 1, len(suit_cards)):
-                        for k in range(j + 1, len(suit_cards)):
-                            for l in range(k + 1, len(suit_cards)):
-                                for m in range(l + 1, len(suit_cards)):
-                                    # checks for straight
-                                    if (suit_cards[i] == suit_cards[j] + 1 and suit_cards[i] == suit_cards[k] + 2 and suit_cards[i] == suit_cards[l] + 3 and suit_cards[i] == suit_cards[m] + 4):
-                                        
-                                        # Check if the current straight is higher than the previous highest straight
-                                        if suit_cards[i].rank.value > highest_straight_rank:
-                                            hand_rank = handRank.STRAIGHT_FLUSH
-                                            highest_straight_rank = suit_cards[i].rank.value
-                                            hand_played = [suit_cards[i], suit_cards[j], suit_cards[k], suit_cards[l], suit_cards[m]]
-                                    
-                                    # considers edge case of Royal Flush
-                                    if (suit_cards[i] == Rank.ACE and suit_cards[j] == Rank.KING and suit_cards[k] == Rank.QUEEN and 
-                                        suit_cards[l] == Rank.JACK and suit_cards[m] == Rank.TEN):
-                                        hand_rank = handRank.ROYAL_FLUSH
-                                        hand_played = [suit_cards[i], suit_cards[j], suit_cards[k], suit_cards[l], suit_cards[m]]
-                                        return hand_rank, hand_played
-                                    # considers edge case of ace low straight
-                                    if (suit_cards[i] == Rank.ACE and suit_cards[j] == Rank.FIVE and suit_cards[k] == Rank.FOUR and 
-                                        suit_cards[l] == Rank.THREE and suit_cards[m] == Rank.TWO):
-                                        if Rank.FIVE.value > highest_straight_rank:
-                                            highest_straight_rank = Rank.FIVE.value
-                                            hand_rank = handRank.STRAIGHT_FLUSH
-                                            hand_played = [suit_cards[j], suit_cards[k], suit_cards[l], suit_cards[m], suit_cards[i]]
-        if highest_straight_rank != -1:
-            return hand_rank, hand_played
-
-
-        # Check for four of a kind and return highest kicker
-        for i in range(len(all_cards) - 3):
-            if all_cards[i].rank == all_cards[i + 3].rank:
-                hand_rank = handRank.FOUR_OF_A_KIND
-                hand_played = all_cards[i : i + 4]
-                if (all_cards[0] != all_cards[i]):
-                    hand_played.append(all_cards[0])
-                else:
-                    hand_played.append(all_cards[4])
-                return hand_rank, hand_played
-        
-
-        # Check for full house
-        for i in range(len(all_cards) - 2):
-            for i in range(len(all_cards) - 2):
-                if all_cards[i].rank == all_cards[i + 2].rank:
-                    for j in range(len(all_cards) - 1):
-                        if all_cards[j].rank == all_cards[j + 1].rank and all_cards[i].rank != all_cards[j].rank:
-                            hand_rank = handRank.FULL_HOUSE
-                            hand_played = all_cards[i : i + 3]
-                            hand_played.append(all_cards[j])
-                            hand_played.append(all_cards[j + 1])
-                            return hand_rank, hand_played
-        
-
-        # Check for flush
-        for suit in Suit:
-            suit_cards = [card for card in all_cards if card.suit == suit]
-            if len(suit_cards) >= 5:
-                hand_rank = handRank.FLUSH
-                hand_played = suit_cards[:5]
-                return hand_rank, hand_played
-        
-
-        # Check for straight
-        highest_straight_rank = -1
-        
-        for i in range(len(all_cards)):
-            for j in range(i + 1, len(all_cards)):
-                for k in range(j + 1, len(all_cards)):
-                    for l in range(k + 1, len(all_cards)):
-                        for m in range(l + 1, len(all_cards)):
-                            # checks for straight
-                            if (all_cards[i] == all_cards[j] + 1 and all_cards[i] == all_cards[k] + 2 and all_cards[i] == all_cards[l] + 3 and all_cards[i] == all_cards[m] + 4):
-                                
-                                # Check if the current straight is higher than the previous highest straight
-                                if all_cards[i].rank.value > highest_straight_rank:
-                                    hand_rank = handRank.STRAIGHT
-                                    highest_straight_rank = all_cards[i].rank.value
-                                    hand_played = [all_cards[i], all_cards[j], all_cards[k], all_cards[l], all_cards[m]]
-                            
-                            # considers edge case of ace high straight
-                            if (all_cards[i] == Rank.ACE and all_cards[j] == Rank.KING and all_cards[k] == Rank.QUEEN and 
-                                all_cards[l] == Rank.JACK and all_cards[m] == Rank.TEN):
-                                hand_rank = handRank.STRAIGHT
-                                hand_played = [all_cards[i], all_cards[j], all_cards[k], all_cards[l], all_cards[m]]
-                                return hand_rank, hand_played
-                            
-                            # considers edge case of ace low straight
-                            if (all_cards[i] == Rank.ACE and all_cards[j] == Rank.FIVE and all_cards[k] == Rank.FOUR and 
-                                all_cards[l] == Rank.THREE and all_cards[m] == Rank.TWO):
-                                highest_straight_rank = Rank.FIVE.value
-                                hand_rank = handRank.STRAIGHT
-                                hand_played = [all_cards[j], all_cards[k], all_cards[l], all_cards[m], all_cards[i]]
-
-        if highest_straight_rank != -1:
-            return hand_rank, hand_played
-        
-            
-        # Check for highest three of a kind and return highest kicker
-        for i in range(len(all_cards) - 2):
-            if all_cards[i].rank == all_cards[i + 2].rank:
-                hand_rank = handRank.THREE_OF_A_KIND
-                hand_played = all_cards[i : i + 3]
-                if (all_cards[0] != all_cards[i] and all_cards[1] != all_cards[i]):
-                    hand_played.append(all_cards[0])
-                    hand_played.append(all_cards[1])
-                elif (all_cards[0] != all_cards[i] and all_cards[4] != all_cards[i]):
-                    hand_played.append(all_cards[0])
-                    hand_played.append(all_cards[4])
-                else:
-                    hand_played.append(all_cards[3])
-                    hand_played.append(all_cards[4])
-
-                return hand_rank, hand_played
-        
-
-        # Check for two pair and return highest kicker
-        for i in range(len(all_cards) - 1):
-            if all_cards[i].rank == all_cards[i + 1].rank:
-                for j in range(i + 2, len(all_cards) - 1):
-                    if all_cards[j].rank == all_cards[j + 1].rank:
-                        hand_rank = handRank.TWO_PAIR
-                        hand_played = all_cards[i : i + 2]
-                        hand_played.append(all_cards[j])
-                        hand_played.append(all_cards[j + 1])
-                        if (all_cards[0] != all_cards[i] and all_cards[0] != all_cards[j]):
-                            hand_played.append(all_cards[0])
-                        elif (all_cards[2] != all_cards[i] and all_cards[2] != all_cards[j]):
-                            hand_played.append(all_cards[2])
-                        else:
-                            hand_played.append(all_cards[4])
-                        return hand_rank, hand_played
-              
-        
-        # Check for pair and return highest kicker
-        for i in range(len(all_cards) - 1):
-            if all_cards[i].rank == all_cards[i + 1].rank:
-                hand_rank = handRank.PAIR
-                hand_played = all_cards[i : i + 2]
-                if (all_cards[0] != all_cards[i] and all_cards[1] != all_cards[i] and all_cards[2] != all_cards[i]):
-                    hand_played.append(all_cards[0])
-                    hand_played.append(all_cards[1])
-                    hand_played.append(all_cards[2])
-                elif (all_cards[2] != all_cards[i] and all_cards[3] != all_cards[i] and all_cards[4] != all_cards[i]):
-                    hand_played.append(all_cards[2])
-                    hand_played.append(all_cards[3])
-                    hand_played.append(all_cards[4])
-                elif (all_cards[0] != all_cards[i] and all_cards[3] != all_cards[i] and all_cards[4] != all_cards[i]):
-                    hand_played.append(all_cards[0])
-                    hand_played.append(all_cards[3])
-                    hand_played.append(all_cards[4])
-                else:
-                    hand_played.append(all_cards[0])
-                    hand_played.append(all_cards[1])
-                    hand_played.append(all_cards[4])
-                return hand_rank, hand_played
-        
-        # Return highest card
-        hand_rank = handRank.HIGH_CARD
-        hand_played = all_cards[0:5]
-        return hand_rank, hand_played
+        return rank_hand(self.board + [player.card1, player.card2])
     
     # evaluate the hands of all players
     def evaluate_hands(self):
-        for player in self.players:
-            player.hand_rank, player.hand_played = self.get_hand_rank(player)
+        holes = [[player.card1, player.card2] for player in self.players]
+        strengths = evaluate_holes(self.board, holes)
+        for player, hole, strength in zip(self.players, holes, strengths):
+            player.hand_strength = strength
+            player.hand_rank = score_category(strength)
+            player.hand_played = hand_played(self.board + hole, strength)
     
-    # return the winner of the hand and consider tiebreakers
-    def determine_winner(self):
-        winner = self.players[0]
-        for player in self.players:
-            if player.hand_rank > winner.hand_rank:
-                winner = player
-            elif player.hand_rank == winner.hand_rank:
-                for i in range(len(player.hand_played)):
-                    if player.hand_played[i] > winner.hand_played[i]:
-                        winner = player
-                        break
-                    elif player.hand_played[i] < winner.hand_played[i]:
-                        break
-        # Check for ties
-        tiedPlayers = [winner]
-        for player in self.players:
-            if player == winner:
-                continue
-            if player.hand_rank == winner.hand_rank:
-                tie = True
-                for i in range(len(player.hand_played)):
-                    if player.hand_played[i] != winner.hand_played[i]:
-                        tie = False
-                        break
-                if tie:
-                    tiedPlayers.append(player)
+    # return the winner among players, everyone still in the hand by default, and consider tiebreakers
+    def determine_winner(self, players: list[Player] | None = None):
+        if players is None:
+            players = [player for player in self.players if not player.folded]
+        best = max(player.hand_strength for player in players)
+        tiedPlayers = [player for player in players if player.hand_strength == best]
         if len(tiedPlayers) > 1:
             return tiedPlayers
-        return winner
+        return tiedPlayers[0]
+
+# smallest and largest total a player can raise to: at least double the bet and never
+# less than the big blind, at most everything the player has. Shared by the game, the
+# simulation and GameState so the three agree.
+def raise_bounds(current_bet: int, big_blind: int, total: int) -> tuple:
+    return max(current_bet * 2, big_blind), total
+
+
+# round reached once the board holds this many cards
+REPLAY_ROUNDS = {3: Round.FLOP, 4: Round.TURN, 5: Round.RIVER}
+MAX_SEATS = 9
 
+# Heads-up by default, the way the Discord game is played: the button posts the small
+# blind and acts first preflop, and a short all-in call hands the uncovered chips
+# back at once. With more seats the blinds sit left of the button, a player without
+# chips sits the hand out, and chips a short all-in cannot match stay in the pot and
+# are split into side pots when the hand is over (award_pots).
 class PokerGameManager(Dealer):
-    def __init__(self, buy_in: int = 1000, small_blind: int = 5, big_blind: int = 10):
-        super().__init__(2, buy_in)
+    def __init__(self, buy_in: int = 1000, small_blind: int = 5, big_blind: int = 10, seed: int | None = None, rng=None,
+                 history: HandLog | None = None, seats: int = 2):
+        if not 2 <= seats <= MAX_SEATS:
+            raise ValueError(f"A table seats 2 to {MAX_SEATS} players")
+        super().__init__(seats, buy_in, seed, rng)
+        self.history = history
         self.starting_stack = buy_in
         self.small_blind = small_blind
         self.big_blind = big_blind
@@ -272,54 +114,128 @@ class PokerGameManager(Dealer):
         self.current_pot = 0
         self.current_bet = 0
     
+    # player's equity against a random hand, enumerated exactly on the turn and river
+    def player_equity(self, player: int, trials: int = 100_000):
+        hand = self.return_player_hand(player)
+        if self.round in (Round.TURN, Round.RIVER):
+            return exact_equity(hand, self.board)
+        return estimate_equity(hand, self.board, trials=trials, workers=1)
+
     def return_min_max_raise(self, player: int):
-        min_raise = self.current_bet * 2
-        max_raise = self.players[1].stack + self.players[1].round_pot_commitment
-        return (min_raise, max_raise)
+        me = self.players[player]
+        return raise_bounds(self.current_bet, self.big_blind, me.stack + me.round_pot_commitment)
+
+    # seats still in the hand
+    def seats_in_hand(self) -> list[int]:
+        return [seat for seat, player in enumerate(self.players) if not player.folded]
+
+    # the next seat after seat that is still in the hand
+    def next_seat(self, seat: int) -> int:
+        for step in range(1, len(self.players) + 1):
+            following = (seat + step) % len(self.players)
+            if not self.players[following].folded:
+                return following
+        return seat
+
+    def small_blind_seat(self) -> int:
+        return self.button if len(self.players) == 2 else self.next_seat(self.button)
+
+    def big_blind_seat(self) -> int:
+        return self.next_seat(self.small_blind_seat())
+
+    # seat that opens the betting: left of the big blind preflop, left of the button after
+    def first_to_act(self) -> int:
+        return self.next_seat(self.big_blind_seat() if self.round == Round.PRE_FLOP else self.button)
 
     def new_round(self):
         self.new_deal()
         self.current_pot = 0
         self.current_bet = 0
-        self.button = (self.button + 1) % len(self.players)
+        for player in self.players:
+            player.hand_commitment = 0
+            player.hand_strength = 0
+            player.folded = player.stack == 0
+        self.button = self.next_seat(self.button)
         self.current_action = self.button
         self.round = Round.PRE_FLOP
+        if self.history is not None:
+            self.history.record(HAND, self.button, amount=self.small_blind)
+            self.history.record(STAKES, amount=self.big_blind)
+            for seat, player in enumerate(self.players):
+                self.history.record(STACK, seat, amount=player.stack)
+            for seat, player in enumerate(self.players):
+                self.history.record(HOLE, seat, player.card1.index, player.card2.index)
     
     def reset_betting(self):
         self.current_bet = 0
         for player in self.players:
             player.round_pot_commitment = 0
+        if self.history is not None:
+            self.history.record(RESET)
 
-    # puts chips from player stack into the pot
-    def player_bet(self, player: int, amount: int):
+    def _bet(self, player: int, amount: int):
         self.current_pot += amount
         self.players[player].bet(amount)
 
+    # puts chips from player stack into the pot
+    def player_bet(self, player: int, amount: int):
+        self._bet(player, amount)
+        if self.history is not None:
+            self.history.record(BET, player, amount=amount)
+
+    # posts a blind, all of the stack when it is short
+    def post_blind(self, player: int, amount: int):
+        amount = min(amount, self.players[player].stack)
+        self._bet(player, amount)
+        self.current_bet = max(self.current_bet, self.players[player].round_pot_commitment)
+        if self.history is not None:
+            self.history.record(BLIND, player, amount=amount)
+
+    def player_fold(self, player: int):
+        self.players[player].folded = True
+        if self.history is not None:
+            self.history.record(FOLD, player)
+
     # calls the current bet
     def player_call(self, player: int):
         if self.players[player].stack + self.players[player].round_pot_commitment < self.current_bet:
             self.player_all_in_call(player)
             return
         amount_to_call = self.current_bet - self.players[player].round_pot_commitment
-        self.player_bet(player, amount_to_call)
+        self._bet(player, amount_to_call)
+        if self.history is not None:
+            self.history.record(CALL, player, amount=amount_to_call)
 
     # raises the current bet to the amount
     def player_raise(self, player: int, amount: int):
         self.current_bet = amount
         amount_raised = amount - self.players[player].round_pot_commitment
-        self.player_bet(player, amount_raised)
+        self._bet(player, amount_raised)
+        if self.history is not None:
+            self.history.record(RAISE, player, amount=amount_raised)
 
     # player goes all in as a call and matches other player's bet
     def player_all_in_call(self, player: int):
         total_chips = self.players[player].stack + self.players[player].round_pot_commitment
         other_player = (player + 1) % 2
-        if total_chips < self.current_bet:
+        if total_chips < self.current_bet and len(self.players) > 2:
+            # the chips this call cannot match go to a side pot
+            amount = self.players[player].stack
+            self._bet(player, amount)
+            if self.history is not None:
+                self.history.record(ALL_IN_CALL, player, amount=amount)
+        elif total_chips < self.current_bet:
             chips_not_covered = self.current_bet - total_chips
             self.players[other_player].round_pot_commitment = total_chips
+            self.players[other_player].hand_commitment -= chips_not_covered
             self.players[other_player].stack += chips_not_covered
             self.current_pot -= chips_not_covered
             self.current_bet = total_chips
-            self.player_bet(player, total_chips- self.players[player].round_pot_commitment)
+            amount = total_chips - self.players[player].round_pot_commitment
+            self._bet(player, amount)
+            if self.history is not None:
+                self.history.record(REFUND, other_player, amount=chips_not_covered)
+                self.history.record(ALL_IN_CALL, player, amount=amount)
         else:
             self.player_call(player)
 
@@ -336,4 +252,116 @@ class PokerGameManager(Dealer):
             player.stack += self.current_pot
         elif isinstance(player, list):
             for p in player:
-                p.stack += self.current_pot // len(player)
\ No newline at end of file
+                p.stack += self.current_pot // len(player)
+        if self.history is not None:
+            if isinstance(player, list):
+                seat = SPLIT if len(player) > 1 else self.players.index(player[0])
+            else:
+                seat = player if isinstance(player, int) else self.players.index(player)
+            self.history.record(WIN, seat, amount=self.current_pot)
+            self.history.end_hand()
+
+    # the pot split by how much each player put in: a list of (chips, seats that can
+    # win them), the main pot first. A player all-in for less only plays for the
+    # chips every other player matched, the rest goes to side pots among the players
+    # who put in more, and chips no one still in the hand matched go back.
+    def side_pots(self) -> list[tuple]:
+        committed = [player.hand_commitment for player in self.players]
+        live = self.seats_in_hand()
+        pots = []
+        previous = 0
+        for level in sorted({committed[seat] for seat in live}):
+            chips = sum(min(commitment, level) - min(commitment, previous) for commitment in committed)
+            if chips:
+                pots.append((chips, [seat for seat in live if committed[seat] >= level]))
+            previous = level
+        # chips over the highest commitment still in, from players who folded
+        extra = sum(max(commitment - previous, 0) for commitment in committed)
+        if extra and pots:
+            pots[-1] = (pots[-1][0] + extra, pots[-1][1])
+        return pots
+
+    # pays out every pot to its winners once the hand is over, the odd chips of a split
+    # go to the winners first after the button, returns (chips, winning seats) per pot
+    def award_pots(self) -> list[tuple]:
+        pots = self.side_pots()
+        if any(len(seats) > 1 for _, seats in pots):
+            self.evaluate_hands()
+        awarded = []
+        for chips, seats in pots:
+            winners = self.determine_winner([self.players[seat] for seat in seats])
+            winners = winners if isinstance(winners, list) else [winners]
+            winning_seats = sorted((self.players.index(winner) for winner in winners),
+                                   key=lambda seat: (seat - self.button - 1) % len(self.players))
+            share, odd = divmod(chips, len(winning_seats))
+            for order, seat in enumerate(winning_seats):
+                paid = share + (1 if order < odd else 0)
+                self.players[seat].stack += paid
+                if self.history is not None:
+                    self.history.record(WIN, seat, amount=paid)
+            awarded.append((chips, winning_seats))
+        if self.history is not None:
+            self.history.end_hand()
+        return awarded
+
+    # rebuilds a game from a hand history: the hand that holds record `position` is
+    # played through the engine up to that record, the last hand in full without a
+    # position. The round follows the number of board cards dealt.
+    @classmethod
+    def replay(cls, records, position: int | None = None) -> "PokerGameManager":
+        end = len(records) if position is None else position
+        starts = hand_starts(records)
+        first = int(starts[np.searchsorted(starts, min(end, len(records) - 1), side="right") - 1])
+        return cls._replay_hand(records[first:end].tolist())
+
+    @classmethod
+    def _replay_hand(cls, events: list[tuple]) -> "PokerGameManager":
+        game = cls.__new__(cls)
+        game.players = []
+        game.deck = None
+        game.history = None
+        game.board = []
+        game.current_action = 0
+        game.current_pot = 0
+        game.current_bet = 0
+        game.round = Round.PRE_FLOP
+        players = game.players
+        for op, seat, card1, card2, amount in events:
+            if op == HAND:
+                game.button = game.current_action = seat
+                game.small_blind = amount
+            elif op == STAKES:
+                game.big_blind = amount
+            elif op == STACK:
+                players.append(Player("Player " + str(seat + 1), amount))
+                players[seat].folded = amount == 0
+                game.starting_stack = players[0].stack
+            elif op == HOLE:
+                players[seat].card1, players[seat].card2 = CARDS[card1], CARDS[card2]
+                if seat == len(players) - 1:
+                    game.hand_states = [HandState(player.return_hand()) for player in players]
+            elif op == BOARD:
+                card = CARDS[card1]
+                game.board.append(card)
+                for state in game.hand_states:
+                    state.add(card)
+                game.round = REPLAY_ROUNDS.get(len(game.board), game.round)
+            elif op == RAISE:
+                game.player_raise(seat, players[seat].round_pot_commitment + amount)
+            elif op == CALL:
+                game.player_call(seat)
+            elif op == ALL_IN_CALL:
+                game.player_all_in_call(seat)
+            elif op == BET:
+                game.player_bet(seat, amount)
+            elif op == BLIND:
+                game.post_blind(seat, amount)
+            elif op == FOLD:
+                game.player_fold(seat)
+            elif op == RESET:
+                game.reset_betting()
+            elif op == WIN and seat == SPLIT:
+                game.player_win(players)
+            elif op == WIN:
+                players[seat].stack += amount
+        return game
\ No newline at end of file
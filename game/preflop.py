@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from game.batch_evaluator import evaluate_hands
+from game.card import CARDS, Card
+from game.equity import draw_cards
+
+# Heads-up preflop equity between the 169 starting hand classes. Classes are laid out
+# on the usual 13x13 grid with aces first: pairs on the diagonal, suited hands above
+# it and offsuit hands below, so AKs is class 1 and AKo is class 13. The matrix holds
+# the equity of the row class against the column class, averaged over every pair of
+# combos that do not share a card, and is shipped as a small .npy asset.
+MATRIX_VERSION = 1
+MATRIX_PATH = os.path.join(os.path.dirname(__file__), "tables", "preflop_equity.npy")
+CLASS_COUNT = 169
+CLASS_RANKS = "AKQJT98765432"
+CHUNK_TRIALS = 1000
+
+_matrices = {}
+
+
+# row and column on the 13x13 grid, 0 is an ace and 12 a deuce
+def _grid(high: int, low: int, suited: bool) -> int:
+    row, column = 12 - high, 12 - low
+    return row * 13 + column if suited else column * 13 + row
+
+
+# class of two hole cards, e.g. AKs = 1, AKo = 13, 22 = 168
+def hand_class(card1: Card, card2: Card) -> int:
+    high, low = (card1.high, card2.high) if card1.high >= card2.high else (card2.high, card1.high)
+    return _grid(high, low, card1.suit is card2.suit)
+
+
+def class_name(hand: int) -> str:
+    row, column = divmod(hand, 13)
+    if row == column:
+        return CLASS_RANKS[row] * 2
+    if row < column:
+        return CLASS_RANKS[row] + CLASS_RANKS[column] + "s"
+    return CLASS_RANKS[column] + CLASS_RANKS[row] + "o"
+
+
+# every combo as a pair of card indexes, plus the class of each combo
+def class_combos():
+    combos = [(first.index, second.index) for position, first in enumerate(CARDS) for second in CARDS[position + 1:]]
+    classes = [hand_class(CARDS[first], CARDS[second]) for first, second in combos]
+    return np.array(combos, dtype=np.intp), np.array(classes, dtype=np.intp)
+
+
+# number of combos of each column class left once one combo of each row class is dealt
+def live_counts(combos: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    masks = (np.uint64(1) << combos[:, 0].astype(np.uint64)) | (np.uint64(1) << combos[:, 1].astype(np.uint64))
+    first_combo = np.unique(classes, return_index=True)[1]
+    live = (masks[first_combo, None] & masks[None, :]) == 0
+    cells = (np.arange(CLASS_COUNT)[:, None] * CLASS_COUNT + classes)[live]
+    return np.bincount(cells, minlength=CLASS_COUNT * CLASS_COUNT).reshape(CLASS_COUNT, CLASS_COUNT)
+
+
+# equity of one class against every class, from `trials` random boards per matchup
+def _simulate_class(hand: int, trials: int, seed) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    combos, classes = class_combos()
+    order = np.argsort(classes, kind="stable")
+    sorted_combos = combos[order]
+    counts = np.bincount(classes, minlength=CLASS_COUNT)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    hero_combos = combos[classes == hand]
+
+    points = np.zeros(CLASS_COUNT)
+    done = 0
+    while done < trials:
+        rows = min(CHUNK_TRIALS, trials - done)
+        opponent_class = np.repeat(np.arange(CLASS_COUNT), rows)
+        hero = hero_combos[rng.integers(0, len(hero_combos), len(opponent_class))]
+        opponent = np.empty_like(hero)
+        pending = np.arange(len(opponent_class))
+        while len(pending):
+            picks = offsets[opponent_class[pending]] + rng.integers(0, counts[opponent_class[pending]])
+            drawn = sorted_combos[picks]
+            bad = (drawn[:, :, None] == hero[pending][:, None, :]).any(axis=(1, 2))
+            opponent[pending[~bad]] = drawn[~bad]
+            pending = pending[bad]
+
+        board = draw_cards(rng, np.arange(52), 5, len(hero), blocked=np.concatenate([hero, opponent], axis=1))
+        hero_scores = evaluate_hands(np.concatenate([hero, board], axis=1))
+        opponent_scores = evaluate_hands(np.concatenate([opponent, board], axis=1))
+        result = (hero_scores > opponent_scores) + 0.5 * (hero_scores == opponent_scores)
+        points += result.reshape(CLASS_COUNT, rows).sum(axis=1)
+        done += rows
+    return points / trials
+
+
+# samples every matchup both ways and averages the two, so the matrix is exactly
+# antisymmetric around 0.5 and the diagonal is 0.5
+def build_matrix(trials: int = 20_000, workers: int = 1, seed: int = 0) -> np.ndarray:
+    seeds = np.random.SeedSequence(seed).spawn(CLASS_COUNT)
+    if workers == 1:
+        rows = [_simulate_class(hand, trials, seeds[hand]) for hand in range(CLASS_COUNT)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_simulate_class, range(CLASS_COUNT), [trials] * CLASS_COUNT, seeds))
+    sampled = np.array(rows)
+    return ((sampled + 1 - sampled.T) / 2).astype(np.float32)
+
+
+def _metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_matrix(matrix: np.ndarray, path: str = MATRIX_PATH, trials: int = 0, seed: int = 0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, matrix)
+    with open(_metadata_path(path), "w") as metadata:
+        json.dump({"version": MATRIX_VERSION, "trials": trials, "seed": seed}, metadata)
+
+
+# maps the matrix on first use, returns it with the equity of each class against a
+# random hand, weighting every column by how many of its combos are still live
+def load_matrix(path: str = MATRIX_PATH):
+    if path not in _matrices:
+        with open(_metadata_path(path)) as metadata:
+            info = json.load(metadata)
+        if info["version"] != MATRIX_VERSION:
+            raise ValueError(f"Preflop matrix {path} is version {info['version']}, expected {MATRIX_VERSION}")
+        matrix = np.load(path, mmap_mode="r")
+        if matrix.shape != (CLASS_COUNT, CLASS_COUNT):
+            raise ValueError(f"Preflop matrix {path} has shape {matrix.shape}, rebuild it")
+        live = live_counts(*class_combos())
+        _matrices[path] = (matrix, (live * matrix).sum(axis=1) / live.sum(axis=1))
+    return _matrices[path]
+
+
+# equity of two hole cards against the opponent's cards, or against a random hand
+def preflop_equity(card1: Card, card2: Card, opponent: list[Card] | None = None, path: str = MATRIX_PATH) -> float:
+    matrix, vs_random = load_matrix(path)
+    hand = hand_class(card1, card2)
+    if opponent is None:
+        return float(vs_random[hand])
+    return float(matrix[hand, hand_class(*opponent)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the heads-up preflop equity matrix")
+    parser.add_argument("--trials", type=int, default=20_000, help="Boards sampled per matchup and direction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default=MATRIX_PATH, help="Where to write the matrix")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    matrix = build_matrix(args.trials, args.workers, args.seed)
+    write_matrix(matrix, args.path, args.trials, args.seed)
+    print(f"Wrote {matrix.shape[0]}x{matrix.shape[1]} matrix to {args.path} in {time.perf_counter() - start:.0f}s")
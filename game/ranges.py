@@ -0,0 +1,164 @@
+import numpy as np
+from game.batch_evaluator import evaluate_hands
+from game.card import CARDS, Card
+from game.equity import EquityResult
+from game.preflop import CLASS_COUNT, class_name, hand_class, load_matrix
+
+# A range is a dense vector of 1326 weights, one per two-card combo in COMBOS order.
+# Range against range equity is exact: every runout of the board is enumerated, all
+# 1326 combos are scored at once, and the card removal between the two ranges is
+# handled by inclusion-exclusion over sorted scores instead of a 1326x1326 matrix.
+COMBO_COUNT = 1326
+COMBOS = np.array([(first, second) for first in range(52) for second in range(first + 1, 52)], dtype=np.intp)
+COMBO_MASKS = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+COMBO_CLASSES = np.array([hand_class(CARDS[first], CARDS[second]) for first, second in COMBOS], dtype=np.intp)
+
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.intp)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(COMBO_COUNT)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(COMBO_COUNT)
+
+# the 51 combos holding each card, and where each combo sits among them for its
+# first and second card, as positions into CARD_COMBOS.ravel()
+CARD_COMBOS = np.array([np.flatnonzero((COMBOS == card).any(axis=1)) for card in range(52)], dtype=np.intp)
+CARD_POSITIONS = np.empty((COMBO_COUNT, 2), dtype=np.intp)
+for _column in range(2):
+    _cards, _slots = np.nonzero(CARD_COMBOS[COMBOS[:, _column]] == np.arange(COMBO_COUNT)[:, None])
+    CARD_POSITIONS[_cards, _column] = COMBOS[_cards, _column] * 51 + _slots
+del _column, _cards, _slots
+
+
+def combo_index(card1: Card, card2: Card) -> int:
+    return int(COMBO_INDEX[card1.index, card2.index])
+
+
+def card_mask(cards: list[Card]) -> np.uint64:
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.index
+    return np.uint64(mask)
+
+
+# range of the given combos, all with the same weight
+def range_from_hands(hands: list[list[Card]], weight: float = 1.0) -> np.ndarray:
+    weights = np.zeros(COMBO_COUNT)
+    weights[[combo_index(*hand) for hand in hands]] = weight
+    return weights
+
+
+# range from starting hand class weights, e.g. {"AA": 1.0, "AKs": 0.5}
+def range_from_classes(class_weights: dict[str, float]) -> np.ndarray:
+    by_name = {class_name(hand): hand for hand in range(CLASS_COUNT)}
+    weights = np.zeros(CLASS_COUNT)
+    for name, weight in class_weights.items():
+        weights[by_name[name]] = weight
+    return weights[COMBO_CLASSES]
+
+
+def any_two() -> np.ndarray:
+    return np.ones(COMBO_COUNT)
+
+
+# the best `fraction` of starting hands, ranked by preflop equity against a random hand
+def top_range(fraction: float) -> np.ndarray:
+    _, vs_random = load_matrix()
+    weights = np.zeros(CLASS_COUNT)
+    counts = np.bincount(COMBO_CLASSES, minlength=CLASS_COUNT)
+    taken = 0
+    for hand in np.argsort(-vs_random, kind="stable"):
+        if taken >= fraction * COMBO_COUNT:
+            break
+        weights[hand] = 1.0
+        taken += counts[hand]
+    return weights[COMBO_CLASSES]
+
+
+# weight of the entries scoring below and up to each entry of the same row, from one
+# sort per row: ties share the cumulative weight at the start and end of their run
+def _weight_below(scores: np.ndarray, weights: np.ndarray):
+    rows, size = scores.shape
+    order = np.argsort(scores, axis=1)
+    ordered = np.take_along_axis(scores, order, axis=1)
+    cumulative = np.zeros((rows, size + 1))
+    np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1, out=cumulative[:, 1:])
+
+    positions = np.arange(size)
+    changes = ordered[:, 1:] != ordered[:, :-1]
+    starts = np.where(np.concatenate([np.ones((rows, 1), dtype=bool), changes], axis=1), positions, 0)
+    ends = np.where(np.concatenate([changes, np.ones((rows, 1), dtype=bool)], axis=1), positions + 1, size)
+    starts = np.maximum.accumulate(starts, axis=1)
+    ends = np.minimum.accumulate(ends[:, ::-1], axis=1)[:, ::-1]
+
+    less = np.empty((rows, size))
+    equal_or_less = np.empty((rows, size))
+    np.put_along_axis(less, order, np.take_along_axis(cumulative, starts, axis=1), axis=1)
+    np.put_along_axis(equal_or_less, order, np.take_along_axis(cumulative, ends, axis=1), axis=1)
+    return less, equal_or_less
+
+
+# weighted win, tie and loss totals over one batch of complete boards
+def _board_totals(hero: np.ndarray, villain: np.ndarray, boards: np.ndarray):
+    runouts = len(boards)
+    board_masks = np.bitwise_or.reduce(np.uint64(1) << boards.astype(np.uint64), axis=1)
+    live = (COMBO_MASKS[None, :] & board_masks[:, None]) == 0
+    hero_weights = np.where(live, hero, 0.0)
+    villain_weights = np.where(live, villain, 0.0)
+
+    hands = np.concatenate([np.broadcast_to(COMBOS, (runouts, COMBO_COUNT, 2)),
+                            np.broadcast_to(boards[:, None, :], (runouts, COMBO_COUNT, 5))], axis=2)
+    scores = evaluate_hands(hands.reshape(-1, 7)).reshape(runouts, COMBO_COUNT).astype(np.int64)
+
+    less, equal_or_less = _weight_below(scores, villain_weights)
+    total = np.broadcast_to(villain_weights.sum(axis=1, keepdims=True), scores.shape)
+
+    # villain combos that share a card with the hero combo, ranked within the 51 combos
+    # of each card, which always include the hero combo itself
+    card_weights = villain_weights[:, CARD_COMBOS].reshape(runouts * 52, 51)
+    card_less, card_equal_or_less = _weight_below(scores[:, CARD_COMBOS].reshape(runouts * 52, 51), card_weights)
+    card_less = card_less.reshape(runouts, 52 * 51)
+    card_equal_or_less = card_equal_or_less.reshape(runouts, 52 * 51)
+    card_totals = card_weights.sum(axis=1).reshape(runouts, 52)
+    for column in range(2):
+        less = less - card_less[:, CARD_POSITIONS[:, column]]
+        equal_or_less = equal_or_less - card_equal_or_less[:, CARD_POSITIONS[:, column]]
+        total = total - card_totals[:, COMBOS[:, column]]
+    # the hero combo itself was removed once per card, it only belongs in one count
+    equal_or_less = equal_or_less + villain_weights
+    total = total + villain_weights
+
+    wins = (hero_weights * less).sum()
+    ties = (hero_weights * (equal_or_less - less)).sum()
+    losses = (hero_weights * (total - equal_or_less)).sum()
+    return wins, ties, losses
+
+
+# exact equity of one weighted range against another on a flop, turn or river, where
+# every (hero combo, villain combo, runout) without a shared card counts with weight
+# hero weight * villain weight
+def range_equity(hero: np.ndarray, villain: np.ndarray, board: list[Card], batch: int = 32) -> EquityResult:
+    if not 3 <= len(board) <= 5:
+        raise ValueError("Range equity needs a flop, turn or river")
+    board_indexes = [card.index for card in board]
+    live = np.setdiff1d(np.arange(52), board_indexes)
+    blocked = (COMBO_MASKS & card_mask(board)) != 0
+    hero = np.where(blocked, 0.0, np.asarray(hero, dtype=np.float64))
+    villain = np.where(blocked, 0.0, np.asarray(villain, dtype=np.float64))
+
+    missing = 5 - len(board)
+    if missing == 0:
+        runouts = np.empty((1, 0), dtype=np.intp)
+    elif missing == 1:
+        runouts = live[:, None]
+    else:
+        first, second = np.triu_indices(len(live), 1)
+        runouts = np.stack([live[first], live[second]], axis=1)
+    boards = np.concatenate([np.broadcast_to(np.array(board_indexes, dtype=np.intp), (len(runouts), len(board))), runouts], axis=1)
+
+    wins = ties = losses = 0.0
+    for start in range(0, len(boards), batch):
+        batch_wins, batch_ties, batch_losses = _board_totals(hero, villain, boards[start:start + batch])
+        wins += batch_wins
+        ties += batch_ties
+        losses += batch_losses
+    if wins + ties + losses <= 0:
+        raise ValueError("The ranges have no hands left that fit together with the board")
+    return EquityResult(wins, ties, losses, exact=True)
@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+from game.card import RANK_KEYS, Card
+from game.evaluator import FLUSH_SCORES, RANK_SCORES
+
+# A 7-card state machine in the style of the "two plus two" evaluator. Every state
+# owns 52 consecutive entries, one per card index. Walking the first six cards gives
+# the offset of the next state, the seventh card gives the hand score directly:
+#     p = 0
+#     for card in cards: p = table[p + card]
+# States track the count of each rank plus the rank mask of every suit that can
+# still make a flush, so suits that can no longer matter collapse into one state.
+TABLE_VERSION = 2
+TABLE_DIR = os.path.join(os.path.dirname(__file__), "tables")
+TABLE_PATH = os.path.join(TABLE_DIR, "hand_ranks.npy")
+ROW = 52
+
+DEAD_SUIT = 0x2000
+SUIT_FIELD = 0x3FFF
+RANK_FIELD = 0x1FFF
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(1 << 13)], dtype=np.uint8)
+
+_tables = {}
+
+
+def _metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def _rank_lookup():
+    keys = np.array(sorted(RANK_SCORES[7]), dtype=np.int64)
+    scores = np.array([RANK_SCORES[7][key] for key in keys], dtype=np.int32)
+    return keys, scores
+
+
+# deals one card into every state, returns the new states and which deals were possible
+def _deal(counts: np.ndarray, suits: np.ndarray, index: int):
+    rank = (index % 13 + 12) % 13
+    suit_shift = np.uint64(14 * (index // 13))
+    rank_shift = np.uint64(3 * rank)
+    rank_bit = np.uint64(1 << rank)
+
+    valid = (counts >> rank_shift) & np.uint64(7) < 4
+    field = (suits >> suit_shift) & np.uint64(SUIT_FIELD)
+    live = field & np.uint64(DEAD_SUIT) == 0
+    valid &= ~(live & (field & rank_bit != 0))
+
+    new_counts = counts + (np.uint64(1) << rank_shift)
+    new_suits = np.where(live, suits | (rank_bit << suit_shift), suits)
+    return new_counts, new_suits, valid
+
+
+# marks every suit that can no longer reach five cards as dead
+def _prune_suits(suits: np.ndarray, num_cards: int) -> np.ndarray:
+    pruned = suits.copy()
+    for suit in range(4):
+        shift = np.uint64(14 * suit)
+        field = (suits >> shift) & np.uint64(SUIT_FIELD)
+        live = field & np.uint64(DEAD_SUIT) == 0
+        count = POPCOUNT[(field & np.uint64(RANK_FIELD)).astype(np.intp)]
+        dead = live & (count.astype(np.int64) + (7 - num_cards) < 5)
+        pruned = np.where(dead, (pruned & ~(np.uint64(SUIT_FIELD) << shift)) | (np.uint64(DEAD_SUIT) << shift), pruned)
+    return pruned
+
+
+def _final_scores(counts: np.ndarray, suits: np.ndarray, rank_keys: np.ndarray, rank_scores: np.ndarray) -> np.ndarray:
+    key = np.zeros(len(counts), dtype=np.int64)
+    for rank in range(13):
+        key += ((counts >> np.uint64(3 * rank)) & np.uint64(7)).astype(np.int64) * RANK_KEYS[rank]
+    position = np.minimum(np.searchsorted(rank_keys, key), len(rank_keys) - 1)
+    scores = rank_scores[position]
+
+    flush_scores = np.array(FLUSH_SCORES, dtype=np.int32)
+    for suit in range(4):
+        field = (suits >> np.uint64(14 * suit)) & np.uint64(SUIT_FIELD)
+        mask = (field & np.uint64(RANK_FIELD)).astype(np.intp)
+        flush = (field & np.uint64(DEAD_SUIT) == 0) & (POPCOUNT[mask] >= 5)
+        scores = np.where(flush, flush_scores[mask], scores)
+    return scores
+
+
+# builds the state machine, one level of states per card dealt
+def build_table() -> np.ndarray:
+    rank_keys, rank_scores = _rank_lookup()
+    counts = np.zeros(1, dtype=np.uint64)
+    suits = np.zeros(1, dtype=np.uint64)
+    levels = []
+    for num_cards in range(1, 7):
+        dealt = [_deal(counts, suits, index) for index in range(ROW)]
+        new_counts = np.stack([deal[0] for deal in dealt], axis=1)
+        new_suits = _prune_suits(np.stack([deal[1] for deal in dealt], axis=1), num_cards)
+        valid = np.stack([deal[2] for deal in dealt], axis=1)
+
+        pairs = np.stack([new_counts[valid], new_suits[valid]], axis=1)
+        unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        next_ids = np.full(valid.shape, -1, dtype=np.int64)
+        next_ids[valid] = inverse.reshape(-1)
+        levels.append(next_ids)
+        counts, suits = unique[:, 0], unique[:, 1]
+
+    # state rows are laid out level by level, the first row is the empty hand
+    offsets = [0]
+    for next_ids in levels:
+        offsets.append(offsets[-1] + next_ids.shape[0])
+    total_states = offsets[-1] + len(counts)
+    table = np.zeros(total_states * ROW, dtype=np.int32)
+
+    for level, next_ids in enumerate(levels):
+        rows = (offsets[level] + np.arange(next_ids.shape[0]))[:, None] * ROW + np.arange(ROW)
+        targets = (offsets[level + 1] + next_ids) * ROW
+        table[rows[next_ids >= 0]] = targets[next_ids >= 0]
+
+    for index in range(ROW):
+        new_counts, new_suits, valid = _deal(counts, suits, index)
+        scores = _final_scores(new_counts, new_suits, rank_keys, rank_scores)
+        rows = (offsets[-1] + np.arange(len(counts))) * ROW + index
+        table[rows[valid]] = scores[valid]
+    return table
+
+
+def checksum(table: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(table).data).hexdigest()
+
+
+def write_table(table: np.ndarray, path: str = TABLE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, table)
+    with open(_metadata_path(path), "w") as metadata:
+        json.dump({"version": TABLE_VERSION, "entries": int(table.size), "sha256": checksum(table)}, metadata)
+
+
+# maps the table read-only, the pages are shared by every process on the machine
+def load_table(path: str = TABLE_PATH, verify: bool = False) -> np.memmap:
+    if path in _tables:
+        return _tables[path]
+    with open(_metadata_path(path)) as metadata:
+        info = json.load(metadata)
+    if info["version"] != TABLE_VERSION:
+        raise ValueError(f"Rank table {path} is version {info['version']}, expected {TABLE_VERSION}")
+    table = np.load(path, mmap_mode="r")
+    if table.size != info["entries"] or (verify and checksum(table) != info["sha256"]):
+        raise ValueError(f"Rank table {path} does not match its checksum, rebuild it")
+    _tables[path] = table
+    return table
+
+
+# scores one 7-card hand of distinct cards, walking a memoryview to get plain ints
+def evaluate7(table: np.ndarray, cards: list[Card]) -> int:
+    view = table.data
+    position = 0
+    for card in cards:
+        position = view[position + card.index]
+    return position
+
+
+# scores an (N, 7) array of card indexes with seven vectorized lookups
+def evaluate_many(table: np.ndarray, hands: np.ndarray) -> np.ndarray:
+    position = np.zeros(len(hands), dtype=np.int64)
+    for column in range(7):
+        position = table[position + hands[:, column]]
+    return position.astype(np.int32)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the 7-card rank table")
+    parser.add_argument("--path", default=TABLE_PATH, help="Where to write the table")
+    args = parser.parse_args()
+    table = build_table()
+    write_table(table, args.path)
+    print(f"Wrote {table.size} entries ({table.nbytes / 2**20:.1f} MiB) to {args.path}")
@@ -0,0 +1,206 @@
+import math
+import random
+import time
+import numpy as np
+from db.enums import ActionType, Round
+from game.card import CARDS, Card
+from game.equity import DEFAULT_WORKERS, get_pool
+from game.evaluator import CATEGORY_SHIFT, evaluate
+from game.game_state import GameState
+from game.preflop import preflop_equity
+
+# Information-set Monte Carlo tree search for the heads-up game. The tree is built
+# over the betting actions on GameState only, the cards the searching player cannot
+# see (the opponent's hand and the rest of the board) are dealt again at random on
+# every iteration, so one tree averages over all the hands the opponent could hold.
+# The searching player picks actions by UCB1. The opponent is not searched, a tree
+# shared over its hands would let it play against the cards it cannot see, instead
+# it acts from a noisy model of the hand it was dealt in that iteration, so its
+# actions carry information about its cards the way a real opponent's do. Every
+# iteration adds one node, then checks the hand down from it (calling a bet that is
+# faced) and backs the chips won up the path. Raises are abstracted to a few pot
+# fractions plus all-in. With workers > 1 each worker grows its own tree from its
+# own seed until the shared deadline and the root visit counts are summed (root
+# parallelization).
+DEFAULT_BUDGET = 0.15
+RAISE_SIZES = (0.5, 1.0)
+EXPLORATION = 0.25
+# opponent model: strength of a made hand by category, the noise added to it, and
+# the strength it raises with and calls with on top of the price of calling
+MADE_STRENGTH = (0.3, 0.55, 0.7, 0.8, 0.85, 0.88, 0.92, 0.97, 1.0, 1.0)
+MODEL_NOISE = 0.15
+MODEL_RAISE = 0.75
+MODEL_CALL = 0.15
+# time kept back from the budget for handing the work to the pool and merging
+POOL_OVERHEAD = 0.02
+
+KEYS = [card.key for card in CARDS]
+ROUND_INDEX = {Round.PRE_FLOP: 0, Round.FLOP: 1, Round.TURN: 2, Round.RIVER: 3}
+
+
+class Node:
+    __slots__ = ("player", "actions", "children", "visits", "value")
+
+    def __init__(self, state: GameState):
+        self.player = state.to_act
+        self.actions = abstract_actions(state)
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+
+# the actions searched from a state: fold, check or call, raises to a fraction of
+# the pot after calling, and all-in, amount is the total to raise to
+def abstract_actions(state: GameState) -> list[tuple]:
+    actions = []
+    for action in state.legal_actions():
+        if action is ActionType.RAISE:
+            low, high = state.raise_bounds()
+            to_call = state.bet - state.commitments[state.to_act]
+            amounts = sorted({max(low, state.bet + int(size * (state.pot + to_call))) for size in RAISE_SIZES})
+            actions.extend((action, amount) for amount in amounts if amount < high)
+        else:
+            actions.append((action, None))
+    return actions
+
+
+# the opponent's action from the strength of its hand: raise strong hands, call
+# when strong enough for the price, otherwise check or fold
+def _model_action(state: GameState, actions: list[tuple], strength: float, rng: random.Random) -> tuple:
+    strength += (rng.random() * 2 - 1) * MODEL_NOISE
+    to_call = state.bet - state.commitments[state.to_act]
+    raises = [action for action in actions if action[0] is ActionType.RAISE or action[0] is ActionType.ALL_IN]
+    if strength > MODEL_RAISE and raises:
+        return raises[rng.randrange(len(raises))]
+    if to_call == 0:
+        return ActionType.CHECK, None
+    if strength > MODEL_CALL + to_call / (state.pot + to_call):
+        return ActionType.CALL, None
+    return ActionType.FOLD, None
+
+
+# opponent strength on each street for one deal: equity against a random hand
+# preflop, the category of the made hand with the board dealt so far after that
+def _street_strengths(hole: list[int], board_keys: list[int]) -> list[float]:
+    strengths = [preflop_equity(CARDS[hole[0]], CARDS[hole[1]])]
+    hole_keys = [KEYS[index] for index in hole]
+    for size in (3, 4, 5):
+        strengths.append(MADE_STRENGTH[evaluate(hole_keys + board_keys[:size]) >> CATEGORY_SHIFT])
+    return strengths
+
+
+# hero's chips won from the root once the hand is checked down from state
+def _check_down(state: GameState, hero: int, result: int) -> int:
+    if not state.is_terminal and state.bet > state.commitments[state.to_act]:
+        state = state.apply(ActionType.CALL)
+    if state.folded >= 0:
+        return state.final_stacks()[hero]
+    winner = None if result == 0 else hero if result > 0 else 1 - hero
+    return state.final_stacks(winner)[hero]
+
+
+# grows one tree from root until the deadline or the iteration limit, returns the
+# visits and total chips won (in units of the effective stack plus the pot) of every
+# root action
+def _search(root_state: GameState, hero: int, hole: list[int], board: list[int], deadline: float,
+            iterations: int | None, seed):
+    rng = random.Random(seed)
+    live = [index for index in range(52) if index not in hole and index not in board]
+    hero_keys = [KEYS[index] for index in hole + board]
+    board_keys = [KEYS[index] for index in board]
+    runout = 5 - len(board)
+    scale = min(root_state.stack0, root_state.stack1) + root_state.pot
+    start = root_state.stacks[hero]
+    root = Node(root_state)
+
+    done = 0
+    while (iterations is None or done < iterations) and (done == 0 or time.monotonic() < deadline):
+        dealt = rng.sample(live, runout + 2)
+        drawn = [KEYS[index] for index in dealt]
+        hero_score = evaluate(hero_keys + drawn[2:])
+        opponent_score = evaluate(board_keys + drawn)
+        result = (hero_score > opponent_score) - (hero_score < opponent_score)
+        strengths = None
+
+        state = root_state
+        node = root
+        path = [node]
+        while not state.is_terminal:
+            if node.player != hero:
+                if strengths is None:
+                    strengths = _street_strengths(dealt[:2], board_keys + drawn[2:])
+                action = _model_action(state, node.actions, strengths[ROUND_INDEX[state.round]], rng)
+                state = state.apply(*action)
+                child = node.children.get(action)
+                if child is None:
+                    node.children[action] = node = Node(state)
+                    path.append(node)
+                    break
+                node = child
+                path.append(node)
+                continue
+            untried = [action for action in node.actions if action not in node.children]
+            if untried:
+                action = untried[rng.randrange(len(untried))]
+                state = state.apply(*action)
+                node.children[action] = node = Node(state)
+                path.append(node)
+                break
+            log_visits = math.log(node.visits)
+            action, node = max(node.children.items(),
+                               key=lambda item: item[1].value / item[1].visits + EXPLORATION * math.sqrt(log_visits / item[1].visits))
+            state = state.apply(*action)
+            path.append(node)
+
+        value = (_check_down(state, hero, result) - start) / scale
+        for node in path:
+            node.visits += 1
+            node.value += value
+        done += 1
+    return [(action, child.visits, child.value) for action, child in root.children.items()]
+
+
+class SearchResult:
+    def __init__(self, stats: dict, iterations: int, seconds: float):
+        self.stats = stats
+        self.iterations = iterations
+        self.seconds = seconds
+
+    # the most visited action and the total to raise to, or None
+    @property
+    def best(self) -> tuple:
+        return max(self.stats, key=lambda action: self.stats[action][0])
+
+    def __repr__(self):
+        lines = ", ".join(f"{action.value}{'' if amount is None else f' {amount}'}: {visits} visits {value / visits:+.3f}"
+                          for (action, amount), (visits, value) in self.stats.items() if visits)
+        return f"SearchResult(iterations={self.iterations}, seconds={self.seconds:.3f}, {lines})"
+
+
+# searches the decision of the player to act in state, who holds hole, within budget
+# seconds of wall clock (or for a fixed number of iterations per worker)
+def search(state: GameState, hole: list[Card], board: list[Card], budget: float = DEFAULT_BUDGET,
+           iterations: int | None = None, workers: int | None = None, seed: int | None = None) -> SearchResult:
+    if state.is_terminal:
+        raise ValueError("No decision to search in a finished hand")
+    start = time.monotonic()
+    workers = workers or DEFAULT_WORKERS
+    hero = state.to_act
+    hole_indexes = [card.index for card in hole]
+    board_indexes = [card.index for card in board]
+    seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(workers)]
+
+    if workers == 1:
+        results = [_search(state, hero, hole_indexes, board_indexes, start + budget, iterations, seeds[0])]
+    else:
+        deadline = start + max(budget - POOL_OVERHEAD, budget / 2)
+        jobs = [(state, hero, hole_indexes, board_indexes, deadline, iterations, worker_seed) for worker_seed in seeds]
+        results = list(get_pool(workers).map(_search, *zip(*jobs)))
+
+    stats = {action: [0, 0.0] for action in abstract_actions(state)}
+    for result in results:
+        for action, visits, value in result:
+            stats[action][0] += visits
+            stats[action][1] += value
+    total = sum(visits for visits, _ in stats.values())
+    return SearchResult({action: tuple(stat) for action, stat in stats.items()}, total, time.monotonic() - start)
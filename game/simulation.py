@@ -0,0 +1,289 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from db.enums import ActionType, Round
+from game.player import handRank
+from game.poker import PokerGameManager
+from game.preflop import preflop_equity
+
+# Headless heads-up engine. It drives PokerGameManager through the same flow as the
+# Discord handler (blinds, short stacks going all-in with the blinds, small blind
+# first preflop and big blind first after, a raise reopening the action, all-in
+# calls running the board out, showdown with split pots) without any I/O, so two
+# policies can play each other for millions of hands. A policy is any object with
+#     act(game, player, legal, rng) -> (ActionType, raise_amount)
+# where legal lists the actions allowed and raise_amount is the total bet for a raise.
+# With more than two policies the hand is played at a table of that many seats, with
+# the blinds left of the button and the pots split by award_pots.
+NEXT_STREET = {Round.PRE_FLOP: Round.FLOP, Round.FLOP: Round.TURN, Round.TURN: Round.RIVER}
+BOARD_SIZE = {Round.FLOP: 3, Round.TURN: 4, Round.RIVER: 5}
+
+
+def legal_actions(game: PokerGameManager, player: int) -> list[ActionType]:
+    me = game.players[player]
+    others_can_call = any(other.stack > 0 and not other.folded for other in game.players if other is not me)
+    total = me.stack + me.round_pot_commitment
+    if game.current_bet > me.round_pot_commitment:
+        actions = [ActionType.FOLD, ActionType.CALL]
+    else:
+        actions = [ActionType.CHECK]
+    if others_can_call and total > game.current_bet:
+        if total > game.return_min_max_raise(player)[0]:
+            actions.append(ActionType.RAISE)
+        actions.append(ActionType.ALL_IN)
+    return actions
+
+
+class CallingStation:
+    def act(self, game, player, legal, rng):
+        return (ActionType.CALL if ActionType.CALL in legal else ActionType.CHECK), None
+
+
+class RandomPolicy:
+    def act(self, game, player, legal, rng):
+        action = legal[int(rng.integers(len(legal)))]
+        if action == ActionType.RAISE:
+            low, high = game.return_min_max_raise(player)
+            return action, int(rng.integers(low, high + 1))
+        return action, None
+
+
+# raises good hands, calls fair ones and gives up the rest: preflop on equity against
+# a random hand, after the flop on the made hand and draws from the hand state
+class EquityPolicy:
+    def __init__(self, raise_above: float = 0.6, call_above: float = 0.45):
+        self.raise_above = raise_above
+        self.call_above = call_above
+
+    def act(self, game, player, legal, rng):
+        if game.round == Round.PRE_FLOP:
+            strength = preflop_equity(*game.return_player_hand(player))
+        else:
+            state = game.hand_state(player)
+            strength = 0.7 if state.category > handRank.PAIR else 0.5 if state.category == handRank.PAIR or state.outs >= 8 else 0.3
+        if strength >= self.raise_above and ActionType.RAISE in legal:
+            low, high = game.return_min_max_raise(player)
+            return ActionType.RAISE, min(max(low, game.current_bet + game.current_pot), high)
+        if strength >= self.call_above and ActionType.CALL in legal:
+            return ActionType.CALL, None
+        return (ActionType.CHECK if ActionType.CHECK in legal else ActionType.FOLD), None
+
+
+# a raise to amount clamped into the player's raise bounds (the minimum raise when no
+# amount is given), all-in for ALL_IN or when the clamped raise is the whole stack
+def _play_raise(game: PokerGameManager, player: int, action: ActionType, amount):
+    low, high = game.return_min_max_raise(player)
+    if action == ActionType.RAISE:
+        amount = low if amount is None else min(max(int(amount), low), high)
+        if amount < high:
+            game.player_raise(player, amount)
+            return
+    game.player_all_in_raise(player)
+
+
+# plays one betting round, returns the seat that folded, or None once the action is
+# closed, either by a check or call behind or by a call that leaves a player all-in
+def _betting_round(game: PokerGameManager, policies, first: int, rng):
+    player = first
+    acted = [False, False]
+    while True:
+        other = (player + 1) % 2
+        legal = legal_actions(game, player)
+        action, amount = policies[player].act(game, player, legal, rng)
+        if action not in legal:
+            action = ActionType.CHECK if ActionType.CHECK in legal else ActionType.FOLD
+
+        if action == ActionType.FOLD:
+            return player
+        if action == ActionType.CHECK:
+            acted[player] = True
+            if acted[other]:
+                return None
+        elif action == ActionType.CALL:
+            game.player_call(player)
+            acted[player] = True
+            if acted[other] or game.players[player].stack == 0 or game.players[other].stack == 0:
+                return None
+        else:
+            _play_raise(game, player, action, amount)
+            acted = [False, False]
+            acted[player] = True
+        player = other
+
+
+def _showdown(game: PokerGameManager):
+    game.deal_board(5)
+    game.round = Round.SHOWDOWN
+    game.evaluate_hands()
+    game.player_win(game.determine_winner())
+
+
+# plays the action or raise a policy chose, falling back to check or fold when it is
+# not legal, returns the action played
+def _table_action(game: PokerGameManager, policies, player: int, rng) -> ActionType:
+    legal = legal_actions(game, player)
+    action, amount = policies[player].act(game, player, legal, rng)
+    if action not in legal:
+        action = ActionType.CHECK if ActionType.CHECK in legal else ActionType.FOLD
+    if action == ActionType.FOLD:
+        game.player_fold(player)
+    elif action == ActionType.CALL:
+        game.player_call(player)
+    elif action in (ActionType.RAISE, ActionType.ALL_IN):
+        _play_raise(game, player, action, amount)
+    return action
+
+
+# one betting round at a table of more than two seats, over once every player who
+# still has chips has acted since the last raise and matched the bet, or one is left
+def _table_betting_round(game: PokerGameManager, policies, rng):
+    acted = set()
+    player = game.first_to_act()
+    while len(game.seats_in_hand()) > 1:
+        can_act = [seat for seat in game.seats_in_hand() if game.players[seat].stack > 0]
+        pending = [seat for seat in can_act
+                   if seat not in acted or game.players[seat].round_pot_commitment < game.current_bet]
+        if not pending:
+            return
+        # the only player with chips left has no one to bet against once the bet is matched
+        if len(can_act) == 1 and game.players[can_act[0]].round_pot_commitment >= game.current_bet:
+            return
+        if player in pending:
+            bet = game.current_bet
+            _table_action(game, policies, player, rng)
+            if game.current_bet > bet:
+                acted = set()
+            acted.add(player)
+        player = game.next_seat(player)
+
+
+def _play_table_hand(game: PokerGameManager, policies, rng) -> list[int]:
+    start = [player.stack for player in game.players]
+    game.new_round()
+    game.reset_betting()
+    game.post_blind(game.small_blind_seat(), game.small_blind)
+    game.post_blind(game.big_blind_seat(), game.big_blind)
+    while True:
+        _table_betting_round(game, policies, rng)
+        live = game.seats_in_hand()
+        if len(live) == 1:
+            break
+        if game.round == Round.RIVER or sum(game.players[seat].stack > 0 for seat in live) <= 1:
+            game.deal_board(5)
+            game.round = Round.SHOWDOWN
+            break
+        game.round = NEXT_STREET[game.round]
+        game.reset_betting()
+        game.deal_board(BOARD_SIZE[game.round])
+    game.award_pots()
+    return [player.stack - stack for player, stack in zip(game.players, start)]
+
+
+# plays one hand, the button moves every hand, returns each seat's chip delta
+def play_hand(game: PokerGameManager, policies, rng) -> list[int]:
+    if len(game.players) > 2:
+        return _play_table_hand(game, policies, rng)
+    start = [player.stack for player in game.players]
+    game.new_round()
+    game.reset_betting()
+    small_blind = game.button
+    big_blind = (small_blind + 1) % 2
+
+    # a stack that cannot cover the big blind is all-in and called
+    if min(start) <= game.big_blind:
+        short = 0 if start[0] <= start[1] else 1
+        game.player_all_in_raise(short)
+        game.player_call((short + 1) % 2)
+        _showdown(game)
+        return [player.stack - stack for player, stack in zip(game.players, start)]
+
+    game.player_raise(small_blind, game.small_blind)
+    game.player_raise(big_blind, game.big_blind)
+    first = small_blind
+    while True:
+        folded = _betting_round(game, policies, first, rng)
+        if folded is not None:
+            game.player_win((folded + 1) % 2)
+            break
+        if game.round == Round.RIVER or any(player.stack == 0 for player in game.players):
+            _showdown(game)
+            break
+        game.round = NEXT_STREET[game.round]
+        game.reset_betting()
+        game.deal_board(BOARD_SIZE[game.round])
+        first = big_blind
+    return [player.stack - stack for player, stack in zip(game.players, start)]
+
+
+class MatchResult:
+    def __init__(self, hands: int, net: list[int], seconds: float, big_blind: int):
+        self.hands = hands
+        self.net = net
+        self.seconds = seconds
+        self.big_blind = big_blind
+
+    # big blinds won per 100 hands by a seat
+    def bb_per_100(self, seat: int) -> float:
+        return self.net[seat] / self.big_blind / self.hands * 100 if self.hands else 0.0
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.seconds if self.seconds else 0.0
+
+    def __add__(self, other: "MatchResult") -> "MatchResult":
+        return MatchResult(self.hands + other.hands, [mine + theirs for mine, theirs in zip(self.net, other.net)],
+                           self.seconds + other.seconds, self.big_blind)
+
+    def __repr__(self):
+        return f"MatchResult(hands={self.hands}, bb/100={self.bb_per_100(0):+.2f}/{self.bb_per_100(1):+.2f}, hands/s={self.hands_per_second:,.0f})"
+
+
+# plays `hands` hands between two policies, stacks are topped up to the buy-in every
+# hand so each hand is played at the same depth
+def play_match(policies, hands: int, seed=None, buy_in: int = 1000, small_blind: int = 5, big_blind: int = 10) -> MatchResult:
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    deck_seed, policy_seed = seed.spawn(2)
+    game = PokerGameManager(buy_in, small_blind, big_blind, seed=deck_seed, seats=len(policies))
+    rng = np.random.default_rng(policy_seed)
+    net = [0] * len(policies)
+    start = time.perf_counter()
+    for _ in range(hands):
+        for player in game.players:
+            player.stack = buy_in
+        for seat, delta in enumerate(play_hand(game, policies, rng)):
+            net[seat] += delta
+    return MatchResult(hands, net, time.perf_counter() - start, big_blind)
+
+
+# splits the hands over a process pool, every worker plays its share from its own seed
+def run_matches(policies, hands: int, workers: int | None = None, seed: int | None = None, **blinds) -> MatchResult:
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [hands // workers + (1 if worker < hands % workers else 0) for worker in range(workers)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_match(policies, shares[0], seeds[0], **blinds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_match, policies, share, worker_seed, **blinds)
+                       for share, worker_seed in zip(shares, seeds)]
+            results = [future.result() for future in futures]
+    total = sum(results[1:], results[0])
+    total.seconds = time.perf_counter() - start
+    return total
+
+
+POLICIES = {"call": CallingStation, "random": RandomPolicy, "equity": EquityPolicy}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless heads-up matches between two policies")
+    parser.add_argument("policies", nargs=2, choices=sorted(POLICIES), help="Policy for seat 0 and seat 1")
+    parser.add_argument("--hands", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    result = run_matches([POLICIES[name]() for name in args.policies], args.hands, args.workers, args.seed)
+    print(result)
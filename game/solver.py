@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from db.enums import ActionType, Round
+from game.batch_evaluator import evaluate_hands
+from game.card import Card
+from game.game_state import GameState
+from game.poker import PokerGameManager
+from game.preflop import CLASS_COUNT, class_combos, hand_class, live_counts, load_matrix
+from game.ranges import CARD_COMBOS, CARD_POSITIONS, COMBO_COUNT, COMBO_MASKS, COMBOS, card_mask, combo_index
+
+# Vectorized CFR+ for the spots small enough to solve exactly. Regrets are kept for
+# every hand at once (169 classes preflop, 1326 combos on the river) so one pass over
+# the game tree is a handful of NumPy operations per node, regrets are floored at
+# zero after every update and the average strategy weights iteration t by t.
+#
+# Push/fold: the small blind goes all-in or folds, the big blind calls or folds.
+# Charts for every effective stack from 1 to 30 big blinds are solved from the
+# preflop equity matrix (with card removal between the two hands) and shipped as a
+# small .npy asset, so a short-stacked decision is one array lookup. The players only
+# follow the charts at PUSH_FOLD_DEPTH big blinds or less, deeper spots have better
+# options than all-in or fold.
+#
+# River: a betting subgame on a complete board between two 1326-combo ranges, with
+# bets and raises abstracted to pot fractions plus all-in, solved on demand. It is a
+# library entry point for analysis, no player calls it yet.
+CHART_VERSION = 1
+CHART_PATH = os.path.join(os.path.dirname(__file__), "tables", "push_fold.npy")
+STACK_STEP = 0.5
+MIN_STACK = 1.0
+MAX_STACK = 30.0
+PUSH_FOLD_DEPTH = 10.0
+PUSH_FOLD_ITERATIONS = 2000
+RIVER_ITERATIONS = 300
+RIVER_TIME_LIMIT = 0.9
+BET_SIZES = (0.5, 1.0)
+RAISE_SIZES = (1.0,)
+MAX_RAISES = 2
+PUSH, CALL = 0, 1
+
+_charts = {}
+
+
+# weight of every (small blind class, big blind class) deal: combos of the first
+# class times combos of the second that are still live
+def _deal_weights() -> np.ndarray:
+    counts = np.bincount(class_combos()[1], minlength=CLASS_COUNT)
+    return counts[:, None] * live_counts(*class_combos())
+
+
+def stack_depths() -> np.ndarray:
+    return np.arange(MIN_STACK, MAX_STACK + STACK_STEP / 2, STACK_STEP)
+
+
+# push and call probabilities per class for one effective stack in big blinds, plus
+# the exploitability of the average strategies in big blinds per hand
+def solve_push_fold(stack: float, iterations: int = PUSH_FOLD_ITERATIONS, equity: np.ndarray | None = None):
+    if equity is None:
+        equity = np.asarray(load_matrix()[0], dtype=np.float64)
+    weights = _deal_weights()
+    # small blind's result when called, and when the big blind folds or the small blind folds
+    called = weights * (2 * stack * equity - stack)
+    small_blind_weights = weights.sum(axis=1)
+
+    push_regrets = np.zeros((2, CLASS_COUNT))
+    call_regrets = np.zeros((2, CLASS_COUNT))
+    push_average = np.zeros(CLASS_COUNT)
+    call_average = np.zeros(CLASS_COUNT)
+    push = np.full(CLASS_COUNT, 0.5)
+    call = np.full(CLASS_COUNT, 0.5)
+    for iteration in range(1, iterations + 1):
+        # small blind update against the current calling strategy
+        push_value = called @ call + small_blind_weights - weights @ call
+        fold_value = -0.5 * small_blind_weights
+        push = _update(push_regrets, push_value, fold_value)
+        push_average += iteration * push
+        # big blind update against the new pushing strategy
+        call_value = -(push @ called)
+        fold_value = -(push @ weights)
+        call = _update(call_regrets, call_value, fold_value)
+        call_average += iteration * call
+
+    total = iterations * (iterations + 1) / 2
+    push, call = push_average / total, call_average / total
+    return push, call, _push_fold_exploitability(push, call, called, weights)
+
+
+# CFR+ step for a two action decision, returns the new probability of the first action
+def _update(regrets: np.ndarray, first_value: np.ndarray, second_value: np.ndarray) -> np.ndarray:
+    probability = _current(regrets)
+    value = probability * first_value + (1 - probability) * second_value
+    regrets[0] = np.maximum(regrets[0] + first_value - value, 0)
+    regrets[1] = np.maximum(regrets[1] + second_value - value, 0)
+    return _current(regrets)
+
+
+def _current(regrets: np.ndarray) -> np.ndarray:
+    total = regrets[0] + regrets[1]
+    return np.divide(regrets[0], total, out=np.full(regrets.shape[1], 0.5), where=total > 0)
+
+
+# average of what a best response gains against each side, in big blinds per hand,
+# the game values cancel out since whatever one side wins the other loses
+def _push_fold_exploitability(push, call, called, weights) -> float:
+    small_blind_weights = weights.sum(axis=1)
+    best_small_blind = np.maximum(called @ call + small_blind_weights - weights @ call, -0.5 * small_blind_weights).sum()
+    best_big_blind = np.maximum(-(push @ called), -(push @ weights)).sum() + 0.5 * ((1 - push) @ weights).sum()
+    return float((best_small_blind + best_big_blind) / 2 / weights.sum())
+
+
+def build_charts(iterations: int = PUSH_FOLD_ITERATIONS) -> np.ndarray:
+    equity = np.asarray(load_matrix()[0], dtype=np.float64)
+    charts = np.empty((len(stack_depths()), 2, CLASS_COUNT), dtype=np.float32)
+    for depth, stack in enumerate(stack_depths()):
+        push, call, _ = solve_push_fold(stack, iterations, equity)
+        charts[depth] = push, call
+    return charts
+
+
+def _metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_charts(charts: np.ndarray, path: str = CHART_PATH, iterations: int = 0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, charts)
+    with open(_metadata_path(path), "w") as metadata:
+        json.dump({"version": CHART_VERSION, "iterations": iterations, "min_stack": MIN_STACK,
+                   "max_stack": MAX_STACK, "stack_step": STACK_STEP}, metadata)
+
+
+def load_charts(path: str = CHART_PATH) -> np.ndarray:
+    if path not in _charts:
+        with open(_metadata_path(path)) as metadata:
+            info = json.load(metadata)
+        if info["version"] != CHART_VERSION:
+            raise ValueError(f"Push/fold charts {path} are version {info['version']}, expected {CHART_VERSION}")
+        charts = np.load(path)
+        if charts.shape != (len(stack_depths()), 2, CLASS_COUNT):
+            raise ValueError(f"Push/fold charts {path} have shape {charts.shape}, rebuild them")
+        _charts[path] = charts
+    return _charts[path]
+
+
+# probability of going all-in as the small blind (or of calling the small blind's
+# all-in as the big blind) with two hole cards at an effective stack in big blinds
+def push_fold(card1: Card, card2: Card, stack: float, calling: bool = False, path: str = CHART_PATH) -> float:
+    depth = int(round((min(max(stack, MIN_STACK), MAX_STACK) - MIN_STACK) / STACK_STEP))
+    return float(load_charts(path)[depth, CALL if calling else PUSH, hand_class(card1, card2)])
+
+
+# the charted action of player in a push/fold spot at max_depth big blinds or less
+# (at most MAX_STACK): first to act as the small blind, or facing the small blind's
+# all-in with only the big blind in, returns (ActionType, amount) or None when the
+# spot is not charted
+def push_fold_action(game: PokerGameManager, player: int, max_depth: float = PUSH_FOLD_DEPTH):
+    me, other = game.players[player], game.players[(player + 1) % 2]
+    if game.round != Round.PRE_FLOP:
+        return None
+    stack = min(me.stack + me.round_pot_commitment, other.stack + other.round_pot_commitment) / game.big_blind
+    if stack > min(max_depth, MAX_STACK):
+        return None
+    card1, card2 = game.return_player_hand(player)
+    if player == game.button and game.current_bet == game.big_blind and me.round_pot_commitment < game.big_blind:
+        if push_fold(card1, card2, stack) >= 0.5:
+            return ActionType.ALL_IN, me.stack
+        return ActionType.FOLD, None
+    if player != game.button and other.stack == 0 and me.round_pot_commitment <= game.big_blind:
+        if push_fold(card1, card2, stack, calling=True) >= 0.5:
+            return ActionType.CALL, None
+        return ActionType.FOLD, None
+    return None
+
+
+# presorted scores of the combos on one river, so the opponent weight a combo beats
+# and ties, without the combos it shares a card with, is a cumulative sum away
+class _Showdown:
+    def __init__(self, board: list[Card]):
+        board_indexes = np.array([card.index for card in board], dtype=np.intp)
+        hands = np.concatenate([COMBOS, np.broadcast_to(board_indexes, (COMBO_COUNT, 5))], axis=1)
+        scores = evaluate_hands(hands).astype(np.int64)
+        order, starts, ends = _tie_bounds(scores[None, :])
+        self.order, self.starts, self.ends = order[0], starts[0], ends[0]
+        card_order, card_starts, card_ends = _tie_bounds(scores[CARD_COMBOS])
+        self.card_order = np.take_along_axis(CARD_COMBOS, card_order, axis=1)
+        # positions in the flattened (52, 52) cumulative sums of each combo's two cards
+        rows = np.arange(52)[:, None] * 52
+        card_starts = (rows + card_starts).ravel()[CARD_POSITIONS]
+        card_ends = (rows + card_ends).ravel()[CARD_POSITIONS]
+        self.first_starts, self.second_starts = card_starts[:, 0].copy(), card_starts[:, 1].copy()
+        self.first_ends, self.second_ends = card_ends[:, 0].copy(), card_ends[:, 1].copy()
+        self.first_totals, self.second_totals = COMBOS[:, 0] * 52 + 51, COMBOS[:, 1] * 52 + 51
+        self.cumulative = np.zeros(COMBO_COUNT + 1)
+        self.card_cumulative = np.zeros((52, 52))
+
+    # opponent weight below, below or tied, and in total for every combo
+    def totals(self, weights: np.ndarray):
+        cumulative = self.cumulative
+        np.cumsum(weights[self.order], out=cumulative[1:])
+        card_cumulative = self.card_cumulative
+        np.cumsum(weights[self.card_order], axis=1, out=card_cumulative[:, 1:])
+        cards = card_cumulative.ravel()
+        less = cumulative[self.starts] - cards[self.first_starts] - cards[self.second_starts]
+        equal_or_less = cumulative[self.ends] - cards[self.first_ends] - cards[self.second_ends] + weights
+        total = cumulative[-1] - cards[self.first_totals] - cards[self.second_totals] + weights
+        return less, equal_or_less, total
+
+
+# sort order of each row, and for every entry the sorted positions where its run of
+# equal scores starts and ends
+def _tie_bounds(scores: np.ndarray):
+    rows, size = scores.shape
+    order = np.argsort(scores, axis=1, kind="stable")
+    ordered = np.take_along_axis(scores, order, axis=1)
+    positions = np.arange(size)
+    changes = ordered[:, 1:] != ordered[:, :-1]
+    starts = np.where(np.concatenate([np.ones((rows, 1), dtype=bool), changes], axis=1), positions, 0)
+    ends = np.where(np.concatenate([changes, np.ones((rows, 1), dtype=bool)], axis=1), positions + 1, size)
+    starts = np.maximum.accumulate(starts, axis=1)
+    ends = np.minimum.accumulate(ends[:, ::-1], axis=1)[:, ::-1]
+    entry_starts = np.empty_like(starts)
+    entry_ends = np.empty_like(ends)
+    np.put_along_axis(entry_starts, order, starts, axis=1)
+    np.put_along_axis(entry_ends, order, ends, axis=1)
+    return order, entry_starts, entry_ends
+
+
+class _Node:
+    __slots__ = ("state", "player", "actions", "children", "regrets", "average", "payoffs")
+
+    def __init__(self, state: GameState, root: GameState, raises: int):
+        self.state = state
+        self.player = state.to_act
+        self.children = []
+        self.actions = []
+        if state.is_terminal:
+            # each player's chips won over an even share of the pot the river started
+            # with, so the subgame is zero-sum: when one folds, or at showdown when
+            # seat 0 wins, seat 1 wins and they split
+            start = [root.stacks[player] + root.pot / 2 for player in range(2)]
+            if state.folded >= 0:
+                final = state.final_stacks()
+                self.payoffs = [final[player] - start[player] for player in range(2)]
+            else:
+                outcomes = [state.final_stacks(0), state.final_stacks(1), state.final_stacks(None)]
+                self.payoffs = [[final[player] - start[player] for final in outcomes] for player in range(2)]
+            return
+        self.actions = _river_actions(state, raises)
+        for action, amount in self.actions:
+            raised = action is ActionType.RAISE or action is ActionType.ALL_IN
+            self.children.append(_Node(state.apply(action, amount), root, raises + raised))
+        self.regrets = np.zeros((len(self.actions), COMBO_COUNT))
+        self.average = np.zeros((len(self.actions), COMBO_COUNT))
+
+    def strategy(self) -> np.ndarray:
+        positive = self.regrets
+        total = positive.sum(axis=0)
+        return np.divide(positive, total, out=np.full_like(positive, 1 / len(self.actions)), where=total > 0)
+
+    def average_strategy(self) -> np.ndarray:
+        total = self.average.sum(axis=0)
+        return np.divide(self.average, total, out=np.full_like(self.average, 1 / len(self.actions)), where=total > 0)
+
+
+# bets and raises to a fraction of the pot and all-in, only calls and folds once
+# MAX_RAISES bets and raises have been made
+def _river_actions(state: GameState, raises: int) -> list[tuple]:
+    actions = []
+    for action in state.legal_actions():
+        if action is ActionType.RAISE:
+            if raises >= MAX_RAISES:
+                continue
+            low, high = state.raise_bounds()
+            to_call = state.bet - state.commitments[state.to_act]
+            sizes = RAISE_SIZES if state.bet else BET_SIZES
+            amounts = sorted({max(low, state.bet + int(size * (state.pot + to_call))) for size in sizes})
+            actions.extend((action, amount) for amount in amounts if amount < high)
+        elif action is ActionType.ALL_IN and raises >= MAX_RAISES:
+            continue
+        else:
+            actions.append((action, None))
+    return actions
+
+
+class RiverSolution:
+    def __init__(self, root: _Node, ranges: list[np.ndarray], showdown: _Showdown, iterations: int, seconds: float):
+        self.root = root
+        self.ranges = ranges
+        self.showdown = showdown
+        self.iterations = iterations
+        self.seconds = seconds
+
+    def _node(self, history: list[tuple]) -> _Node:
+        node = self.root
+        for action in history:
+            node = node.children[node.actions.index(action)]
+        return node
+
+    # average strategy of the player to act after history, as action -> 1326 probabilities
+    def strategy(self, history: list[tuple] = ()) -> dict:
+        node = self._node(history)
+        return dict(zip(node.actions, node.average_strategy()))
+
+    # action probabilities of one hand after history
+    def hand_strategy(self, card1: Card, card2: Card, history: list[tuple] = ()) -> dict:
+        combo = combo_index(card1, card2)
+        return {action: float(probabilities[combo]) for action, probabilities in self.strategy(history).items()}
+
+    # average of what a best response gains against each player, in chips per deal
+    @property
+    def exploitability(self) -> float:
+        gains = []
+        for player in range(2):
+            values = _best_response(self.root, player, self.ranges, self.showdown, {})
+            gains.append((values * self.ranges[player]).sum())
+        pairs = (self.showdown.totals(self.ranges[1])[2] * self.ranges[0]).sum()
+        return float((gains[0] + gains[1]) / 2 / pairs)
+
+    def __repr__(self):
+        return f"RiverSolution(iterations={self.iterations}, seconds={self.seconds:.3f}, exploitability={self.exploitability:.3f})"
+
+
+# value of every combo of player at a terminal, against the opponent's reach. The
+# terminals below one of player's own decisions share the opponent's reach, so its
+# totals are kept in cache for the rest of the pass
+def _terminal_values(node: _Node, player: int, opponent_reach: np.ndarray, showdown: _Showdown, cache: dict) -> np.ndarray:
+    cached = cache.get(id(opponent_reach))
+    if cached is None or cached[0] is not opponent_reach:
+        cached = cache[id(opponent_reach)] = (opponent_reach, showdown.totals(opponent_reach))
+    less, equal_or_less, total = cached[1]
+    if node.state.folded >= 0:
+        return node.payoffs[player] * total
+    win, lose, split = node.payoffs[player][player], node.payoffs[player][1 - player], node.payoffs[player][2]
+    return lose * total + (win - lose) * less + (split - lose) * (equal_or_less - less)
+
+
+# one CFR+ pass updating player's regrets and average strategy, returns the
+# counterfactual values of player's combos
+def _cfr(node: _Node, player: int, reach: list[np.ndarray], showdown: _Showdown, iteration: int,
+         cache: dict) -> np.ndarray:
+    if not node.actions:
+        return _terminal_values(node, player, reach[1 - player], showdown, cache)
+    strategy = node.strategy()
+    if node.player != player:
+        values = 0
+        for child, probabilities in zip(node.children, strategy):
+            child_reach = [reach[0], reach[1]]
+            child_reach[node.player] = reach[node.player] * probabilities
+            values = values + _cfr(child, player, child_reach, showdown, iteration, cache)
+        return values
+    child_values = np.array([_cfr(child, player, reach, showdown, iteration, cache) for child in node.children])
+    value = (strategy * child_values).sum(axis=0)
+    np.maximum(node.regrets + child_values - value, 0, out=node.regrets)
+    node.average += iteration * reach[player] * strategy
+    return value
+
+
+def _best_response(node: _Node, player: int, reach: list[np.ndarray], showdown: _Showdown, cache: dict) -> np.ndarray:
+    if not node.actions:
+        return _terminal_values(node, player, reach[1 - player], showdown, cache)
+    if node.player != player:
+        values = 0
+        for child, probabilities in zip(node.children, node.average_strategy()):
+            child_reach = [reach[0], reach[1]]
+            child_reach[node.player] = reach[node.player] * probabilities
+            values = values + _best_response(child, player, child_reach, showdown, cache)
+        return values
+    return np.max([_best_response(child, player, reach, showdown, cache) for child in node.children], axis=0)
+
+
+# solves the river betting from state (round RIVER, nobody has acted) between the
+# range of each seat, until iterations or the time limit run out
+def solve_river(state: GameState, board: list[Card], ranges: list[np.ndarray], iterations: int = RIVER_ITERATIONS,
+                time_limit: float | None = RIVER_TIME_LIMIT) -> RiverSolution:
+    if len(board) != 5 or state.round != Round.RIVER:
+        raise ValueError("A river subgame needs a five card board and a river state")
+    start = time.perf_counter()
+    blocked = (COMBO_MASKS & card_mask(board)) != 0
+    ranges = [np.where(blocked, 0.0, np.asarray(weights, dtype=np.float64)) for weights in ranges]
+    showdown = _Showdown(board)
+    root = _Node(state, state, 0)
+
+    done = 0
+    while done < iterations and (time_limit is None or time.perf_counter() - start < time_limit):
+        done += 1
+        for player in range(2):
+            _cfr(root, player, ranges, showdown, done, {})
+    return RiverSolution(root, ranges, showdown, done, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve the heads-up push/fold charts")
+    parser.add_argument("--iterations", type=int, default=PUSH_FOLD_ITERATIONS, help="CFR+ iterations per stack depth")
+    parser.add_argument("--path", default=CHART_PATH, help="Where to write the charts")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    charts = build_charts(args.iterations)
+    write_charts(charts, args.path, args.iterations)
+    print(f"Wrote push/fold charts for {len(charts)} stack depths to {args.path} in {time.perf_counter() - start:.0f}s")
@@ -0,0 +1,189 @@
+import argparse
+from itertools import combinations, permutations
+import numpy as np
+from game.card import CARDS, Card
+from game.evaluator import STRAIGHT_MASK, WHEEL_MASK
+from game.hand_state import HandState
+from game.history import BOARD, hand_starts, read_log
+from game.isomorphism import FLOP_COUNT, canonical_flops, flop_weights, permute, suit_permutation
+
+# Board texture and hero draws as bit flags. A board is folded card by card into a rank
+# mask, masks of the ranks seen twice and three times, and suit counts, so the turn and
+# river only update the flop's state. The straight features of every rank mask are
+# precomputed (8192 entries), the rest is a few bit operations. Flops also have a table
+# over the 1755 canonical flops (suits are interchangeable, so the texture only depends
+# on the canonical flop) with a lookup from any three cards, which scores single flops
+# and whole arrays of stored boards. Hero draws and outs come from HandState.
+(PAIRED, TRIPS, TWO_PAIR, MONOTONE, TWO_TONE, RAINBOW, CONNECTED, STRAIGHT_POSSIBLE, FLUSH_POSSIBLE, FOUR_STRAIGHT,
+ FOUR_FLUSH) = (1 << bit for bit in range(11))
+FLUSH_DRAW, BACKDOOR_FLUSH_DRAW, OPEN_ENDED, GUTSHOT = (1 << bit for bit in range(16, 20))
+
+TEXTURE_NAMES = {PAIRED: "paired", TRIPS: "trips", TWO_PAIR: "double paired", MONOTONE: "monotone",
+                 TWO_TONE: "two-tone", RAINBOW: "rainbow", CONNECTED: "connected",
+                 STRAIGHT_POSSIBLE: "straight possible", FLUSH_POSSIBLE: "flush possible",
+                 FOUR_STRAIGHT: "four to a straight", FOUR_FLUSH: "four to a flush"}
+DRAW_NAMES = {FLUSH_DRAW: "flush draw", BACKDOOR_FLUSH_DRAW: "backdoor flush draw",
+              OPEN_ENDED: "open-ended straight draw", GUTSHOT: "gutshot straight draw"}
+DRAW_FLAGS = {name: flag for flag, name in DRAW_NAMES.items()}
+
+WINDOWS = [STRAIGHT_MASK << low for low in range(9)] + [WHEEL_MASK]
+
+
+def _rank_texture(mask: int) -> int:
+    # an ace connects with a deuce as well as with a king
+    flags = CONNECTED if mask & (mask >> 1) or mask & 0x1001 == 0x1001 else 0
+    most = max((mask & window).bit_count() for window in WINDOWS)
+    if most >= 3:
+        flags |= STRAIGHT_POSSIBLE
+    if most >= 4:
+        flags |= FOUR_STRAIGHT
+    return flags
+
+
+# straight features of a mask of board ranks, and suit features by the most cards of a suit
+RANK_TEXTURE = [_rank_texture(mask) for mask in range(1 << 13)]
+SUIT_TEXTURE = [0, RAINBOW, TWO_TONE, FLUSH_POSSIBLE, FLUSH_POSSIBLE | FOUR_FLUSH, FLUSH_POSSIBLE | FOUR_FLUSH]
+RANK_TEXTURE_ARRAY = np.array(RANK_TEXTURE, dtype=np.int32)
+SUIT_TEXTURE_ARRAY = np.array(SUIT_TEXTURE, dtype=np.int32)
+
+_flop_textures = None
+
+
+class BoardTexture:
+    __slots__ = ("rank_mask", "pair_mask", "trips_mask", "suit_counts", "size", "flags")
+
+    def __init__(self, cards: list[Card] = ()):
+        self.rank_mask = 0
+        self.pair_mask = 0
+        self.trips_mask = 0
+        self.suit_counts = [0] * 4
+        self.size = 0
+        self.flags = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: Card):
+        bit = 1 << card.high
+        self.trips_mask |= self.pair_mask & bit
+        self.pair_mask |= self.rank_mask & bit
+        self.rank_mask |= bit
+        self.suit_counts[card.suit.value] += 1
+        self.size += 1
+        most = max(self.suit_counts)
+        flags = RANK_TEXTURE[self.rank_mask] | SUIT_TEXTURE[most]
+        if most == self.size >= 3:
+            flags |= MONOTONE
+        if self.pair_mask:
+            flags |= PAIRED | (TWO_PAIR if self.pair_mask & (self.pair_mask - 1) else 0)
+        if self.trips_mask:
+            flags |= TRIPS
+        self.flags = flags
+
+    def names(self) -> list[str]:
+        return [name for flag, name in TEXTURE_NAMES.items() if self.flags & flag]
+
+
+# draws of a player's cards and the board, from the running hand state
+def draw_flags(state: HandState) -> int:
+    flags = 0
+    for name in state.draws():
+        flags |= DRAW_FLAGS[name]
+    return flags
+
+
+# textures of the 1755 canonical flops and the canonical flop of any three card
+# indexes in any order, built on first use
+def _flop_table():
+    global _flop_textures
+    if _flop_textures is None:
+        textures = np.array([BoardTexture([CARDS[index] for index in flop]).flags for flop in canonical_flops()],
+                            dtype=np.int32)
+        positions = {flop: position for position, flop in enumerate(canonical_flops())}
+        lookup = np.zeros((52, 52, 52), dtype=np.int16)
+        for flop in combinations(range(52), 3):
+            position = positions[permute(flop, suit_permutation(flop))]
+            for ordered in permutations(flop):
+                lookup[ordered] = position
+        # flags by the flat index of three cards, for single lookups without NumPy scalars
+        flat = textures[lookup].ravel().tolist()
+        _flop_textures = (textures, lookup, flat)
+    return _flop_textures
+
+
+def flop_texture(flop: list[Card]) -> int:
+    return _flop_table()[2][flop[0].index * 2704 + flop[1].index * 52 + flop[2].index]
+
+
+# texture flags of N boards of 3 to 5 card indexes, one per row. Flops are looked up
+# in the canonical table, longer boards fold every card into the same masks as
+# BoardTexture with array operations.
+def board_textures(boards: np.ndarray) -> np.ndarray:
+    boards = np.asarray(boards, dtype=np.intp)
+    if boards.shape[1] == 3:
+        textures, lookup, _ = _flop_table()
+        return textures[lookup[boards[:, 0], boards[:, 1], boards[:, 2]]]
+    rank_mask = np.zeros(len(boards), dtype=np.int64)
+    pair_mask = np.zeros(len(boards), dtype=np.int64)
+    trips_mask = np.zeros(len(boards), dtype=np.int64)
+    suit_counts = np.zeros((len(boards), 4), dtype=np.int64)
+    rows = np.arange(len(boards))
+    for column in boards.T:
+        bit = np.left_shift(1, (column + 12) % 13)
+        trips_mask |= pair_mask & bit
+        pair_mask |= rank_mask & bit
+        rank_mask |= bit
+        suit_counts[rows, column // 13] += 1
+    most = suit_counts.max(axis=1)
+    flags = RANK_TEXTURE_ARRAY[rank_mask] | SUIT_TEXTURE_ARRAY[most]
+    flags[most == boards.shape[1]] |= MONOTONE
+    flags[pair_mask > 0] |= PAIRED
+    flags[pair_mask & (pair_mask - 1) > 0] |= TWO_PAIR
+    flags[trips_mask > 0] |= TRIPS
+    return flags
+
+
+# one line describing the board and the draws of hole, for prompts and logs
+def describe(hole: list[Card], board: list[Card]) -> str:
+    if len(board) < 3:
+        return ""
+    texture = BoardTexture(board).names()
+    state = HandState(hole + board)
+    draws = state.draws()
+    text = f"The board is {', '.join(texture) or 'dry'}."
+    if draws:
+        # backdoor draws need two more cards, HandState counts no outs for them
+        outs = f" with {state.outs} outs" if state.outs > 0 else ""
+        text += f" You have a {' and a '.join(draws)}{outs}."
+    return text
+
+
+# the first size board cards of every hand in a hand history log that dealt that many
+def logged_boards(records: np.ndarray, size: int) -> np.ndarray:
+    board = records[records["op"] == BOARD]
+    hands = np.searchsorted(hand_starts(records), np.flatnonzero(records["op"] == BOARD), side="right")
+    order = np.arange(len(hands)) - np.searchsorted(hands, hands)
+    keep = (np.bincount(hands)[hands] >= size) & (order < size)
+    return board["card1"][keep].astype(np.intp).reshape(-1, size)
+
+
+def format_frequencies(flags: np.ndarray, weights: np.ndarray | None = None) -> str:
+    weights = np.ones(len(flags)) if weights is None else weights
+    total = max(weights.sum(), 1)
+    return "\n".join(f"{name:<20} {weights[(flags & flag) > 0].sum() / total:6.1%}"
+                     for flag, name in TEXTURE_NAMES.items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Board texture frequencies over all flops or a hand history log")
+    parser.add_argument("log", nargs="?", help="Binary hand history log, all 22100 flops when left out")
+    args = parser.parse_args()
+    if args.log is None:
+        textures = _flop_table()[0]
+        print(f"All flops ({FLOP_COUNT} canonical)")
+        print(format_frequencies(textures, np.array(flop_weights())))
+    else:
+        records = read_log(args.log)
+        for size, street in ((3, "Flop"), (4, "Turn"), (5, "River")):
+            boards = logged_boards(records, size)
+            print(f"{street} boards ({len(boards)} hands)")
+            print(format_frequencies(board_textures(boards)))
@@ -0,0 +1,296 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from math import comb
+import numpy as np
+from game.batch_evaluator import evaluate_hands
+from game.card import CARDS
+from game.equity import DEFAULT_WORKERS, get_pool
+from game.evaluator import CATEGORY_SHIFT, evaluate, hand_played
+from game.player import handRank
+from game.rank_table import TABLE_PATH, evaluate_many, load_table
+
+# Exhaustive differential check of hand evaluators against the one showdowns use.
+# The reference is game.evaluator.evaluate, the score behind Dealer.get_hand_rank
+# (its category) and determine_winner (comparing the scores). Every one of the
+# 133,784,560 seven-card hands is scored by the reference and by each candidate. A
+# candidate has to give every hand the reference's category, and its scores have to
+# order the hands exactly like the reference's: hands the reference ties must tie,
+# and a hand the reference ranks higher must score higher. Candidates may encode the
+# rest of the score however they like, so for every reference score only the lowest
+# and highest candidate score are kept (with a hand for each), and the order holds
+# when each reference score's highest candidate score is below the next one's lowest.
+# The hands are split into one shard per pair of lowest cards, run over the process
+# pool, and the merged state is checkpointed so a long run resumes where it stopped.
+CHECKPOINT_VERSION = 1
+TOTAL_HANDS = comb(52, 7)
+SHARDS = sorted(((first, second) for first in range(52) for second in range(first + 1, 47)),
+                key=lambda shard: comb(51 - shard[1], 5), reverse=True)
+DEFAULT_CANDIDATES = ("batch", "table", "brute_force")
+CHECKPOINT_SECONDS = 30
+MAX_SAMPLES = 20
+BRUTE_FORCE_CHUNK = 1 << 16
+
+KEYS = [card.key for card in CARDS]
+HIGHS = np.array([card.high for card in CARDS], dtype=np.int64)
+SUITS = np.array([card.suit.value for card in CARDS], dtype=np.int64)
+FIVE_OF_SEVEN = np.array(list(itertools.combinations(range(7), 5)), dtype=np.intp)
+# colex rank of a sorted five-card hand: sum of comb(card, position + 1)
+COLEX = np.array([[comb(card, position + 1) for position in range(5)] for card in range(52)], dtype=np.int64)
+
+_five_card_scores = None
+
+
+# plain five-card scorer written from the rules instead of the evaluator's tables, so
+# the brute force candidate checks the tables rather than sharing them. Every row of
+# hands is scored at once: the five ranks are ordered by how often they appear, then
+# how high they are, which gives the category (with flush and straight) and breaks
+# ties within it. All rows are sorted in one flat sort keyed by row first.
+def five_card_scores(hands: np.ndarray) -> np.ndarray:
+    rows = np.arange(len(hands))[:, None]
+    ranks = HIGHS[hands]
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=len(hands) * 13).reshape(-1, 13)
+    keys = np.sort((rows << 8 | counts[rows, ranks] << 4 | ranks).ravel()).reshape(-1, 5)[:, ::-1]
+    ordered = keys & 15
+    shape = keys >> 4 & 15
+    suits = SUITS[hands]
+    flush = (suits == suits[:, :1]).all(axis=1)
+    wheel = (ordered == [12, 3, 2, 1, 0]).all(axis=1)
+    straight = (shape[:, 0] == 1) & (ordered[:, 0] - ordered[:, 4] == 4) | wheel
+
+    categories = np.select(
+        [straight & flush & (ordered[:, 0] == 12) & ~wheel, straight & flush, shape[:, 0] == 4,
+         (shape[:, 0] == 3) & (shape[:, 3] == 2), flush, straight, shape[:, 0] == 3,
+         (shape[:, 0] == 2) & (shape[:, 2] == 2), shape[:, 0] == 2],
+        [handRank.ROYAL_FLUSH.value, handRank.STRAIGHT_FLUSH.value, handRank.FOUR_OF_A_KIND.value,
+         handRank.FULL_HOUSE.value, handRank.FLUSH.value, handRank.STRAIGHT.value, handRank.THREE_OF_A_KIND.value,
+         handRank.TWO_PAIR.value, handRank.PAIR.value], handRank.HIGH_CARD.value)
+    # a straight is ranked by its top card, the ace of a wheel plays low
+    ordered[wheel] = [3, 2, 1, 0, 0]
+    scores = categories.astype(np.int64)
+    for position in range(5):
+        scores = scores << 4 | ordered[:, position]
+    return scores
+
+
+# brute force score of every five-card hand, by colex rank, built once per process
+def _five_card_table() -> np.ndarray:
+    global _five_card_scores
+    if _five_card_scores is None:
+        _five_card_scores = np.empty(comb(52, 5), dtype=np.int64)
+        combinations = itertools.combinations(range(52), 5)
+        while chunk := list(itertools.islice(combinations, BRUTE_FORCE_CHUNK)):
+            hands = np.array(chunk, dtype=np.intp)
+            _five_card_scores[COLEX[hands, np.arange(5)].sum(axis=1)] = five_card_scores(hands)
+    return _five_card_scores
+
+
+# best of the 21 five-card hands in each row, a chunk of rows at a time
+def brute_force_scores(hands: np.ndarray) -> np.ndarray:
+    table = _five_card_table()
+    hands = np.sort(hands, axis=1)
+    scores = np.empty(len(hands), dtype=np.int64)
+    for start in range(0, len(hands), BRUTE_FORCE_CHUNK):
+        subsets = hands[start:start + BRUTE_FORCE_CHUNK][:, FIVE_OF_SEVEN]
+        scores[start:start + BRUTE_FORCE_CHUNK] = table[COLEX[subsets, np.arange(5)].sum(axis=2)].max(axis=1)
+    return scores
+
+
+def _table_scores(hands: np.ndarray) -> np.ndarray:
+    return evaluate_many(load_table(), hands.astype(np.int64))
+
+
+# candidates score (N, 7) arrays of card indexes, with the category in score >> CATEGORY_SHIFT
+CANDIDATES = {
+    "batch": evaluate_hands,
+    "table": _table_scores,
+    "brute_force": brute_force_scores,
+}
+
+
+# every seven-card hand whose two lowest cards are first and second, one per row
+def shard_hands(first: int, second: int) -> np.ndarray:
+    rest = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(second + 1, 52), 5)),
+                       dtype=np.uint8, count=comb(51 - second, 5) * 5).reshape(-1, 5)
+    hands = np.empty((len(rest), 7), dtype=np.uint8)
+    hands[:, 0] = first
+    hands[:, 1] = second
+    hands[:, 2:] = rest
+    return hands
+
+
+def reference_scores(first: int, second: int) -> np.ndarray:
+    prefix = (KEYS[first], KEYS[second])
+    return np.fromiter((evaluate([*prefix, *rest]) for rest in itertools.combinations(KEYS[second + 1:], 5)),
+                       dtype=np.int64, count=comb(51 - second, 5))
+
+
+# compares the candidates on one shard: category mismatches (count and a few hands)
+# and, for every reference score, the candidate's lowest and highest score with a hand
+def verify_shard(first: int, second: int, candidates: tuple) -> dict:
+    hands = shard_hands(first, second)
+    reference = reference_scores(first, second)
+    results = {}
+    for name in candidates:
+        scores = np.asarray(CANDIDATES[name](hands), dtype=np.int64)
+        wrong = np.flatnonzero(scores >> CATEGORY_SHIFT != reference >> CATEGORY_SHIFT)
+        order = np.lexsort((scores, reference))
+        ordered = reference[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        ends = np.r_[starts[1:], len(order)] - 1
+        classes = {int(ordered[start]): [int(scores[order[start]]), int(scores[order[end]]),
+                                         hands[order[start]].tolist(), hands[order[end]].tolist()]
+                   for start, end in zip(starts, ends)}
+        samples = [[hands[row].tolist(), int(reference[row]), int(scores[row])] for row in wrong[:MAX_SAMPLES]]
+        results[name] = {"category_mismatches": len(wrong), "samples": samples, "classes": classes}
+    return {"shard": [first, second], "hands": len(hands), "results": results}
+
+
+class Verification:
+    def __init__(self, candidates: tuple):
+        self.candidates = tuple(candidates)
+        self.done = set()
+        self.hands = 0
+        self.seconds = 0.0
+        self.results = {name: {"category_mismatches": 0, "samples": [], "classes": {}} for name in self.candidates}
+
+    @property
+    def complete(self) -> bool:
+        return len(self.done) == len(SHARDS)
+
+    def merge(self, shard: dict):
+        self.done.add(tuple(shard["shard"]))
+        self.hands += shard["hands"]
+        for name, result in shard["results"].items():
+            merged = self.results[name]
+            merged["category_mismatches"] += result["category_mismatches"]
+            merged["samples"] = (merged["samples"] + result["samples"])[:MAX_SAMPLES]
+            for score, (low, high, low_hand, high_hand) in result["classes"].items():
+                known = merged["classes"].get(score)
+                if known is None:
+                    merged["classes"][score] = [low, high, low_hand, high_hand]
+                    continue
+                if low < known[0]:
+                    known[0], known[2] = low, low_hand
+                if high > known[1]:
+                    known[1], known[3] = high, high_hand
+
+    # hands the candidate scores differently from the reference: category mismatches,
+    # pairs the reference ties but the candidate does not, and pairs ordered wrongly
+    def mismatches(self, name: str) -> dict:
+        result = self.results[name]
+        classes = sorted(result["classes"].items())
+        ties = [(low_hand, high_hand) for _, (low, high, low_hand, high_hand) in classes if low != high]
+        order = [(below[3], above[2]) for (_, below), (_, above) in zip(classes, classes[1:]) if below[1] >= above[0]]
+        return {"category": result["category_mismatches"], "category_samples": result["samples"],
+                "ties": ties, "order": order}
+
+    def passed(self, name: str) -> bool:
+        found = self.mismatches(name)
+        return not found["category"] and not found["ties"] and not found["order"]
+
+    def save(self, path: str):
+        state = {"version": CHECKPOINT_VERSION, "candidates": list(self.candidates), "done": sorted(self.done),
+                 "hands": self.hands, "seconds": self.seconds, "results": self.results}
+        with open(path + ".tmp", "w") as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "Verification":
+        with open(path) as checkpoint:
+            state = json.load(checkpoint)
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {path} is version {state['version']}, expected {CHECKPOINT_VERSION}")
+        verification = cls(state["candidates"])
+        verification.done = {tuple(shard) for shard in state["done"]}
+        verification.hands = state["hands"]
+        verification.seconds = state["seconds"]
+        for name, result in state["results"].items():
+            result["classes"] = {int(score): entry for score, entry in result["classes"].items()}
+            verification.results[name] = result
+        return verification
+
+
+# runs every shard not done yet (or only shards), resuming from and saving to checkpoint
+def verify(candidates=DEFAULT_CANDIDATES, workers: int | None = None, checkpoint: str | None = None,
+           shards: list[tuple] | None = None, progress=None) -> Verification:
+    if checkpoint is not None and os.path.exists(checkpoint):
+        verification = Verification.load(checkpoint)
+        if verification.candidates != tuple(candidates):
+            raise ValueError(f"Checkpoint {checkpoint} checks {', '.join(verification.candidates)}, not {', '.join(candidates)}")
+    else:
+        verification = Verification(candidates)
+    todo = [shard for shard in (SHARDS if shards is None else shards) if shard not in verification.done]
+    workers = workers or DEFAULT_WORKERS
+    start = time.monotonic()
+    saved = start
+    base_seconds = verification.seconds
+
+    if workers == 1:
+        finished = (verify_shard(first, second, verification.candidates) for first, second in todo)
+    else:
+        pool = get_pool(workers)
+        finished = (future.result() for future in
+                    as_completed([pool.submit(verify_shard, first, second, verification.candidates) for first, second in todo]))
+    for shard in finished:
+        verification.merge(shard)
+        verification.seconds = base_seconds + time.monotonic() - start
+        if progress is not None:
+            progress(verification)
+        if checkpoint is not None and time.monotonic() - saved >= CHECKPOINT_SECONDS:
+            verification.save(checkpoint)
+            saved = time.monotonic()
+    if checkpoint is not None:
+        verification.save(checkpoint)
+    return verification
+
+
+def _describe(hand: list[int]) -> str:
+    cards = [CARDS[index] for index in hand]
+    score = evaluate([card.key for card in cards])
+    played = ", ".join(map(str, hand_played(cards, score)))
+    return f"{' '.join(map(str, cards))} ({handRank(score >> CATEGORY_SHIFT)}: {played})"
+
+
+def report(verification: Verification) -> str:
+    lines = [f"{verification.hands:,} of {TOTAL_HANDS:,} hands in {len(verification.done)} of {len(SHARDS)} shards, "
+             f"{verification.seconds:,.0f}s"]
+    for name in verification.candidates:
+        found = verification.mismatches(name)
+        lines.append(f"{name}: {'matches the reference' if verification.passed(name) else 'MISMATCH'}, "
+                     f"{found['category']:,} category, {len(found['ties']):,} tie and {len(found['order']):,} order mismatches")
+        for hand, reference, score in found["category_samples"][:3]:
+            lines.append(f"  category {handRank(score >> CATEGORY_SHIFT)} for {_describe(hand)}")
+        for low, high in found["ties"][:3]:
+            lines.append(f"  tie broken between {_describe(low)} and {_describe(high)}")
+        for below, above in found["order"][:3]:
+            lines.append(f"  {_describe(below)} scores at least {_describe(above)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check hand evaluators against the showdown evaluator on every 7-card hand")
+    parser.add_argument("--candidates", nargs="+", choices=sorted(CANDIDATES), default=list(DEFAULT_CANDIDATES))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--checkpoint", default="verify_checkpoint.json", help="Progress file, resumed when it exists")
+    parser.add_argument("--shards", type=int, default=None, help="Only run this many more shards")
+    args = parser.parse_args()
+    if "table" in args.candidates and not os.path.exists(TABLE_PATH):
+        parser.error("run python -m game.rank_table to build the table, or leave out the table candidate")
+
+    def show(verification):
+        print(f"\r{verification.hands / TOTAL_HANDS:.1%} {verification.hands:,} hands "
+              f"{verification.hands / max(verification.seconds, 1e-9):,.0f} hands/s", end="", flush=True)
+
+    shards = None
+    if args.shards is not None:
+        done = Verification.load(args.checkpoint).done if os.path.exists(args.checkpoint) else set()
+        shards = [shard for shard in SHARDS if shard not in done][:args.shards]
+    result = verify(tuple(args.candidates), args.workers, args.checkpoint, shards, show)
+    print()
+    print(report(result))
+    raise SystemExit(0 if all(result.passed(name) for name in result.candidates) else 1)
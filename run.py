@@ -5,9 +5,10 @@ from discord import Option
 from discord.ui import Button, View
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
-from config.config import TOKEN, DEV_TOKEN, DB_HOST, DB_USER, DB_PASSWORD, DB_DATABASE
+from config.config import TOKEN, DEV_TOKEN, DB_HOST, DB_USER, DB_PASSWORD, DB_DATABASE, HAND_LOG_PATH
 from config.log_config import logger
 from db.db_utils import DatabaseManager
+from game.history import HandLog
 from game.poker import PokerGameManager
 from bot.bot_poker_handler import DiscordPokerManager
 
@@ -103,6 +104,9 @@ async def play_poker(
     poker.set_player_name(0, ctx.author.name)
     poker.set_player_name(1, "PokerGPT")
     poker.new_round()
+    # attached after the first deal, which only moves the button and is never played;
+    # the handler closes the log when the game ends
+    poker.history = HandLog(HAND_LOG_PATH) if HAND_LOG_PATH else None
 
     session = Session()
     
@@ -130,8 +134,10 @@ if not args.no_db:
             embed = discord.Embed(title="🏆 PokerGPT Leaderboard", color=discord.Color.blue())
             ranks = "\n".join(f"{i + 1} **{u[0]}**" for i, u in enumerate(top))
             wins = "\n".join(f"{round(u[1])}" for u in top)
+            ev_wins = "\n".join(f"{round(u[2] or 0)}" for u in top)
             embed.add_field(name="Player Rank", value=ranks, inline=True)
             embed.add_field(name="Big Blind Wins", value=wins, inline=True)
+            embed.add_field(name="All-in EV", value=ev_wins, inline=True)
             if stats:
                 suffix = "th" if 10 <= place % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(place % 10, "th")
                 embed.add_field(
@@ -171,6 +177,7 @@ if not args.no_db:
             embed.add_field(name="Games Played", value=row[1])
             embed.add_field(name="Time Played", value=str(datetime.timedelta(seconds=row[2])))
             embed.add_field(name="Net BB Total", value=f"{row[3]:.1f}")
+            embed.add_field(name="All-in EV BB", value=f"{row[11] or 0:.1f}")
             embed.add_field(name="BB Wins/Losses", value=f"{row[4]:.1f} / {row[5]:.1f}")
             embed.add_field(name="Win/Loss/Draw", value=f"{row[6]} / {row[7]} / {row[8]}")
             embed.add_field(name="Win Rate", value=f"{row[6] / hands * 100:.1f}%")
@@ -197,8 +204,10 @@ if not args.no_db:
             embed = discord.Embed(title="🏆 PokerGPT Server Leaderboard", color=discord.Color.gold())
             ranks = "\n".join(f"{i + 1} **{s[0]}**" for i, s in enumerate(top))
             wins = "\n".join(f"{round(s[1])}" for s in top)
+            ev_wins = "\n".join(f"{round(s[2] or 0)}" for s in top)
             embed.add_field(name="Server Rank", value=ranks, inline=True)
             embed.add_field(name="Big Blind Wins", value=wins, inline=True)
+            embed.add_field(name="All-in EV", value=ev_wins, inline=True)
             if stats:
                 suffix = "th" if 10 <= place % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(place % 10, "th")
                 embed.add_field(
@@ -237,6 +246,7 @@ if not args.no_db:
             embed.add_field(name="Hands Played", value=row[1])
             embed.add_field(name="Time Played", value=str(datetime.timedelta(seconds=row[2])))
             embed.add_field(name="Net BB Total", value=f"{row[3]:.1f}")
+            embed.add_field(name="All-in EV BB", value=f"{row[9] or 0:.1f}")
             embed.add_field(name="BB Wins/Losses", value=f"{row[4]:.1f} / {row[5]:.1f}")
             embed.add_field(name="Win/Loss/Draw", value=f"{row[6]} / {row[7]} / {row[8]}")
             await ctx.respond(embed=embed)
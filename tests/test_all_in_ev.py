@@ -0,0 +1,71 @@
+from math import comb
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from db.backfill import add_missing_columns, backfill_ev
+from db.models import Base, Game, Hand, Server, ServerUser, User
+from game.all_in_ev import _combinations, all_in_equities, all_in_equity, parse_cards
+from game.card import CARDS
+from game.equity import exact_equity
+from game.preflop import preflop_equity
+
+def test_combinations():
+    for n, k in ((45, 2), (44, 1), (43, 0), (12, 5)):
+        rows = _combinations(n, k)
+        assert rows.shape == (comb(n, k), k)
+        assert len({tuple(row) for row in rows}) == len(rows)
+        assert (np.diff(rows.astype(int), axis=1) > 0).all()
+
+def test_equities_match_exact_equity():
+    rng = np.random.default_rng(2)
+    deals = np.array([rng.choice(52, 9, replace=False) for _ in range(40)])
+    for dealt in (3, 4, 5):
+        equities = all_in_equities(deals[:, :2], deals[:, 2:4], deals[:, 4:4 + dealt])
+        for deal, equity in zip(deals, equities):
+            cards = [CARDS[index] for index in deal]
+            assert equity == pytest.approx(exact_equity(cards[:2], cards[4:4 + dealt], cards[2:4]).equity)
+
+def test_preflop_equity_is_exact_and_symmetric():
+    hero, opponent = [CARDS[0], CARDS[13]], [CARDS[38], CARDS[51]]
+    equity = all_in_equity(hero, opponent, [])
+    assert equity + all_in_equity(opponent, hero, []) == pytest.approx(1.0)
+    assert equity == pytest.approx(preflop_equity(*hero, opponent), abs=0.01)
+    with pytest.raises(ValueError):
+        all_in_equities(np.array([[0, 13]]), np.array([[13, 51]]), np.zeros((1, 0)))
+
+def test_parse_cards():
+    assert [str(CARDS[index]) for index in parse_cards("AS, 10H, KC")] == ["AS", "10H", "KC"]
+    assert parse_cards("") == []
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return engine
+
+def test_backfill_recomputes_hands_and_totals(engine):
+    session = sessionmaker(bind=engine)()
+    session.add_all([Server(id=1, host_id="h"), User(id=1, discord_id="u"), ServerUser(id=1, server_id=1, user_id=1),
+                     Game(id=1, server_id=1, user_id=1, small_blind=5, big_blind=10, starting_stack=1000)])
+    # AA against KK all in on a blank flop for a 2000 chip pot, lost on the river
+    session.add(Hand(id=1, server_id=1, user_id=1, game_id=1, cards="AS, AH", gpt_cards="KD, KC",
+                     community_cards="2S, 7D, 9C, JH, KS", net_bb=-100, all_in_board=3, all_in_pot=2000))
+    session.add(Hand(id=2, server_id=1, user_id=1, game_id=1, cards="2S, 3H", gpt_cards="KD, KC",
+                     community_cards="", net_bb=-1.5))
+    session.commit()
+    assert backfill_ev(session, batch_size=1) == 2
+    equity = all_in_equity([CARDS[0], CARDS[13]], [CARDS[38], CARDS[51]], [CARDS[1], CARDS[32], CARDS[47]])
+    expected = round(2000 * (equity - 0.5) / 10, 2)
+    assert float(session.get(Hand, 1).ev_net_bb) == pytest.approx(expected)
+    assert float(session.get(Hand, 2).ev_net_bb) == -1.5
+    assert float(session.get(User, 1).ev_net_bb_total) == pytest.approx(expected - 1.5)
+    assert float(session.get(ServerUser, 1).ev_net_bb_total_on_server) == pytest.approx(expected - 1.5)
+
+def test_add_missing_columns(engine):
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE hands DROP COLUMN ev_net_bb"))
+        connection.execute(text("DROP TABLE opponent_stats"))
+    add_missing_columns(engine)
+    assert "ev_net_bb" in {column["name"] for column in inspect(engine).get_columns("hands")}
+    assert inspect(engine).has_table("opponent_stats")
@@ -0,0 +1,34 @@
+import numpy as np
+from game.batch_evaluator import evaluate_batch, evaluate_hands, random_deals, score_categories
+from game.card import CARDS, Card, Rank, Suit
+from game.evaluator import evaluate_cards
+from game.poker import Dealer
+
+def test_batch_matches_evaluate_cards():
+    hole_cards, boards = random_deals(5000, seed=1)
+    scores = evaluate_batch(hole_cards, boards)
+    expected = [evaluate_cards([CARDS[index] for index in hole.tolist() + board.tolist()])
+                for hole, board in zip(hole_cards, boards)]
+    assert scores.tolist() == expected
+
+def test_batch_matches_dealer_categories():
+    dealer = Dealer(1)
+    player = dealer.players[0]
+    hole_cards, boards = random_deals(500, seed=2)
+    categories = score_categories(evaluate_batch(hole_cards, boards))
+    for hole, board, category in zip(hole_cards, boards, categories):
+        player.card1, player.card2 = CARDS[hole[0]], CARDS[hole[1]]
+        dealer.board = [CARDS[index] for index in board]
+        rank, _ = dealer.get_hand_rank(player)
+        assert rank.value == category
+
+def test_batch_scores_flushes_and_short_boards():
+    flush = [Card(rank, Suit.HEARTS).index for rank in (Rank.ACE, Rank.KING, Rank.NINE, Rank.SIX, Rank.TWO)]
+    straight_flush = [Card(rank, Suit.CLUBS).index for rank in (Rank.FIVE, Rank.FOUR, Rank.THREE, Rank.TWO, Rank.ACE)]
+    scores = evaluate_hands(np.array([flush, straight_flush]))
+    assert scores.tolist() == [evaluate_cards([CARDS[index] for index in hand]) for hand in (flush, straight_flush)]
+
+    hole_cards, boards = random_deals(200, board_size=3, seed=3)
+    expected = [evaluate_cards([CARDS[index] for index in hole.tolist() + board.tolist()])
+                for hole, board in zip(hole_cards, boards)]
+    assert evaluate_batch(hole_cards, boards).tolist() == expected
@@ -0,0 +1,32 @@
+import pytest
+from benchmarks.compare import compare, missing, regressions, resolve_baseline
+from benchmarks.suite import BENCHMARKS, CATEGORY_HANDS, DEFAULT_LABEL, _cards, baseline_path, load_results, measure
+from game.evaluator import rank_hand
+
+def test_category_hands_rank_as_named():
+    for category, hand in CATEGORY_HANDS.items():
+        assert rank_hand(_cards(hand))[0].name.lower() == category
+
+def test_every_benchmark_runs():
+    for name, setup in BENCHMARKS.items():
+        stats = measure(setup, rounds=2, min_time=0.001)
+        assert stats["ops_per_second"] > 0, name
+        assert stats["median"] <= stats["ops_per_second"]
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"benchmarks": {"a": {"ops_per_second": 100.0}, "b": {"ops_per_second": 100.0},
+                               "gone": {"ops_per_second": 1.0}}}
+    current = {"benchmarks": {"a": {"ops_per_second": 95.0}, "b": {"ops_per_second": 80.0}}}
+    rows = compare(baseline, current)
+    assert [row[0] for row in rows] == ["a", "b"]
+    assert [row[0] for row in regressions(rows, 0.1)] == ["b"]
+    assert regressions(rows, 0.25) == []
+    assert missing(baseline, current) == ["gone"]
+
+def test_baselines_resolve_by_label():
+    path = resolve_baseline(DEFAULT_LABEL)
+    assert path == baseline_path(DEFAULT_LABEL)
+    assert resolve_baseline(path) == path
+    assert set(load_results(path)["benchmarks"]) <= set(BENCHMARKS)
+    with pytest.raises(FileNotFoundError):
+        resolve_baseline("no-such-label")
@@ -1,9 +1,11 @@
+import asyncio
 import discord
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from bot.bot_poker_handler import DiscordPokerManager
 from db.enums import Round
 from game.card import Card, Rank, Suit
+from game.history import HandLog, read_log
 from game.poker import PokerGameManager
 
 @pytest.fixture
@@ -24,6 +26,8 @@ def mock_db_manager():
     db.update_community_cards = MagicMock()
     db.end_hand = MagicMock()
     db.end_game = MagicMock()
+    db.load_opponent_stats = MagicMock(return_value=None)
+    db.save_opponent_stats = MagicMock()
     return db
 
 @pytest.fixture
@@ -367,4 +371,65 @@ async def test_preflop_gpt_cant_cover_big_blind_button1(mock_ctx, poker_game, mo
     assert poker_game.players[0].round_pot_commitment == 8
     mock_ctx.send.assert_any_call("You put PokerGPT __All-in for 8 chips.__")
     mock_ctx.send.assert_any_call("PokerGPT __Calls All-in.__")
-    m.showdown.assert_awaited_once()
\ No newline at end of file
+    m.showdown.assert_awaited_once()
+@pytest.mark.asyncio
+async def test_user_actions_update_the_opponent_model(discord_poker_manager, poker_game, mock_db_manager):
+    opponent = discord_poker_manager.opponent
+    poker_game.round = Round.PRE_FLOP
+    poker_game.current_bet = poker_game.big_blind
+    opponent.start_hand()
+    with patch.object(discord_poker_manager, 'new_round_prompt', AsyncMock()):
+        await discord_poker_manager.user_fold()
+    assert opponent.hands == 1 and opponent.vpip == 0
+
+    poker_game.players[0].card1 = Card(Rank.ACE, Suit.SPADES)
+    poker_game.players[0].card2 = Card(Rank.ACE, Suit.HEARTS)
+    poker_game.players[1].card1 = Card(Rank.SEVEN, Suit.DIAMONDS)
+    poker_game.players[1].card2 = Card(Rank.TWO, Suit.CLUBS)
+    poker_game.board = [Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.KING, Suit.SPADES), Card(Rank.NINE, Suit.HEARTS)]
+    with patch.object(discord_poker_manager, 'result_embed', return_value=discord.Embed(title="Results")):
+        await discord_poker_manager.showdown()
+    assert opponent.went_to_showdown == 1.0 and opponent.won_at_showdown == 1.0
+
+@pytest.mark.asyncio
+async def test_ending_the_game_cancels_a_pending_decision(discord_poker_manager, mock_db_manager):
+    started = asyncio.Event()
+
+    async def never_answers():
+        started.set()
+        await asyncio.sleep(60)
+
+    pending = asyncio.ensure_future(discord_poker_manager.bot_decision(never_answers()))
+    await started.wait()
+    discord_poker_manager.end_game()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert discord_poker_manager.decision is None
+    mock_db_manager.end_game.assert_called_once()
+
+def test_ending_the_game_closes_the_hand_log(discord_poker_manager, poker_game, tmp_path):
+    path = str(tmp_path / "hands.bin")
+    poker_game.history = HandLog(path)
+    poker_game.new_round()
+    poker_game.player_fold(0)
+    poker_game.history.end_hand()
+    discord_poker_manager.end_game()
+    assert poker_game.history.file is None
+    assert len(read_log(path)) > 0
+
+@pytest.mark.asyncio
+async def test_split_pot_showdown_is_not_an_opponent_loss(discord_poker_manager, poker_game):
+    poker_game.players[0].card1 = Card(Rank.TWO, Suit.HEARTS)
+    poker_game.players[0].card2 = Card(Rank.THREE, Suit.HEARTS)
+    poker_game.players[1].card1 = Card(Rank.TWO, Suit.CLUBS)
+    poker_game.players[1].card2 = Card(Rank.THREE, Suit.CLUBS)
+    poker_game.board = [Card(rank, Suit.SPADES) for rank in (Rank.TEN, Rank.JACK, Rank.QUEEN, Rank.KING, Rank.ACE)]
+    poker_game.current_pot = 100
+    discord_poker_manager.opponent = MagicMock()
+    with patch.object(discord_poker_manager, 'result_embed', return_value=discord.Embed(title="Results")):
+        await discord_poker_manager.showdown()
+    discord_poker_manager.opponent.showdown.assert_called_once_with(None)
+
+def test_discord_games_are_heads_up(mock_ctx, mock_db_manager):
+    with pytest.raises(ValueError):
+        DiscordPokerManager(mock_ctx, PokerGameManager(seats=3), mock_db_manager, small_cards=False, timeout=60.0)
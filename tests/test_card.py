@@ -1,5 +1,6 @@
+import pickle
 import pytest
-from game.card import Card, Rank, Suit
+from game.card import CARDS, Card, Rank, Suit
 
 def test_card_creation():
     card = Card(Rank.ACE, Suit.SPADES)
@@ -59,4 +60,25 @@ def test_card_add_wraps_mod_13():
     for k in range(26):  # Test values from 0 to 25
         result_rank = base + k
         expected_value = (base.rank.value + k) % 13
-        assert result_rank.value == expected_value
\ No newline at end of file
+        assert result_rank.value == expected_value
+def test_cards_are_interned():
+    assert Card(Rank.ACE, Suit.SPADES) is Card(Rank.ACE, Suit.SPADES)
+    assert Card(Rank.ACE, Suit.SPADES) is not Card(Rank.ACE, Suit.HEARTS)
+    assert len({id(card) for card in CARDS}) == 52
+
+def test_card_index_and_key():
+    for index, card in enumerate(CARDS):
+        assert card.index == index
+        assert Card(card.rank, card.suit) is card
+    assert Card(Rank.ACE, Suit.SPADES).high == 12
+    assert Card(Rank.TWO, Suit.CLUBS).high == 0
+    assert len({card.key for card in CARDS}) == 52
+
+def test_card_has_no_instance_dict():
+    card = Card(Rank.ACE, Suit.SPADES)
+    with pytest.raises(AttributeError):
+        card.extra = 1
+
+def test_card_pickles_to_interned_instance():
+    card = Card(Rank.QUEEN, Suit.DIAMONDS)
+    assert pickle.loads(pickle.dumps(card)) is card
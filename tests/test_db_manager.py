@@ -176,4 +176,23 @@ def test_update_wins_and_losses(db_manager, session):
     assert user.net_bb_losses == Decimal(10)
     assert user.net_bb_total == Decimal(0)  # Wins (10) - Losses (10)
     assert server.net_bb_losses == Decimal(10)
-    assert server.net_bb_total == Decimal(0)  # Wins (10) - Losses (10)
\ No newline at end of file
+    assert server.net_bb_total == Decimal(0)  # Wins (10) - Losses (10)
+def test_opponent_stats_round_trip(db_manager, session):
+    assert db_manager.load_opponent_stats() is None
+    db_manager.save_opponent_stats({"hands": 12, "vpip": 7, "showdowns": 3})
+    db_manager.save_opponent_stats({"hands": 13, "vpip": 8, "showdowns": 3})
+    stats = db_manager.load_opponent_stats()
+    assert stats["hands"] == 13 and stats["vpip"] == 8 and stats["showdowns"] == 3 and stats["pfr"] == 0
+
+def test_end_hand_scores_all_in_pots_by_equity(db_manager, session):
+    db_manager.initialize_game(small_blind=5, big_blind=10, starting_stack=1000)
+    db_manager.initialize_hand(cards="AS, AH", gpt_cards="KD, KC", starting_stack=1000)
+    db_manager.end_hand(ending_stack=0, end_round=Round.SHOWDOWN, all_in_board=0, all_in_pot=2000, all_in_equity=0.8)
+    db_manager.initialize_hand(cards="2S, 3H", gpt_cards="KD, KC", starting_stack=1000)
+    db_manager.end_hand(ending_stack=990, end_round=Round.PRE_FLOP)
+    hands = session.query(Hand).order_by(Hand.id).all()
+    assert hands[0].net_bb == Decimal(-100) and hands[0].ev_net_bb == Decimal(60)
+    assert hands[0].all_in_board == 0 and hands[0].all_in_pot == 2000
+    assert hands[1].ev_net_bb == Decimal(-1) and hands[1].all_in_board is None
+    user = session.query(User).filter_by(discord_id="test_discord_id").first()
+    assert user.net_bb_total == Decimal(-101) and user.ev_net_bb_total == Decimal(59)
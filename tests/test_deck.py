@@ -1,5 +1,8 @@
+import random
+import secrets
 import pytest
 from game.deck import Deck
+from game.poker import PokerGameManager
 from game.card import Card, Rank, Suit
 
 def test_deck_creation():
@@ -73,4 +76,47 @@ def test_shuffle_randomness(pytestconfig):
         deck.shuffle()
         if deck.cards[0] != original:
             changes += 1
-    assert changes >= 950        # 95 % threshold
\ No newline at end of file
+    assert changes >= 950        # 95 % threshold
+def test_deck_reuses_interned_cards():
+    deck = Deck()
+    assert all(Card(card.rank, card.suit) is card for card in deck.cards)
+
+def test_same_seed_deals_the_same_cards():
+    first, second = Deck(seed=42), Deck(seed=42)
+    dealt = [first.deal_card() for _ in range(9)]
+    assert dealt == [second.deal_card() for _ in range(9)]
+    first.reset()
+    second.reset()
+    assert [first.deal_card() for _ in range(52)] == [second.deal_card() for _ in range(52)]
+
+def test_lazy_shuffle_only_touches_dealt_positions():
+    deck = Deck(seed=1)
+    for _ in range(9):
+        deck.deal_card()
+    assert deck.shuffled == 9
+    deck.reset()
+    assert len({deck.deal_card().index for _ in range(52)}) == 52
+
+def test_deal_is_uniform():
+    deck = Deck(seed=3)
+    counts = [0] * 52
+    for _ in range(52_000):
+        deck.reset()
+        counts[deck.deal_card().index] += 1
+    assert min(counts) > 850 and max(counts) < 1150
+
+def test_pluggable_random_sources():
+    for rng in (random.Random(5), secrets, secrets.SystemRandom()):
+        deck = Deck(rng)
+        assert len({deck.deal_card().index for _ in range(52)}) == 52
+    assert [Deck(random.Random(5)).deal_card() for _ in range(3)] == [Deck(random.Random(5)).deal_card() for _ in range(3)]
+
+def test_seeded_game_replays():
+    first, second = PokerGameManager(seed=7), PokerGameManager(seed=7)
+    for _ in range(3):
+        first.new_round()
+        second.new_round()
+        first.deal_board(5)
+        second.deal_board(5)
+        assert first.board == second.board
+        assert first.return_player_hand(0) == second.return_player_hand(0)
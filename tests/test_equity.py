@@ -0,0 +1,114 @@
+import time
+import numpy as np
+import pytest
+from game.card import Card, Rank, Suit
+from db.enums import Round
+from game.equity import (EquityResult, draw_cards, estimate_equity, exact_cache_clear, exact_cache_info, exact_equity,
+                         get_pool, shutdown_pool)
+from game.poker import PokerGameManager
+
+ACES = [Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)]
+KINGS = [Card(Rank.KING, Suit.SPADES), Card(Rank.KING, Suit.HEARTS)]
+
+def test_aces_against_kings():
+    result = estimate_equity(ACES, opponent=KINGS, trials=40_000, workers=1, seed=1)
+    assert result.trials == 40_000
+    assert result.win + result.tie + result.lose == pytest.approx(1.0)
+    assert 0.80 < result.equity < 0.85
+    low, high = result.confidence_interval()
+    assert low < result.equity < high
+    assert high - low < 0.02
+
+def test_river_is_exact():
+    board = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS), Card(Rank.FOUR, Suit.CLUBS),
+             Card(Rank.NINE, Suit.HEARTS), Card(Rank.TWO, Suit.SPADES)]
+    result = estimate_equity(ACES, board, opponent=KINGS, trials=100, workers=1, seed=1)
+    assert result.win == 1.0
+    assert result.standard_error == 0.0
+
+def test_same_seed_reproduces_across_workers():
+    first = estimate_equity(ACES, trials=20_000, workers=2, seed=7)
+    second = estimate_equity(ACES, trials=20_000, workers=2, seed=7)
+    assert (first.wins, first.ties, first.losses) == (second.wins, second.ties, second.losses)
+
+def test_weighted_range():
+    queens = [Card(Rank.QUEEN, Suit.CLUBS), Card(Rank.QUEEN, Suit.DIAMONDS)]
+    only_kings = estimate_equity(ACES, opponent_range=[KINGS, queens], weights=[1.0, 0.0], trials=20_000, workers=1, seed=3)
+    exact_kings = estimate_equity(ACES, opponent=KINGS, trials=20_000, workers=1, seed=3)
+    assert only_kings.equity == pytest.approx(exact_kings.equity, abs=0.02)
+
+def test_range_blocked_by_known_cards():
+    with pytest.raises(ValueError):
+        estimate_equity(ACES, opponent_range=[[Card(Rank.ACE, Suit.SPADES), Card(Rank.KING, Suit.CLUBS)]], workers=1)
+
+def test_duplicate_cards_rejected():
+    with pytest.raises(ValueError):
+        estimate_equity(ACES, [Card(Rank.ACE, Suit.SPADES)], workers=1)
+
+def test_time_limit_stops_early():
+    start = time.monotonic()
+    result = estimate_equity(ACES, trials=10**9, time_limit=0.05, workers=1, seed=1)
+    assert time.monotonic() - start < 1.0
+    assert 0 < result.trials < 10**9
+
+def test_draw_cards_distinct_and_unblocked():
+    rng = np.random.default_rng(0)
+    live = np.arange(10)
+    blocked = np.tile(np.array([[0, 1]]), (1000, 1))
+    drawn = draw_cards(rng, live, 5, 1000, blocked=blocked)
+    assert all(len(set(row)) == 5 for row in drawn.tolist())
+    assert not np.isin(drawn, [0, 1]).any()
+
+def test_results_add_up():
+    total = EquityResult(3, 1, 6) + EquityResult(1, 1, 0)
+    assert (total.wins, total.ties, total.losses, total.trials) == (4, 2, 6, 12)
+
+def test_exact_river_counts_every_opponent_hand():
+    board = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS), Card(Rank.FOUR, Suit.CLUBS),
+             Card(Rank.NINE, Suit.HEARTS), Card(Rank.TWO, Suit.SPADES)]
+    result = exact_equity(ACES, board)
+    assert result.exact
+    assert result.trials == 990
+    assert result.standard_error == 0.0
+    # only the 4 * 4 three-five combos make the wheel
+    assert (result.wins, result.ties, result.losses) == (974, 0, 16)
+
+def test_exact_turn_matches_monte_carlo():
+    board = [Card(Rank.KING, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS), Card(Rank.NINE, Suit.CLUBS),
+             Card(Rank.TWO, Suit.CLUBS)]
+    exact = exact_equity(ACES, board)
+    assert exact.trials == 46 * 990
+    sampled = estimate_equity(ACES, board, trials=40_000, workers=1, seed=3)
+    assert abs(exact.equity - sampled.equity) < 4 * sampled.standard_error
+    assert exact_equity(ACES, board, opponent=KINGS).wins == 2
+
+def test_exact_cache_shares_suit_isomorphic_spots():
+    exact_cache_clear()
+    board = [Card(Rank.KING, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS), Card(Rank.NINE, Suit.CLUBS),
+             Card(Rank.TWO, Suit.SPADES)]
+    first = exact_equity(ACES, board)
+    swapped = [Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.ACE, Suit.HEARTS)]
+    relabeled = [Card(Rank.TWO, Suit.HEARTS), Card(Rank.NINE, Suit.SPADES), Card(Rank.SEVEN, Suit.CLUBS),
+                 Card(Rank.KING, Suit.SPADES)]
+    second = exact_equity(swapped, relabeled)
+    assert (first.wins, first.ties, first.losses) == (second.wins, second.ties, second.losses)
+    info = exact_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+def test_player_equity_is_exact_on_turn():
+    game = PokerGameManager()
+    game.deal_board(4)
+    game.round = Round.TURN
+    assert game.player_equity(0).exact
+    game.round = Round.FLOP
+    assert not game.player_equity(0, trials=1000).exact
+
+def test_pools_are_kept_per_worker_count():
+    two = get_pool(2)
+    three = get_pool(3)
+    # asking for another count leaves the first pool running
+    assert get_pool(2) is two and three is not two
+    assert two.submit(abs, -1).result() == 1
+    shutdown_pool()
+    assert get_pool(2) is not two
+    shutdown_pool()
@@ -0,0 +1,83 @@
+import random
+from itertools import combinations
+from game.evaluator import evaluate_cards, evaluate_holes, hand_strength, rank_hand, score_category
+from game.player import handRank
+from game.card import Card, Rank, Suit
+from game.deck import Deck
+
+def cards(text: str):
+    ranks = {"A": Rank.ACE, "2": Rank.TWO, "3": Rank.THREE, "4": Rank.FOUR, "5": Rank.FIVE, "6": Rank.SIX,
+             "7": Rank.SEVEN, "8": Rank.EIGHT, "9": Rank.NINE, "T": Rank.TEN, "J": Rank.JACK,
+             "Q": Rank.QUEEN, "K": Rank.KING}
+    suits = {"s": Suit.SPADES, "h": Suit.HEARTS, "d": Suit.DIAMONDS, "c": Suit.CLUBS}
+    return [Card(ranks[card[0]], suits[card[1]]) for card in text.split()]
+
+def test_category_ordering():
+    hands = [
+        "As Kd 9h 7c 4s",   # high card
+        "2s 2d 9h 7c 4s",   # pair
+        "2s 2d 9h 9c 4s",   # two pair
+        "2s 2d 2h 7c 4s",   # three of a kind
+        "As 2d 3h 4c 5s",   # wheel straight
+        "6s 2d 3h 4c 5s",   # six high straight
+        "2h 9h 7h 4h Kh",   # flush
+        "2s 2d 2h 4c 4s",   # full house
+        "2s 2d 2h 2c 4s",   # four of a kind
+        "As 2s 3s 4s 5s",   # steel wheel
+        "Ts Js Qs Ks As",   # royal flush
+    ]
+    scores = [evaluate_cards(cards(hand)) for hand in hands]
+    assert scores == sorted(scores)
+    assert len(set(scores)) == len(scores)
+    assert score_category(scores[-1]) == handRank.ROYAL_FLUSH
+
+def test_seven_cards_match_best_five():
+    rng = random.Random(7)
+    for _ in range(500):
+        deck = Deck(seed=rng.getrandbits(64))
+        hand = deck.cards[:7]
+        best = max(evaluate_cards(list(five)) for five in combinations(hand, 5))
+        assert evaluate_cards(hand) == best
+
+def test_six_cards_match_best_five():
+    rng = random.Random(6)
+    for _ in range(500):
+        deck = Deck(seed=rng.getrandbits(64))
+        hand = deck.cards[:6]
+        best = max(evaluate_cards(list(five)) for five in combinations(hand, 5))
+        assert evaluate_cards(hand) == best
+
+def test_kickers_break_ties():
+    assert evaluate_cards(cards("Ah Ad Kc 7s 4d 3c 2h")) > evaluate_cards(cards("Ac As Qc 7d 4s 3d 2c"))
+    assert evaluate_cards(cards("Ah Ad Kc 7s 4d 3c 2h")) == evaluate_cards(cards("Ac As Kd 7d 4s 3d 2c"))
+
+def test_wheel_hand_played_order():
+    rank, hand = rank_hand(cards("Ah 2d 3c 4s 5d 9c Kh"))
+    assert rank == handRank.STRAIGHT
+    assert [card.rank for card in hand] == [Rank.FIVE, Rank.FOUR, Rank.THREE, Rank.TWO, Rank.ACE]
+
+def test_pair_kickers_are_distinct_cards():
+    rank, hand = rank_hand(cards("Qs 3s Jc Qc 8s Ac 2s"))
+    assert rank == handRank.PAIR
+    assert [str(card) for card in hand] == ["QS", "QC", "AC", "JC", "8S"]
+
+def test_flush_uses_flush_suit():
+    rank, hand = rank_hand(cards("Ad Kd Qd 9d 5d Ah Ks"))
+    assert rank == handRank.FLUSH
+    assert all(card.suit == Suit.DIAMONDS for card in hand)
+    assert [card.rank for card in hand] == [Rank.ACE, Rank.KING, Rank.QUEEN, Rank.NINE, Rank.FIVE]
+
+def test_evaluate_holes_matches_evaluate_cards():
+    rng = random.Random(4)
+    for board_size in (3, 4, 5):
+        deck = Deck(seed=rng.getrandbits(64))
+        board = deck.cards[:board_size]
+        holes = [deck.cards[board_size + 2 * i: board_size + 2 * i + 2] for i in range(20)]
+        assert evaluate_holes(board, holes) == [evaluate_cards(board + hole) for hole in holes]
+
+def test_hand_strength_matches_score():
+    rng = random.Random(5)
+    for _ in range(200):
+        deck = Deck(seed=rng.getrandbits(64))
+        rank, hand = rank_hand(deck.cards[:7])
+        assert hand_strength(rank, hand) == evaluate_cards(deck.cards[:7])
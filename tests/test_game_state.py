@@ -0,0 +1,73 @@
+import numpy as np
+from db.enums import ActionType, Round
+from game.game_state import GameState
+from game.poker import PokerGameManager
+from game.simulation import RandomPolicy, legal_actions, play_hand
+
+# plays random actions through the simulation engine and replays each one on a GameState
+class Tracker:
+    def __init__(self):
+        self.state = None
+        self.random = RandomPolicy()
+
+    def act(self, game, player, legal, rng):
+        state = self.state
+        assert state.to_act == player
+        assert state.round == game.round
+        assert state.stacks == (game.players[0].stack, game.players[1].stack)
+        assert state.commitments == (game.players[0].round_pot_commitment, game.players[1].round_pot_commitment)
+        assert (state.pot, state.bet) == (game.current_pot, game.current_bet)
+        assert state.legal_actions() == legal
+        assert state.raise_bounds() == (max(game.current_bet * 2, game.big_blind),
+                                        game.players[player].stack + game.players[player].round_pot_commitment)
+        action, amount = self.random.act(game, player, legal, rng)
+        self.state = state.apply(action, amount)
+        return action, amount
+
+def test_matches_the_simulation_engine():
+    game = PokerGameManager(seed=21)
+    rng = np.random.default_rng(21)
+    tracker = Tracker()
+    for _ in range(500):
+        for player in game.players:
+            player.stack = 1000
+        button = (game.button + 1) % 2
+        tracker.state = GameState.new_hand((1000, 1000), game.small_blind, game.big_blind, button)
+        play_hand(game, [tracker, tracker], rng)
+        state = tracker.state
+        assert state.is_terminal
+        assert state.legal_actions() == []
+        stacks = (game.players[0].stack, game.players[1].stack)
+        if state.folded >= 0:
+            assert state.final_stacks() == stacks
+        else:
+            assert stacks in (state.final_stacks(0), state.final_stacks(1), state.final_stacks(None))
+
+def test_from_game_after_blinds():
+    game = PokerGameManager(seed=1)
+    game.new_round()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise((game.button + 1) % 2, game.big_blind)
+    assert GameState.from_game(game) == GameState.new_hand((1000, 1000), 5, 10, game.button)
+
+def test_limp_gives_the_big_blind_an_option():
+    state = GameState.new_hand((1000, 1000)).apply(ActionType.CALL)
+    assert state.round == Round.PRE_FLOP
+    assert state.to_act == 1
+    assert state.legal_actions() == [ActionType.CHECK, ActionType.RAISE, ActionType.ALL_IN]
+    flop = state.apply(ActionType.CHECK)
+    assert (flop.round, flop.to_act, flop.pot, flop.commitments) == (Round.FLOP, 1, 20, (0, 0))
+
+def test_short_all_in_call_returns_the_uncovered_chips():
+    state = GameState.new_hand((1000, 300)).apply(ActionType.ALL_IN).apply(ActionType.CALL)
+    assert state.round == Round.SHOWDOWN
+    assert state.stacks == (700, 0)
+    assert state.pot == 600
+    assert state.final_stacks(1) == (700, 600)
+
+def test_apply_leaves_the_parent_untouched():
+    state = GameState.new_hand((1000, 1000))
+    child = state.apply(ActionType.RAISE, 30)
+    assert state == GameState.new_hand((1000, 1000))
+    assert (child.bet, child.to_act, child.stack0) == (30, 1, 970)
+    assert child.apply(ActionType.FOLD).final_stacks() == (1010, 990)
@@ -1,6 +1,10 @@
+import asyncio
 import json
+import time
+import httpx
+import openai
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from bot.gpt_player import GPTPlayer
 from db.enums import ActionType, Round
 from game.card import Card, Rank, Suit
@@ -16,7 +20,8 @@ def mock_db():
 def mock_chain():
     with patch('bot.gpt_player.ChatPromptTemplate'), \
          patch('bot.gpt_player.ChatOpenAI'), \
-         patch('bot.gpt_player.StrOutputParser'):
+         patch('bot.gpt_player.StrOutputParser'), \
+         patch.dict('bot.gpt_player._chains', clear=True):
         gpt_player = GPTPlayer(MagicMock())
         gpt_player.chain = MagicMock()
         return gpt_player
@@ -239,4 +244,79 @@ def test_player_all_in(mock_chain, poker_game):
     
     assert action == ActionType.CALL
     assert amount is None
-    mock_chain.chain.invoke.assert_called_once()
\ No newline at end of file
+    mock_chain.chain.invoke.assert_called_once()
+def test_short_stack_small_blind_uses_the_push_fold_chart(mock_chain, poker_game):
+    poker_game.button = 1
+    poker_game.players[0].stack = 100
+    poker_game.players[1].stack = 100
+    poker_game.player_raise(1, poker_game.small_blind)
+    poker_game.player_raise(0, poker_game.big_blind)
+
+    action, amount = mock_chain.pre_flop_small_blind(poker_game)
+
+    assert action == ActionType.ALL_IN
+    assert amount == 95
+    mock_chain.chain.invoke.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_async_decisions_use_ainvoke(mock_chain, poker_game):
+    mock_chain.chain.ainvoke = AsyncMock(return_value=json.dumps({"action": "raise", "raise_amount": 40}))
+    action, amount = await mock_chain.apre_flop_big_blind(poker_game)
+    assert action == ActionType.RAISE
+    assert amount == 40
+    mock_chain.chain.ainvoke.assert_awaited_once()
+    mock_chain.chain.invoke.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_async_decision_times_out_to_the_default_move(mock_chain, poker_game):
+    async def slow(_):
+        await asyncio.sleep(10)
+    mock_chain.chain.ainvoke = slow
+    mock_chain.timeout = 0.01
+    assert await mock_chain.aplayer_check(poker_game) == ("Default", 0)
+
+@pytest.mark.asyncio
+async def test_async_short_stack_uses_the_chart(mock_chain, poker_game):
+    mock_chain.chain.ainvoke = AsyncMock()
+    poker_game.button = 1
+    poker_game.players[0].stack = 100
+    poker_game.players[1].stack = 100
+    poker_game.player_raise(1, poker_game.small_blind)
+    poker_game.player_raise(0, poker_game.big_blind)
+    assert await mock_chain.apre_flop_small_blind(poker_game) == (ActionType.ALL_IN, 95)
+    mock_chain.chain.ainvoke.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_concurrent_games_wait_for_the_slowest_call_not_the_sum(mock_chain):
+    # 50 games each waiting 0.1 seconds on the model, while the event loop keeps ticking
+    async def completion(_):
+        await asyncio.sleep(0.1)
+        return json.dumps({"action": "check"})
+    mock_chain.chain.ainvoke = completion
+    games = [PokerGameManager(buy_in=1000, small_blind=5, big_blind=10) for _ in range(50)]
+    lags = []
+
+    async def ticker():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    ticking = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(mock_chain.apre_flop_big_blind(game) for game in games))
+    elapsed = time.perf_counter() - start
+    ticking.cancel()
+    assert all(action == ActionType.CHECK for action, _ in results)
+    assert elapsed < 1.0
+    assert max(lags) < 0.1
+
+@pytest.mark.asyncio
+async def test_async_decision_falls_back_on_api_errors(mock_chain, poker_game):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    errors = [openai.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None),
+              openai.APIConnectionError(request=request),
+              httpx.RemoteProtocolError("connection reset")]
+    for error in errors:
+        mock_chain.chain.ainvoke = AsyncMock(side_effect=error)
+        assert await mock_chain.afirst_to_act(poker_game) == ("Default", 0)
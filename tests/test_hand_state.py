@@ -0,0 +1,75 @@
+import random
+from game.card import Card, Rank, Suit
+from game.deck import Deck
+from game.evaluator import evaluate_cards
+from game.hand_state import HandState
+from game.player import handRank
+from game.poker import Dealer
+
+def cards(text: str):
+    ranks = {"A": Rank.ACE, "2": Rank.TWO, "3": Rank.THREE, "4": Rank.FOUR, "5": Rank.FIVE, "6": Rank.SIX,
+             "7": Rank.SEVEN, "8": Rank.EIGHT, "9": Rank.NINE, "T": Rank.TEN, "J": Rank.JACK,
+             "Q": Rank.QUEEN, "K": Rank.KING}
+    suits = {"s": Suit.SPADES, "h": Suit.HEARTS, "d": Suit.DIAMONDS, "c": Suit.CLUBS}
+    return [Card(ranks[card[0]], suits[card[1]]) for card in text.split()]
+
+def test_incremental_score_matches_evaluator():
+    rng = random.Random(10)
+    for _ in range(300):
+        deck = Deck(seed=rng.getrandbits(64))
+        state = HandState(deck.cards[:2])
+        for size in range(3, 8):
+            state.add(deck.cards[size - 1])
+            if size >= 5:
+                assert state.score == evaluate_cards(deck.cards[:size])
+
+def test_hole_cards_category():
+    assert HandState(cards("7s 7d")).category == handRank.PAIR
+    assert HandState(cards("As Kd")).category == handRank.HIGH_CARD
+
+def test_flush_draw():
+    state = HandState(cards("Ah Kh 2h 7h 9c"))
+    assert state.category == handRank.HIGH_CARD
+    assert state.flush_draw_suit == Suit.HEARTS.value
+    assert state.draws() == ["flush draw"]
+    assert state.outs == 9
+
+def test_straight_draws():
+    open_ended = HandState(cards("8s 9d Th Jc 2s"))
+    assert open_ended.draws() == ["open-ended straight draw"]
+    assert open_ended.outs == 8
+    gutshot = HandState(cards("8s 9d Jh Qc 2s"))
+    assert gutshot.draws() == ["gutshot straight draw"]
+    assert gutshot.outs == 4
+    wheel = HandState(cards("As 2d 3h 4c Ks"))
+    assert wheel.draws() == ["gutshot straight draw"]
+
+def test_combo_draw_counts_each_card_once():
+    state = HandState(cards("8h 9h Th 2h Jc"))
+    assert state.draws() == ["flush draw", "open-ended straight draw"]
+    assert state.outs == 15
+
+def test_made_hands_have_no_draw_outs():
+    assert HandState(cards("Ah Kh 2h 7h 9h")).outs == 0
+    straight = HandState(cards("5s 6d 7h 8c 9s"))
+    assert straight.category == handRank.STRAIGHT
+    assert straight.draws() == []
+    assert straight.outs == 0
+    # a made straight still draws to the flush
+    assert HandState(cards("5s 6s 7s 8c 9d Ks")).outs == 9
+    assert HandState(cards("8h 9h Th 2h Jc 3d 4s")).outs == 0
+
+def test_backdoor_flush_draw_on_flop():
+    assert "backdoor flush draw" in HandState(cards("Ah Kh 2h 7c 9d")).draws()
+    assert HandState(cards("Ah Kh 2h 7c 9d Qs")).draws() == []
+
+def test_dealer_updates_states_as_board_is_dealt():
+    dealer = Dealer(2)
+    for street in (3, 4, 5):
+        dealer.deal_board(street)
+        for player in range(2):
+            state = dealer.hand_state(player)
+            assert state.size == 2 + street
+            assert state.score == evaluate_cards(dealer.board + dealer.return_player_hand(player))
+    dealer.new_deal()
+    assert dealer.hand_state(0).size == 2
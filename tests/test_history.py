@@ -0,0 +1,104 @@
+import numpy as np
+from db.enums import Round
+from game.history import HAND, RECORD_DTYPE, SPLIT, WIN, HandLog, hand_results, hand_starts, read_log
+from game.poker import PokerGameManager
+from game.simulation import EquityPolicy, RandomPolicy, play_hand
+
+def play_logged(hands: int, seed: int, log: HandLog):
+    game = PokerGameManager(seed=seed, history=log)
+    rng = np.random.default_rng(seed)
+    deltas = []
+    for _ in range(hands):
+        for player in game.players:
+            player.stack = 1000
+        deltas.append(play_hand(game, [RandomPolicy(), EquityPolicy()], rng))
+    return game, deltas
+
+def test_records_are_eight_bytes():
+    assert RECORD_DTYPE.itemsize == 8
+    log = HandLog()
+    log.record(WIN, SPLIT, amount=2**31)
+    record = log.records()[0]
+    assert (record["op"], record["seat"], record["amount"]) == (WIN, SPLIT, 2**31)
+
+def test_results_match_played_hands():
+    log = HandLog()
+    _, deltas = play_logged(300, 1, log)
+    results = hand_results(log.records())
+    assert log.hands == len(results) == 300
+    assert results["net"].tolist() == deltas
+    assert (results["stacks"] == 1000).all()
+    assert (results["net"].sum(axis=1) == 0).all()
+
+def test_results_skip_unfinished_hand():
+    log = HandLog()
+    game, _ = play_logged(20, 2, log)
+    game.new_round()
+    records = log.records()
+    assert records["op"][hand_starts(records)[-1]] == HAND
+    assert len(hand_starts(records)) == 21
+    assert len(hand_results(records)) == 20
+
+def test_replay_matches_last_hand():
+    log = HandLog()
+    game, _ = play_logged(50, 3, log)
+    replayed = PokerGameManager.replay(log.records())
+    assert [player.stack for player in replayed.players] == [player.stack for player in game.players]
+    assert replayed.board == game.board
+    assert replayed.button == game.button
+    assert [player.return_hand() for player in replayed.players] == [player.return_hand() for player in game.players]
+
+def test_replay_mid_hand():
+    log = HandLog()
+    game = PokerGameManager(seed=4, history=log)
+    game.new_round()
+    game.reset_betting()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise(1 - game.button, game.big_blind)
+    game.player_raise(game.button, 40)
+    game.player_call(1 - game.button)
+    game.round = Round.FLOP
+    game.reset_betting()
+    game.deal_board(3)
+    replayed = PokerGameManager.replay(log.records())
+    assert replayed.round == Round.FLOP
+    assert replayed.current_pot == game.current_pot == 80
+    assert [player.stack for player in replayed.players] == [960, 960]
+    assert replayed.hand_state(0).score == game.hand_state(0).score
+
+def test_split_pot_is_shared():
+    log = HandLog()
+    game = PokerGameManager(seed=5, history=log)
+    game.new_round()
+    game.reset_betting()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise(1 - game.button, game.big_blind)
+    game.player_call(game.button)
+    game.player_win(game.players)
+    results = hand_results(log.records())
+    assert results["net"].tolist() == [[0, 0]]
+    assert results["pot"].tolist() == [20]
+
+def test_log_file_appends_whole_hands(tmp_path):
+    path = str(tmp_path / "hands.bin")
+    with HandLog(path) as log:
+        game, _ = play_logged(10, 6, log)
+        game.new_round()
+        assert len(hand_starts(read_log(path))) == 10
+    with HandLog(path) as log:
+        play_logged(5, 7, log)
+    assert len(hand_results(read_log(path))) == 15
+
+def test_table_log_results_and_replay():
+    log = HandLog()
+    game = PokerGameManager(seats=6, seed=8, history=log)
+    rng = np.random.default_rng(8)
+    deltas = []
+    for _ in range(100):
+        for player in game.players:
+            player.stack = 1000
+        deltas.append(play_hand(game, [RandomPolicy(), EquityPolicy()] * 3, rng))
+    results = hand_results(log.records())
+    assert results["net"].tolist() == deltas
+    replayed = PokerGameManager.replay(log.records())
+    assert [player.stack for player in replayed.players] == [player.stack for player in game.players]
@@ -0,0 +1,49 @@
+import random
+from itertools import combinations, permutations
+from game.card import CARDS, Card, Rank, Suit
+from game.isomorphism import (FLOP_COUNT, canonical_flops, canonical_key, canonicalize, flop_index, flop_weights,
+                              restore)
+
+def relabel(indexes, permutation):
+    return [permutation[index // 13] * 13 + index % 13 for index in indexes]
+
+def brute_force_key(*groups):
+    return min(tuple(tuple(sorted(relabel(group, permutation))) for group in groups)
+               for permutation in permutations(range(4)))
+
+def test_same_spot_in_other_suits_shares_a_key():
+    hole = [Card(Rank.ACE, Suit.HEARTS), Card(Rank.KING, Suit.HEARTS)]
+    board = [Card(Rank.TWO, Suit.HEARTS), Card(Rank.SEVEN, Suit.CLUBS), Card(Rank.NINE, Suit.DIAMONDS)]
+    other_hole = [Card(Rank.KING, Suit.SPADES), Card(Rank.ACE, Suit.SPADES)]
+    other_board = [Card(Rank.NINE, Suit.DIAMONDS), Card(Rank.TWO, Suit.SPADES), Card(Rank.SEVEN, Suit.CLUBS)]
+    assert canonicalize(hole, board)[:2] == canonicalize(other_hole, other_board)[:2]
+
+def test_keys_match_brute_force_classes():
+    rng = random.Random(11)
+    spots = []
+    for _ in range(300):
+        cards = rng.sample(range(52), 6)
+        spots.append((cards[:2], cards[2:]))
+        permutation = list(range(4))
+        rng.shuffle(permutation)
+        spots.append((relabel(cards[:2], permutation), relabel(cards[2:], permutation)))
+    keys = [canonical_key(*spot) for spot in spots]
+    brute_force_keys = [brute_force_key(*spot) for spot in spots]
+    for first, second in combinations(range(len(spots)), 2):
+        assert (keys[first] == keys[second]) == (brute_force_keys[first] == brute_force_keys[second])
+
+def test_restore_inverts_canonicalize():
+    rng = random.Random(12)
+    for _ in range(200):
+        cards = [CARDS[index] for index in rng.sample(range(52), 7)]
+        hole, board, permutation = canonicalize(cards[:2], cards[2:])
+        assert sorted(card.index for card in restore(hole, permutation)) == sorted(card.index for card in cards[:2])
+        assert sorted(card.index for card in restore(board, permutation)) == sorted(card.index for card in cards[2:])
+
+def test_canonical_flops():
+    flops = canonical_flops()
+    assert len(flops) == FLOP_COUNT
+    assert sum(flop_weights()) == 22100
+    for flop in combinations(range(0, 52, 5), 3):
+        cards = [CARDS[index] for index in flop]
+        assert canonical_key(flops[flop_index(cards)]) == canonical_key(flop)
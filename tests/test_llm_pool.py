@@ -0,0 +1,54 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from bot import llm_pool
+from bot.gpt_player import GPTPlayer, shared_chain
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+def test_chains_are_shared_per_model():
+    built = llm_pool.stats.chains_built
+    hits = llm_pool.stats.chain_hits
+    players = [GPTPlayer(None, model_name="pool-test-model") for _ in range(5)]
+    assert all(player.chain is players[0].chain for player in players)
+    assert shared_chain("pool-test-model-2") is not players[0].chain
+    assert llm_pool.stats.chains_built == built + 2
+    assert llm_pool.stats.chain_hits == hits + 4
+
+def test_sync_requests_reuse_one_connection(local_server):
+    client, _ = llm_pool.http_clients()
+    assert llm_pool.http_clients()[0] is client
+    requests, connections = llm_pool.stats.requests, llm_pool.stats.connections
+    for _ in range(5):
+        assert client.get(local_server).text == "ok"
+    assert llm_pool.stats.requests == requests + 5
+    assert llm_pool.stats.connections == connections + 1
+
+@pytest.mark.asyncio
+async def test_async_requests_reuse_one_connection(local_server):
+    _, client = llm_pool.http_clients()
+    requests, connections = llm_pool.stats.requests, llm_pool.stats.connections
+    for _ in range(5):
+        assert (await client.get(local_server)).text == "ok"
+    assert llm_pool.stats.requests == requests + 5
+    assert llm_pool.stats.connections == connections + 1
+    assert llm_pool.stats.as_dict()["pool_size"] == llm_pool.POOL_SIZE
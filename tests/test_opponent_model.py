@@ -0,0 +1,93 @@
+from db.enums import ActionType, Round
+from game.opponent_model import (MIN_HANDS, SAVE_EVERY, SAW_FLOP, SHOWDOWNS, THREE_BET, THREE_BET_CHANCES,
+                                 OpponentModel, opponent_model)
+from game.poker import PokerGameManager
+
+def preflop(game: PokerGameManager, bot_raise: int = 0):
+    game.round = Round.PRE_FLOP
+    game.reset_betting()
+    game.player_raise(0, game.small_blind)
+    game.player_raise(1, bot_raise or game.big_blind)
+
+def test_preflop_statistics():
+    game = PokerGameManager()
+    model = OpponentModel()
+    # limp, then raise over the bot's check: one VPIP and one PFR for the hand
+    model.start_hand()
+    preflop(game)
+    model.record(ActionType.CALL, game)
+    model.record(ActionType.RAISE, game)
+    # re-raise over a bot raise is a 3-bet
+    model.start_hand()
+    preflop(game, bot_raise=40)
+    model.record(ActionType.RAISE, game)
+    # fold to a raise
+    model.start_hand()
+    preflop(game, bot_raise=40)
+    model.record(ActionType.FOLD, game)
+    # fold in the small blind without a raise
+    model.start_hand()
+    preflop(game)
+    model.record(ActionType.FOLD, game)
+    assert model.hands == 4
+    assert model.vpip == 0.5 and model.pfr == 0.5
+    assert model.three_bet == 0.5
+    assert model.fold_to_raise == 0.5
+
+def test_three_bet_counts_once_per_hand():
+    game = PokerGameManager()
+    model = OpponentModel()
+    model.start_hand()
+    preflop(game, bot_raise=40)
+    # 3-bet, the bot 4-bets, then a 5-bet
+    model.record(ActionType.RAISE, game)
+    game.player_raise(0, 120)
+    game.player_raise(1, 300)
+    model.record(ActionType.RAISE, game)
+    assert model.counts[THREE_BET] == 1 and model.counts[THREE_BET_CHANCES] == 1
+    assert model.three_bet == 1.0
+
+def test_split_pot_is_not_a_showdown_result():
+    model = OpponentModel()
+    model.start_hand()
+    model.showdown(won=True)
+    model.start_hand()
+    model.showdown(won=None)
+    assert model.counts[SAW_FLOP] == 2
+    assert model.counts[SHOWDOWNS] == 1 and model.won_at_showdown == 1.0
+
+def test_postflop_aggression_and_showdowns():
+    game = PokerGameManager()
+    model = OpponentModel()
+    model.start_hand()
+    game.round = Round.FLOP
+    game.reset_betting()
+    model.saw_flop()
+    model.record(ActionType.CHECK, game)
+    game.player_raise(1, 20)
+    model.record(ActionType.RAISE, game)
+    model.record(ActionType.CALL, game)
+    model.showdown(won=False)
+    model.start_hand()
+    model.showdown(won=True)
+    assert model.aggression_factor == 1.0
+    assert model.aggression_frequency == 1 / 3
+    assert model.went_to_showdown == 1.0 and model.won_at_showdown == 0.5
+
+def test_summary_and_persistence():
+    model = OpponentModel({"hands": MIN_HANDS - 1, "vpip": 2})
+    assert model.summary() == ""
+    model.start_hand()
+    assert "Over 5 hands" in model.summary() and "40%" in model.summary()
+    saved = []
+    assert not any(model.end_hand() for _ in range(SAVE_EVERY - 1))
+    assert model.end_hand()
+    model.save(saved.append)
+    assert saved == [model.as_dict()] and model.unsaved == 0
+    assert OpponentModel(saved[0]).as_dict() == model.as_dict()
+
+def test_models_are_shared_per_player():
+    loads = []
+    first = opponent_model("shared-player", lambda: loads.append(1) or {"hands": 3})
+    assert opponent_model("shared-player", lambda: loads.append(1)) is first
+    assert first.hands == 3 and loads == [1]
@@ -1,5 +1,6 @@
 from game.poker import PokerGameManager
-from game.player import handRank
+from game.player import Player, handRank
+from game.evaluator import hand_strength
 from game.card import Card, Rank, Suit
 from db.enums import Round
 
@@ -136,6 +137,8 @@ def test_determine_winner():
         Card(Rank.TEN, Suit.SPADES),
         Card(Rank.NINE, Suit.CLUBS)
     ]
+    for player in game.players:
+        player.hand_strength = hand_strength(player.hand_rank, player.hand_played)
     
     # Determine winner
     winner = game.determine_winner()
@@ -146,6 +149,7 @@ def test_determine_winner():
     # Test tie
     game.players[1].hand_rank = handRank.FLUSH
     game.players[1].hand_played = game.players[0].hand_played.copy()
+    game.players[1].hand_strength = hand_strength(game.players[1].hand_rank, game.players[1].hand_played)
     
     # Determine winner again
     winners = game.determine_winner()
@@ -154,4 +158,45 @@ def test_determine_winner():
     assert isinstance(winners, list)
     assert len(winners) == 2
     assert game.players[0] in winners
-    assert game.players[1] in winners
\ No newline at end of file
+    assert game.players[1] in winners
+
+def test_evaluate_hands_sets_strength_and_winner():
+    game = PokerGameManager()
+    game.players[0].card1 = Card(Rank.ACE, Suit.HEARTS)
+    game.players[0].card2 = Card(Rank.KING, Suit.CLUBS)
+    game.players[1].card1 = Card(Rank.ACE, Suit.DIAMONDS)
+    game.players[1].card2 = Card(Rank.QUEEN, Suit.CLUBS)
+    game.board = [
+        Card(Rank.ACE, Suit.SPADES),
+        Card(Rank.NINE, Suit.HEARTS),
+        Card(Rank.SEVEN, Suit.DIAMONDS),
+        Card(Rank.FOUR, Suit.CLUBS),
+        Card(Rank.TWO, Suit.SPADES)
+    ]
+
+    game.evaluate_hands()
+
+    for player in game.players:
+        assert player.hand_rank == handRank.PAIR
+        assert player.hand_strength == hand_strength(player.hand_rank, player.hand_played)
+    assert game.players[0].hand_strength > game.players[1].hand_strength
+    assert game.determine_winner() == game.players[0]
+
+def test_determine_winner_many_players_tie():
+    game = PokerGameManager()
+    game.players.append(Player("Player 3", 1000))
+    game.board = [
+        Card(Rank.ACE, Suit.SPADES),
+        Card(Rank.KING, Suit.HEARTS),
+        Card(Rank.QUEEN, Suit.DIAMONDS),
+        Card(Rank.JACK, Suit.CLUBS),
+        Card(Rank.TEN, Suit.SPADES)
+    ]
+    game.players[0].card1, game.players[0].card2 = Card(Rank.TWO, Suit.HEARTS), Card(Rank.THREE, Suit.CLUBS)
+    game.players[1].card1, game.players[1].card2 = Card(Rank.FOUR, Suit.HEARTS), Card(Rank.FIVE, Suit.CLUBS)
+    game.players[2].card1, game.players[2].card2 = Card(Rank.ACE, Suit.HEARTS), Card(Rank.ACE, Suit.CLUBS)
+
+    game.evaluate_hands()
+
+    # everyone plays the broadway straight on the board
+    assert game.determine_winner() == game.players
@@ -105,7 +105,7 @@ def test_return_min_max_raise(opp_stack, expected_max):
     game = PokerGameManager()
     game.current_bet = 50
     game.players[1].stack = opp_stack
-    min_raise, max_raise = game.return_min_max_raise(0)
+    min_raise, max_raise = game.return_min_max_raise(1)
     assert min_raise == 100                       # 50 * 2
     assert max_raise == expected_max + game.players[1].round_pot_commitment
 
@@ -136,4 +136,94 @@ def test_player_win_split_list():
 
     game.player_win([p0, p1])      # split
     assert p0.stack == stack0 + 50
-    assert p1.stack == stack1 + 50
\ No newline at end of file
+    assert p1.stack == stack1 + 50
+def deal_table(game, holes, board):
+    for player, (card1, card2) in zip(game.players, holes):
+        player.card1, player.card2 = card1, card2
+    game.board = board
+
+def test_table_seats_and_blinds():
+    with pytest.raises(ValueError):
+        PokerGameManager(seats=10)
+    game = PokerGameManager(seats=3)
+    game.new_round()
+    assert (game.button, game.small_blind_seat(), game.big_blind_seat(), game.first_to_act()) == (1, 2, 0, 1)
+    heads_up = PokerGameManager()
+    heads_up.new_round()
+    assert heads_up.small_blind_seat() == heads_up.first_to_act() == heads_up.button
+
+def test_busted_player_sits_out():
+    game = PokerGameManager(seats=3)
+    game.players[2].stack = 0
+    game.new_round()
+    assert game.seats_in_hand() == [0, 1]
+    assert game.next_seat(1) == 0
+
+def test_side_pots_for_short_all_in():
+    game = PokerGameManager(seats=3)
+    game.players[0].stack = 100
+    game.new_round()
+    game.reset_betting()
+    game.player_raise(0, 100)
+    game.player_call(1)
+    game.player_call(2)
+    game.player_raise(1, 300)
+    game.player_call(2)
+    assert game.side_pots() == [(300, [0, 1, 2]), (400, [1, 2])]
+    deal_table(game, [(Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)),
+                      (Card(Rank.KING, Suit.SPADES), Card(Rank.KING, Suit.HEARTS)),
+                      (Card(Rank.TWO, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS))],
+               [Card(Rank.NINE, Suit.CLUBS), Card(Rank.TEN, Suit.DIAMONDS), Card(Rank.THREE, Suit.HEARTS),
+                Card(Rank.FOUR, Suit.SPADES), Card(Rank.JACK, Suit.CLUBS)])
+    assert game.award_pots() == [(300, [0]), (400, [1])]
+    assert [player.stack for player in game.players] == [300, 1100, 700]
+
+def test_short_all_in_call_stays_in_pot():
+    game = PokerGameManager(seats=3)
+    game.players[2].stack = 50
+    game.new_round()
+    game.reset_betting()
+    game.player_raise(0, 200)
+    game.player_fold(1)
+    game.player_call(2)
+    assert game.current_bet == 200
+    assert game.players[2].stack == 0
+    assert game.side_pots() == [(100, [0, 2]), (150, [0])]
+
+def test_split_side_pot_gives_odd_chip_after_button():
+    game = PokerGameManager(seats=3)
+    game.new_round()
+    game.reset_betting()
+    game.player_raise(0, 51)
+    game.player_call(1)
+    game.player_call(2)
+    game.player_fold(2)
+    deal_table(game, [(Card(Rank.TWO, Suit.SPADES), Card(Rank.THREE, Suit.HEARTS)),
+                      (Card(Rank.TWO, Suit.HEARTS), Card(Rank.THREE, Suit.SPADES)),
+                      (Card(Rank.KING, Suit.CLUBS), Card(Rank.KING, Suit.DIAMONDS))],
+               [Card(Rank.ACE, Suit.CLUBS), Card(Rank.KING, Suit.HEARTS), Card(Rank.QUEEN, Suit.DIAMONDS),
+                Card(Rank.JACK, Suit.SPADES), Card(Rank.TEN, Suit.CLUBS)])
+    game.evaluate_hands()
+    assert game.determine_winner() == [game.players[0], game.players[1]]
+    assert game.award_pots() == [(153, [0, 1])]
+    # seat 0 is the first winner after the button in seat 1
+    assert [player.stack for player in game.players] == [949 + 77, 949 + 76, 949]
+
+def test_min_max_raise_uses_the_seat_asked_for():
+    game = PokerGameManager(seats=3)
+    game.players[0].stack = 300
+    game.players[2].stack = 700
+    game.players[2].round_pot_commitment = 20
+    assert game.return_min_max_raise(0) == (10, 300)
+    assert game.return_min_max_raise(2) == (10, 720)
+    game.current_bet = 40
+    assert game.return_min_max_raise(0) == (80, 300)
+
+def test_new_round_clears_hand_strength():
+    game = PokerGameManager(seed=1)
+    game.new_round()
+    game.deal_board()
+    game.evaluate_hands()
+    assert all(player.hand_strength > 0 for player in game.players)
+    game.new_round()
+    assert all(player.hand_strength == 0 for player in game.players)
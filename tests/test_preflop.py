@@ -0,0 +1,60 @@
+import json
+import os
+import time
+import numpy as np
+import pytest
+from game.card import CARDS, Card, Rank, Suit
+from game.player import Player
+from game.preflop import (CLASS_COUNT, MATRIX_PATH, _simulate_class, build_matrix, class_name, hand_class,
+                          load_matrix, preflop_equity, write_matrix)
+
+def test_hand_classes():
+    assert hand_class(Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)) == 0
+    assert class_name(hand_class(Card(Rank.KING, Suit.CLUBS), Card(Rank.ACE, Suit.CLUBS))) == "AKs"
+    assert class_name(hand_class(Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.KING, Suit.CLUBS))) == "AKo"
+    assert class_name(hand_class(Card(Rank.TWO, Suit.SPADES), Card(Rank.SEVEN, Suit.HEARTS))) == "72o"
+    assert class_name(168) == "22"
+
+def test_every_class_has_its_combos():
+    counts = np.zeros(CLASS_COUNT, dtype=int)
+    for position, first in enumerate(CARDS):
+        for second in CARDS[position + 1:]:
+            counts[hand_class(first, second)] += 1
+    names = [class_name(hand) for hand in range(CLASS_COUNT)]
+    assert len(set(names)) == CLASS_COUNT
+    assert all(counts[hand] == {"s": 4, "o": 12}.get(name[-1], 6) for hand, name in enumerate(names))
+
+def test_build_matrix_is_antisymmetric():
+    matrix = build_matrix(trials=20)
+    assert matrix.shape == (CLASS_COUNT, CLASS_COUNT)
+    np.testing.assert_allclose(matrix + matrix.T, 1.0, atol=1e-6)
+
+def test_sampled_row_is_close():
+    aces = _simulate_class(0, 4000, 1)
+    assert 0.79 < aces[168] < 0.85
+    assert 0.90 < aces[13] < 0.95
+
+def test_lookup_from_player_cards(tmp_path):
+    path = str(tmp_path / "preflop.npy")
+    write_matrix(np.full((CLASS_COUNT, CLASS_COUNT), 0.5, dtype=np.float32), path)
+    player = Player("Player 1", 1000)
+    player.card1, player.card2 = Card(Rank.ACE, Suit.SPADES), Card(Rank.KING, Suit.SPADES)
+    assert preflop_equity(player.card1, player.card2, path=path) == pytest.approx(0.5)
+    assert preflop_equity(player.card1, player.card2, [Card(Rank.TWO, Suit.HEARTS), Card(Rank.TWO, Suit.CLUBS)], path=path) == 0.5
+
+def test_load_matrix_rejects_other_versions(tmp_path):
+    path = str(tmp_path / "preflop.npy")
+    write_matrix(np.zeros((CLASS_COUNT, CLASS_COUNT), dtype=np.float32), path)
+    with open(tmp_path / "preflop.json", "w") as metadata:
+        json.dump({"version": -1}, metadata)
+    with pytest.raises(ValueError):
+        load_matrix(path)
+
+@pytest.mark.skipif(not os.path.exists(MATRIX_PATH), reason="preflop matrix not built")
+def test_shipped_matrix():
+    start = time.perf_counter()
+    aces = preflop_equity(Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS))
+    assert time.perf_counter() - start < 0.01
+    assert aces == pytest.approx(0.852, abs=0.005)
+    kings = [Card(Rank.KING, Suit.SPADES), Card(Rank.KING, Suit.HEARTS)]
+    assert preflop_equity(Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.ACE, Suit.CLUBS), kings) == pytest.approx(0.82, abs=0.01)
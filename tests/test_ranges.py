@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import pytest
+from game.card import CARDS, Card, Rank, Suit
+from game.equity import exact_equity
+from game.evaluator import evaluate_cards
+from game.preflop import MATRIX_PATH
+from game.ranges import (COMBO_COUNT, COMBOS, any_two, combo_index, range_equity, range_from_classes,
+                         range_from_hands, top_range)
+
+ACES = [Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)]
+KINGS = [Card(Rank.KING, Suit.SPADES), Card(Rank.KING, Suit.HEARTS)]
+FLOP = [Card(Rank.QUEEN, Suit.CLUBS), Card(Rank.SEVEN, Suit.DIAMONDS), Card(Rank.TWO, Suit.SPADES)]
+
+def test_combo_index_is_order_free():
+    seen = {combo_index(CARDS[first], CARDS[second]) for first, second in COMBOS}
+    assert seen == set(range(COMBO_COUNT))
+    assert combo_index(*ACES) == combo_index(*ACES[::-1])
+
+def test_class_range_counts_combos():
+    weights = range_from_classes({"AA": 1.0, "AKs": 0.5, "AKo": 0.25})
+    assert np.count_nonzero(weights) == 6 + 4 + 12
+    assert weights.sum() == pytest.approx(6 + 2 + 3)
+
+def test_single_hands_match_exact_equity():
+    result = range_equity(range_from_hands([ACES]), range_from_hands([KINGS]), FLOP)
+    expected = exact_equity(ACES, FLOP, KINGS)
+    assert result.equity == pytest.approx(expected.equity)
+    turn = FLOP + [Card(Rank.NINE, Suit.HEARTS)]
+    assert range_equity(range_from_hands([ACES]), any_two(), turn).equity == pytest.approx(exact_equity(ACES, turn).equity)
+
+def test_card_removal_matches_brute_force():
+    rng = np.random.default_rng(2)
+    board = FLOP + [Card(Rank.NINE, Suit.HEARTS)]
+    hero = np.zeros(COMBO_COUNT)
+    villain = np.zeros(COMBO_COUNT)
+    hero[rng.choice(COMBO_COUNT, 12, replace=False)] = rng.random(12)
+    villain[rng.choice(COMBO_COUNT, 15, replace=False)] = rng.random(15)
+    result = range_equity(hero, villain, board)
+
+    known = {card.index for card in board}
+    totals = np.zeros(3)
+    for hero_combo in np.flatnonzero(hero):
+        for villain_combo in np.flatnonzero(villain):
+            cards = set(COMBOS[hero_combo]) | set(COMBOS[villain_combo])
+            if len(cards) < 4 or cards & known:
+                continue
+            for river in set(range(52)) - known - cards:
+                runout = board + [CARDS[river]]
+                hero_score = evaluate_cards(runout + [CARDS[index] for index in COMBOS[hero_combo]])
+                villain_score = evaluate_cards(runout + [CARDS[index] for index in COMBOS[villain_combo]])
+                outcome = 0 if hero_score > villain_score else 1 if hero_score == villain_score else 2
+                totals[outcome] += hero[hero_combo] * villain[villain_combo]
+    np.testing.assert_allclose([result.wins, result.ties, result.losses], totals)
+
+def test_flop_any_two_is_even():
+    result = range_equity(any_two(), any_two(), FLOP)
+    assert result.equity == pytest.approx(0.5)
+
+def test_blocked_ranges_raise():
+    with pytest.raises(ValueError):
+        range_equity(range_from_hands([[FLOP[0], Card(Rank.ACE, Suit.CLUBS)]]), any_two(), FLOP)
+
+@pytest.mark.skipif(not os.path.exists(MATRIX_PATH), reason="preflop matrix not built")
+def test_top_range():
+    top = top_range(0.2)
+    assert 0.2 <= np.count_nonzero(top) / COMBO_COUNT < 0.25
+    assert top[combo_index(*ACES)] == 1.0
+    assert range_equity(top, any_two(), FLOP).equity > 0.6
@@ -0,0 +1,51 @@
+import json
+import os
+import numpy as np
+import pytest
+from game.deck import Deck
+from game.evaluator import evaluate_cards
+from game.rank_table import TABLE_PATH, evaluate7, evaluate_many, load_table, write_table
+
+def test_write_and_load_table_is_read_only_memmap(tmp_path):
+    path = str(tmp_path / "ranks.npy")
+    write_table(np.arange(104, dtype=np.int32), path)
+
+    table = load_table(path, verify=True)
+
+    assert isinstance(table, np.memmap)
+    assert table[5] == 5
+    with pytest.raises(ValueError):
+        table[0] = 1
+
+def test_load_table_rejects_other_versions(tmp_path):
+    path = str(tmp_path / "ranks.npy")
+    write_table(np.arange(104, dtype=np.int32), path)
+    with open(tmp_path / "ranks.json") as metadata:
+        info = json.load(metadata)
+    info["version"] = -1
+    with open(tmp_path / "ranks.json", "w") as metadata:
+        json.dump(info, metadata)
+
+    with pytest.raises(ValueError):
+        load_table(path)
+
+def test_load_table_rejects_bad_checksum(tmp_path):
+    path = str(tmp_path / "ranks.npy")
+    write_table(np.arange(104, dtype=np.int32), path)
+    np.save(path, np.arange(1, 105, dtype=np.int32))
+
+    with pytest.raises(ValueError):
+        load_table(path, verify=True)
+
+@pytest.mark.skipif(not os.path.exists(TABLE_PATH), reason="run python -m game.rank_table to build the table")
+def test_table_matches_evaluator():
+    table = load_table()
+    hands = []
+    for _ in range(2000):
+        deck = Deck()
+        hand = [deck.deal_card() for _ in range(7)]
+        assert evaluate7(table, hand) == evaluate_cards(hand)
+        hands.append(hand)
+
+    indexes = np.array([[card.index for card in hand] for hand in hands])
+    assert evaluate_many(table, indexes).tolist() == [evaluate_cards(hand) for hand in hands]
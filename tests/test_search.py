@@ -0,0 +1,61 @@
+import json
+import time
+from unittest.mock import MagicMock
+from bot.search_player import SearchPlayer
+from db.enums import ActionType, Round
+from game.card import Card, Rank, Suit
+from game.game_state import GameState
+from game.poker import PokerGameManager
+from game.search import abstract_actions, search
+
+ACES = [Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)]
+SEVEN_TWO = [Card(Rank.SEVEN, Suit.SPADES), Card(Rank.TWO, Suit.HEARTS)]
+
+def test_abstract_actions():
+    state = GameState.new_hand((1000, 1000))
+    assert abstract_actions(state) == [(ActionType.FOLD, None), (ActionType.CALL, None), (ActionType.RAISE, 20),
+                                       (ActionType.RAISE, 30), (ActionType.ALL_IN, None)]
+    assert abstract_actions(state.apply(ActionType.ALL_IN)) == [(ActionType.FOLD, None), (ActionType.CALL, None)]
+
+def test_stops_at_the_deadline():
+    start = time.monotonic()
+    result = search(GameState.new_hand((1000, 1000)), ACES, [], budget=0.1, workers=1)
+    assert time.monotonic() - start < 0.3
+    assert result.iterations > 100
+
+def test_fixed_iterations_replay_from_seed():
+    state = GameState.new_hand((1000, 1000))
+    first = search(state, ACES, [], budget=10, iterations=2000, workers=1, seed=3)
+    second = search(state, ACES, [], budget=10, iterations=2000, workers=1, seed=3)
+    assert first.stats == second.stats
+    assert first.iterations == 2000
+
+def test_calls_an_all_in_with_aces_and_folds_seven_two():
+    state = GameState.new_hand((1000, 1000)).apply(ActionType.ALL_IN)
+    assert search(state, ACES, [], budget=10, iterations=3000, workers=1, seed=1).best == (ActionType.CALL, None)
+    assert search(state, SEVEN_TWO, [], budget=10, iterations=3000, workers=1, seed=1).best == (ActionType.FOLD, None)
+
+def test_river_nuts_never_folds():
+    board = [Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.ACE, Suit.CLUBS), Card(Rank.KING, Suit.SPADES),
+             Card(Rank.SEVEN, Suit.HEARTS), Card(Rank.TWO, Suit.CLUBS)]
+    state = GameState((900, 700), (0, 200), 400, 200, 0, Round.RIVER, 0, 2)
+    assert search(state, ACES, board, budget=10, iterations=2000, workers=1, seed=2).best[0] != ActionType.FOLD
+
+def test_workers_merge_their_trees():
+    result = search(GameState.new_hand((1000, 1000)), ACES, [], budget=10, iterations=500, workers=2, seed=4)
+    assert result.iterations == 1000
+
+def test_search_player_records_its_decision():
+    db = MagicMock()
+    game = PokerGameManager(seed=5)
+    game.new_round()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise((game.button + 1) % 2, game.big_blind)
+    game.players[1].card1, game.players[1].card2 = SEVEN_TWO
+    game.player_all_in_raise(0)
+    action, amount = SearchPlayer(db, budget=0.05, workers=1).player_all_in(game)
+    assert action == ActionType.FOLD
+    assert amount is None
+    recorded = db.record_gpt_action.call_args[0]
+    assert recorded[:2] == (ActionType.FOLD, None)
+    assert json.loads(recorded[2])["action"] == "fold"
@@ -0,0 +1,78 @@
+import numpy as np
+from db.enums import ActionType, Round
+from game.poker import PokerGameManager
+from game.simulation import (CallingStation, EquityPolicy, RandomPolicy, _table_action, legal_actions, play_hand,
+                             play_match, run_matches)
+
+class FoldPolicy:
+    def act(self, game, player, legal, rng):
+        return ActionType.FOLD, None
+
+class AllInPolicy:
+    def act(self, game, player, legal, rng):
+        return (ActionType.ALL_IN if ActionType.ALL_IN in legal else ActionType.CALL), None
+
+def test_small_blind_options_preflop():
+    game = PokerGameManager(seed=1)
+    game.new_round()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise((game.button + 1) % 2, game.big_blind)
+    assert legal_actions(game, game.button) == [ActionType.FOLD, ActionType.CALL, ActionType.RAISE, ActionType.ALL_IN]
+    assert legal_actions(game, (game.button + 1) % 2)[0] == ActionType.CHECK
+
+def test_fold_loses_the_small_blind():
+    game = PokerGameManager(seed=1)
+    deltas = play_hand(game, [FoldPolicy(), FoldPolicy()], np.random.default_rng(0))
+    assert deltas[game.button] == -game.small_blind
+    assert sum(deltas) == 0
+
+def test_calling_stations_reach_showdown():
+    game = PokerGameManager(seed=2)
+    deltas = play_hand(game, [CallingStation(), CallingStation()], np.random.default_rng(0))
+    assert game.round == Round.SHOWDOWN
+    assert len(game.board) == 5
+    assert sorted(abs(delta) for delta in deltas) in ([0, 0], [10, 10])
+
+def test_all_in_runs_the_board_out():
+    game = PokerGameManager(seed=3)
+    deltas = play_hand(game, [AllInPolicy(), AllInPolicy()], np.random.default_rng(0))
+    assert len(game.board) == 5
+    assert sorted(abs(delta) for delta in deltas) in ([0, 0], [1000, 1000])
+
+def test_matches_replay_from_seed():
+    policies = [RandomPolicy(), EquityPolicy()]
+    first = play_match(policies, 300, seed=5)
+    second = play_match(policies, 300, seed=5)
+    assert first.net == second.net
+    assert -300 < sum(first.net) <= 0
+
+def test_run_matches_over_workers():
+    result = run_matches([EquityPolicy(), RandomPolicy()], 400, workers=2, seed=6)
+    assert result.hands == 400
+    assert result.hands_per_second > 0
+    assert result.bb_per_100(0) > 0
+
+def test_table_matches_conserve_chips():
+    result = play_match([RandomPolicy(), EquityPolicy(), CallingStation(), RandomPolicy(), EquityPolicy(), RandomPolicy()], 200, seed=7)
+    assert result.hands == 200
+    assert len(result.net) == 6
+    assert sum(result.net) == 0
+
+class FixedRaise:
+    def __init__(self, amount):
+        self.amount = amount
+
+    def act(self, game, player, legal, rng):
+        return ActionType.RAISE, self.amount
+
+def test_out_of_range_raises_are_clamped():
+    for amount, expected in ((1, 20), (500, 500), (5000, 1000)):
+        game = PokerGameManager(buy_in=1000, seed=0)
+        game.new_round()
+        game.reset_betting()
+        game.player_raise(game.button, game.small_blind)
+        game.player_raise((game.button + 1) % 2, game.big_blind)
+        _table_action(game, [FixedRaise(amount)] * 2, game.button, np.random.default_rng(0))
+        assert game.current_bet == expected
+        # only a raise of the whole stack is an all-in
+        assert (game.players[game.button].stack == 0) == (amount == 5000)
@@ -0,0 +1,94 @@
+import numpy as np
+from db.enums import ActionType, Round
+from game.batch_evaluator import evaluate_hands
+from game.card import CARDS, Card, Rank, Suit
+from game.game_state import GameState
+from game.poker import PokerGameManager
+from game.preflop import class_combos
+from game.ranges import COMBO_MASKS, COMBOS, card_mask, range_from_hands, top_range
+from game.solver import (_Showdown, load_charts, push_fold, push_fold_action, solve_push_fold, solve_river,
+                         stack_depths)
+
+ACES = [Card(Rank.ACE, Suit.SPADES), Card(Rank.ACE, Suit.HEARTS)]
+SEVEN_TWO = [Card(Rank.SEVEN, Suit.SPADES), Card(Rank.TWO, Suit.HEARTS)]
+
+def pushed(push):
+    return (push * np.bincount(class_combos()[1])).sum() / 1326
+
+def test_push_fold_converges():
+    push, call, exploitability = solve_push_fold(10)
+    assert exploitability < 0.001
+    assert 0.55 < pushed(push) < 0.61
+    assert push[0] == 1 and call[0] == 1
+
+def test_charts():
+    charts = load_charts()
+    assert charts.shape == (len(stack_depths()), 2, 169)
+    assert pushed(charts[0, 0]) > pushed(charts[10, 0]) > pushed(charts[-1, 0])
+    assert push_fold(*ACES, 30) == 1.0
+    assert push_fold(*SEVEN_TWO, 1) == 1.0
+    assert push_fold(*SEVEN_TWO, 30) == 0.0
+    assert push_fold(*SEVEN_TWO, 500, calling=True) == 0.0
+
+def test_push_fold_action():
+    game = PokerGameManager(buy_in=100, seed=1)
+    game.new_round()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise((game.button + 1) % 2, game.big_blind)
+    game.players[game.button].card1, game.players[game.button].card2 = ACES
+    assert push_fold_action(game, game.button) == (ActionType.ALL_IN, 95)
+    game.player_all_in_raise(game.button)
+    big_blind = (game.button + 1) % 2
+    game.players[big_blind].card1, game.players[big_blind].card2 = SEVEN_TWO
+    assert push_fold_action(game, big_blind) == (ActionType.FOLD, None)
+
+    deep = PokerGameManager(seed=1)
+    deep.new_round()
+    assert push_fold_action(deep, deep.button) is None
+
+def test_push_fold_action_depth():
+    game = PokerGameManager(buy_in=200, seed=1)
+    game.new_round()
+    game.player_raise(game.button, game.small_blind)
+    game.player_raise((game.button + 1) % 2, game.big_blind)
+    game.players[game.button].card1, game.players[game.button].card2 = ACES
+    # 20 big blinds is left to the player by default
+    assert push_fold_action(game, game.button) is None
+    assert push_fold_action(game, game.button, max_depth=30) == (ActionType.ALL_IN, 195)
+
+def test_showdown_totals_match_brute_force():
+    rng = np.random.default_rng(0)
+    board = [CARDS[index] for index in rng.choice(52, 5, replace=False)]
+    weights = rng.random(1326)
+    weights[(COMBO_MASKS & card_mask(board)) != 0] = 0
+    less, equal_or_less, total = _Showdown(board).totals(weights)
+
+    hands = np.concatenate([COMBOS, np.broadcast_to([card.index for card in board], (1326, 5))], axis=1)
+    scores = evaluate_hands(hands).astype(np.int64)
+    disjoint = (COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) == 0
+    assert np.allclose(less, (disjoint & (scores[None, :] < scores[:, None])) @ weights)
+    assert np.allclose(equal_or_less, (disjoint & (scores[None, :] <= scores[:, None])) @ weights)
+    assert np.allclose(total, disjoint @ weights)
+
+def test_river_solve_in_under_a_second():
+    board = [Card(Rank.SIX, Suit.DIAMONDS), Card(Rank.KING, Suit.HEARTS), Card(Rank.ACE, Suit.HEARTS),
+             Card(Rank.FOUR, Suit.HEARTS), Card(Rank.TWO, Suit.CLUBS)]
+    state = GameState((900, 900), (0, 0), 200, 0, 0, Round.RIVER, 1)
+    solution = solve_river(state, board, [top_range(0.5), top_range(0.5)])
+    assert solution.seconds < 1
+    assert solution.exploitability < 0.01 * state.pot
+
+def test_river_nuts_and_air():
+    board = [Card(Rank.TWO, Suit.SPADES), Card(Rank.SEVEN, Suit.HEARTS), Card(Rank.NINE, Suit.DIAMONDS),
+             Card(Rank.JACK, Suit.CLUBS), Card(Rank.KING, Suit.SPADES)]
+    nuts = [Card(Rank.KING, Suit.HEARTS), Card(Rank.KING, Suit.DIAMONDS)]
+    air = [Card(Rank.THREE, Suit.HEARTS), Card(Rank.FOUR, Suit.CLUBS)]
+    catcher = [Card(Rank.JACK, Suit.HEARTS), Card(Rank.TEN, Suit.HEARTS)]
+    state = GameState((500, 500), (0, 0), 100, 0, 0, Round.RIVER, 1)
+    polar = range_from_hands([nuts, air])
+    solution = solve_river(state, board, [range_from_hands([catcher]), polar], iterations=300, time_limit=None)
+    # seat 1 is first to act with a polar range: the nuts always bet and the bluff
+    # catcher never raises a bet
+    assert solution.hand_strategy(*nuts)[(ActionType.CHECK, None)] < 0.05
+    for bet in [(ActionType.RAISE, 50), (ActionType.RAISE, 100)]:
+        assert solution.hand_strategy(*catcher, [bet])[(ActionType.ALL_IN, None)] < 0.05
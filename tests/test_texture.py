@@ -0,0 +1,57 @@
+from itertools import combinations
+import numpy as np
+from game.card import CARDS
+from game.hand_state import HandState
+from game.history import HandLog
+from game.poker import PokerGameManager
+from game.texture import (BACKDOOR_FLUSH_DRAW, CONNECTED, FLUSH_DRAW, FLUSH_POSSIBLE, FOUR_FLUSH, FOUR_STRAIGHT, GUTSHOT,
+                          MONOTONE, OPEN_ENDED, PAIRED, RAINBOW, STRAIGHT_POSSIBLE, TRIPS, TWO_PAIR, TWO_TONE,
+                          BoardTexture, board_textures, describe, draw_flags, flop_texture, logged_boards)
+from tests.test_hand_state import cards
+
+def test_flop_features():
+    assert BoardTexture(cards("Ks Kd 7c")).flags == PAIRED | RAINBOW
+    assert BoardTexture(cards("9h 8h 7h")).flags == MONOTONE | FLUSH_POSSIBLE | CONNECTED | STRAIGHT_POSSIBLE
+    assert BoardTexture(cards("As 2d Kh")).flags == RAINBOW | CONNECTED
+    assert BoardTexture(cards("As 4d 5s")).flags == TWO_TONE | CONNECTED | STRAIGHT_POSSIBLE
+    assert BoardTexture(cards("Qs 7d 2c")).names() == ["rainbow"]
+
+def test_turn_and_river_update_the_flop():
+    board = BoardTexture(cards("9s 8s 2d"))
+    board.add(cards("7s")[0])
+    assert board.flags & FLUSH_POSSIBLE and board.flags & STRAIGHT_POSSIBLE and not board.flags & MONOTONE
+    board.add(cards("6s")[0])
+    assert board.flags & FOUR_FLUSH and board.flags & FOUR_STRAIGHT
+    assert BoardTexture(cards("9s 9d 2c 2d 9h")).flags & (PAIRED | TWO_PAIR | TRIPS) == PAIRED | TWO_PAIR | TRIPS
+
+def test_flop_table_matches_incremental():
+    for flop in list(combinations(range(52), 3))[::7]:
+        board = [CARDS[index] for index in flop]
+        assert flop_texture(board) == flop_texture(board[::-1]) == BoardTexture(board).flags
+
+def test_bulk_textures_match_incremental():
+    rng = np.random.default_rng(3)
+    boards = np.array([rng.choice(52, 5, replace=False) for _ in range(2000)])
+    for size in (3, 4, 5):
+        expected = [BoardTexture([CARDS[index] for index in board[:size]]).flags for board in boards]
+        assert board_textures(boards[:, :size]).tolist() == expected
+
+def test_hero_draws():
+    assert draw_flags(HandState(cards("Ah Kh 9h 4h 2c"))) == FLUSH_DRAW
+    assert draw_flags(HandState(cards("9c 8d 7c 6h Kc"))) == OPEN_ENDED | BACKDOOR_FLUSH_DRAW
+    assert draw_flags(HandState(cards("9c 8d 6s 5h Kd"))) == GUTSHOT
+    assert describe(cards("Ah Kh"), cards("9h 4h 2c")) == ("The board is two-tone. "
+                                                           "You have a flush draw with 9 outs.")
+    assert describe(cards("Ah Kh"), cards("9h 4c 2c")) == ("The board is two-tone. "
+                                                           "You have a backdoor flush draw.")
+    assert describe(cards("Ah Kh"), []) == ""
+
+def test_logged_boards():
+    game = PokerGameManager(history=HandLog(), seed=4)
+    game.new_round()
+    game.deal_board(3)
+    game.deal_board(1)
+    records = game.history.records()
+    flops = logged_boards(records, 3)
+    assert flops.tolist() == [[card.index for card in game.board[:3]]]
+    assert logged_boards(records, 5).shape == (0, 5)
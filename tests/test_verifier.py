@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import pytest
+from game.batch_evaluator import evaluate_hands
+from game.evaluator import CATEGORY_SHIFT
+from game.rank_table import TABLE_PATH
+from game.verifier import (CANDIDATES, SHARDS, TOTAL_HANDS, Verification, brute_force_scores, report, shard_hands,
+                           verify)
+from math import comb
+
+SMALL_SHARDS = [(40, 41), (30, 35), (44, 46)]
+
+def test_shards_cover_every_hand_once():
+    assert sum(comb(51 - second, 5) for _, second in SHARDS) == TOTAL_HANDS
+    hands = shard_hands(30, 35)
+    assert len(hands) == comb(16, 5)
+    assert (np.diff(hands.astype(int), axis=1) > 0).all()
+
+def test_brute_force_matches_batch_scores_in_order():
+    hands = np.array([np.random.default_rng(seed).choice(52, 7, replace=False) for seed in range(2000)])
+    brute, batch = brute_force_scores(hands), evaluate_hands(hands)
+    assert (brute >> CATEGORY_SHIFT == batch >> CATEGORY_SHIFT).all()
+    assert (np.sign(brute[:, None] - brute) == np.sign(batch[:, None] - batch)).all()
+
+def test_candidates_match_reference_on_small_shards():
+    candidates = ("batch", "brute_force", "table") if os.path.exists(TABLE_PATH) else ("batch", "brute_force")
+    result = verify(candidates, workers=1, shards=SMALL_SHARDS)
+    assert result.hands == sum(comb(51 - second, 5) for _, second in SMALL_SHARDS)
+    assert all(result.passed(name) for name in candidates)
+
+def test_mismatches_are_reported(monkeypatch):
+    # flushes scored as straights, and pairs ordered by their lowest card
+    def broken(hands):
+        scores = evaluate_hands(hands).astype(np.int64)
+        flushes = scores >> CATEGORY_SHIFT == 5
+        scores[flushes] -= 1 << CATEGORY_SHIFT
+        pairs = scores >> CATEGORY_SHIFT == 1
+        scores[pairs] = (1 << CATEGORY_SHIFT) | ((1 << CATEGORY_SHIFT) - 1 - (scores[pairs] & ((1 << CATEGORY_SHIFT) - 1)))
+        return scores
+    monkeypatch.setitem(CANDIDATES, "broken", broken)
+    result = verify(("broken",), workers=1, shards=[(5, 20)])
+    found = result.mismatches("broken")
+    assert found["category"] > 0
+    assert found["order"]
+    assert not result.passed("broken")
+    assert "MISMATCH" in report(result)
+
+def test_checkpoint_resumes(tmp_path):
+    path = str(tmp_path / "verify.json")
+    verify(("batch",), workers=1, checkpoint=path, shards=SMALL_SHARDS[:1])
+    result = verify(("batch",), workers=1, checkpoint=path, shards=SMALL_SHARDS)
+    assert result.done == set(SMALL_SHARDS)
+    assert result.hands == sum(comb(51 - second, 5) for _, second in SMALL_SHARDS)
+    assert Verification.load(path).hands == result.hands
+    with pytest.raises(ValueError):
+        verify(("brute_force",), workers=1, checkpoint=path)